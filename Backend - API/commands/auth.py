@@ -0,0 +1,104 @@
+"""
+MidianText RPG - Dependências de Autenticação
+==============================================
+
+Este módulo concentra a autenticação das rotas protegidas em dependências
+do FastAPI (Depends), substituindo o tratamento do header Authorization que
+era repetido em cada endpoint.
+
+Dependências:
+    - get_current_user: Valida o header "Authorization: Bearer <token>" e
+      retorna o user_id
+    - get_user_characters: Carrega (uma única vez por requisição) a lista de
+      personagens do usuário autenticado
+
+Assíncronas:
+    As dependências são `async def`: não ocupam o threadpool do FastAPI e
+    carregam os personagens pelo async_character_repository.
+
+Cache por Requisição:
+    O user_id e os personagens carregados ficam em request.state, então
+    várias dependências/handlers da mesma requisição não repetem a
+    verificação do token nem a leitura no banco.
+
+Example:
+    @router.get("/personagens")
+    def get_personagens(personagens: list | None = Depends(get_user_characters)):
+        return personagens or []
+
+HTTP Status Codes:
+    - 401: Header ausente, formato inválido ou token inválido/expirado
+"""
+
+from fastapi import Depends, Header, HTTPException, Request
+
+from commands.database import async_character_repository
+from commands.key_manager import verify_key
+
+
+def parse_bearer_token(authorization: str | None) -> str:
+    """
+    Extrai o token de um header "Authorization: Bearer <token>".
+
+    Args:
+        authorization (str | None): Valor do header Authorization
+
+    Returns:
+        str: Token extraído
+
+    Raises:
+        HTTPException 401: Header ausente ou fora do formato Bearer
+    """
+    if not authorization:
+        raise HTTPException(status_code=401, detail="Não autorizado")
+
+    try:
+        scheme, token = authorization.split()
+    except ValueError:
+        raise HTTPException(status_code=401, detail="Formato de token inválido")
+
+    if scheme.lower() != "bearer":
+        raise HTTPException(status_code=401, detail="Formato de token inválido")
+
+    return token
+
+
+async def get_current_user(request: Request, authorization: str = Header(None)) -> str:
+    """
+    Dependência que autentica a requisição e retorna o user_id.
+
+    Args:
+        request (Request): Requisição atual (user_id salvo em request.state)
+        authorization (str): Header Authorization
+
+    Returns:
+        str: ID do usuário autenticado
+
+    Raises:
+        HTTPException 401: Token ausente, mal formatado, inválido ou expirado
+    """
+    user_id = getattr(request.state, "user_id", None)
+    if user_id is not None:
+        return user_id
+
+    token = parse_bearer_token(authorization)
+    user_id = verify_key(token)
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Token inválido ou expirado")
+
+    request.state.user_id = user_id
+    return user_id
+
+
+async def get_user_characters(request: Request,
+                              user_id: str = Depends(get_current_user)) -> list | None:
+    """
+    Dependência que carrega os personagens do usuário autenticado.
+
+    Returns:
+        list | None: Lista de personagens ou None se o usuário não possuir
+                     documento de personagens
+    """
+    if not hasattr(request.state, "personagens"):
+        request.state.personagens = await async_character_repository.get_characters(user_id)
+    return request.state.personagens
@@ -0,0 +1,110 @@
+"""
+MidianText RPG - Cache de Catálogos Estáticos
+==============================================
+
+Respostas de catálogo (classes, cores, itens, loja) não mudam entre deploys.
+Este módulo as calcula uma única vez, guarda o JSON já codificado em bytes e
+responde com ETag forte e Cache-Control, devolvendo 304 quando o cliente já
+possui a versão atual (If-None-Match).
+
+Funcionalidades:
+    - Corpo JSON pré-codificado (mesmo formato do JSONResponse do FastAPI)
+    - ETag forte derivado do conteúdo: igual em todos os workers e reinícios
+      enquanto o catálogo não mudar
+    - 304 Not Modified sem corpo quando If-None-Match coincide
+    - rebuild(): recalcula todos os catálogos e troca o conjunto inteiro de
+      uma vez (nenhuma requisição vê uma mistura de versões)
+
+Example:
+    >>> catalogs = CatalogCache({"cores": build_cores})
+    >>> @router.get("/personagens/cores")
+    ... def get_cores(request: Request):
+    ...     return catalogs.respond("cores", request)
+
+Environment Variables:
+    CATALOG_CACHE_MAX_AGE: max-age (segundos) do Cache-Control (padrão: 300)
+"""
+
+import hashlib
+import json
+import os
+from typing import Callable
+
+from dotenv import load_dotenv
+from fastapi import Request, Response
+
+# Carregar variáveis de ambiente do arquivo .env (se existir)
+load_dotenv()
+
+CATALOG_CACHE_MAX_AGE = int(os.getenv("CATALOG_CACHE_MAX_AGE", "300"))
+
+
+class CachedCatalog:
+    """Resposta de catálogo pronta: corpo codificado, ETag e Cache-Control."""
+
+    __slots__ = ("body", "etag", "cache_control")
+
+    def __init__(self, payload, cache_control: str):
+        # Mesmos parâmetros do JSONResponse do FastAPI
+        self.body = json.dumps(
+            payload, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+        ).encode("utf-8")
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+        self.cache_control = cache_control
+
+    def matches(self, if_none_match: str | None) -> bool:
+        """Indica se o header If-None-Match do cliente contém este ETag."""
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        # Comparação fraca (RFC 9110): ignora o prefixo W/ de cada candidato
+        candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+        return self.etag in candidates
+
+
+class CatalogCache:
+    """Conjunto de catálogos pré-calculados, servidos por nome."""
+
+    def __init__(self, builders: dict[str, Callable[[], object]], private: frozenset = frozenset()):
+        """
+        Args:
+            builders (dict): Nome do catálogo → função que retorna o conteúdo
+            private (frozenset): Catálogos servidos apenas a usuários
+                                 autenticados (Cache-Control: private)
+        """
+        self.builders = builders
+        self.private = private
+        self._catalogs: dict[str, CachedCatalog] = {}
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """Recalcula todos os catálogos e os publica de uma só vez."""
+        catalogs = {}
+        for name, builder in self.builders.items():
+            scope = "private" if name in self.private else "public"
+            catalogs[name] = CachedCatalog(
+                builder(), f"{scope}, max-age={CATALOG_CACHE_MAX_AGE}"
+            )
+        self._catalogs = catalogs
+
+    def get(self, name: str) -> CachedCatalog:
+        """Retorna o catálogo pré-calculado (KeyError se não existir)."""
+        return self._catalogs[name]
+
+    def respond(self, name: str, request: Request) -> Response:
+        """
+        Responde com o catálogo ou com 304 se o cliente já possui esta versão.
+
+        Args:
+            name (str): Nome do catálogo
+            request (Request): Requisição atual (header If-None-Match)
+
+        Returns:
+            Response: 200 com o JSON pré-codificado ou 304 sem corpo
+        """
+        catalog = self._catalogs[name]
+        headers = {"ETag": catalog.etag, "Cache-Control": catalog.cache_control}
+        if catalog.matches(request.headers.get("if-none-match")):
+            return Response(status_code=304, headers=headers)
+        return Response(content=catalog.body, media_type="application/json", headers=headers)
@@ -0,0 +1,263 @@
+"""
+MidianText RPG - Motor de Combate
+==================================
+
+Este módulo resolve os combates das missões no servidor, a partir dos
+atributos salvos do personagem, da vantagem de cor e dos bônus dos itens
+equipados. Todo sorteio usa um random.Random recebido como parâmetro:
+com a mesma semente, o mesmo combate sempre tem o mesmo resultado.
+
+Regras de um Turno:
+    - Quem tem mais velocidade (spd) ataca primeiro; empate favorece o
+      personagem. Se o primeiro golpe derrota o alvo, não há contra-ataque
+    - Poder de ataque: o maior entre força (strg) e magia (mag)
+    - Dano base: poder - defesa do alvo // 2 (mínimo 1)
+    - Variação: 85% a 115% do dano base
+    - Cor: x1.5 com vantagem, x0.75 com desvantagem (cinza é neutro)
+    - Crítico: chance de `luck`% (máx. 50%), x1.5
+    - Dano final arredondado, mínimo 1
+
+Equipamentos:
+    Armas e armaduras no inventário somam o campo "bonus" do item
+    (commands/data/items.json) aos atributos, desde que o item seja da
+    classe do personagem ou de uso comum. Cada item conta uma vez.
+
+Estado Persistido:
+    O motor não faz I/O. A rota de missões guarda na sessão a semente
+    (combat_seed), o número de turnos já jogados (combat_rounds) e o HP
+    restante de cada inimigo ferido (enemy_hp); combat_rng() deriva o gerador
+    de cada turno a partir desses valores.
+
+Desempenho:
+    Combatant e os StatBlocks são objetos com __slots__; resolve_fight() não
+    cria objetos por turno, permitindo milhões de combates em simulações de
+    balanceamento (passe um único random.Random para todos).
+
+Example:
+    >>> hero = character_combatant(personagem)
+    >>> enemy = enemy_combatant(mission.rooms["sala_guardiao"].enemies[0])
+    >>> resolve_fight(hero, enemy, random.Random(42)).winner
+    'character'
+"""
+
+import random
+from typing import Mapping, NamedTuple
+
+from commands.models.items_table import ItemTable
+from commands.models.stats import Stat, StatBlock
+
+# Vermelho > Verde > Azul > Vermelho (como pedra, papel, tesoura)
+COLOR_ADVANTAGES = {
+    "vermelho": "verde",
+    "verde": "azul",
+    "azul": "vermelho"
+}
+ADVANTAGE_MULTIPLIER = 1.5
+DISADVANTAGE_MULTIPLIER = 0.75
+
+CRITICAL_MULTIPLIER = 1.5
+MAX_CRITICAL_CHANCE = 50
+DAMAGE_VARIANCE = (85, 115)
+
+# Tipos de item cujos bônus valem em combate
+EQUIPMENT_TYPES = frozenset({"arma", "armadura"})
+
+# Limite padrão de turnos de resolve_fight()
+DEFAULT_MAX_ROUNDS = 100
+
+_HP_MAX = int(Stat.HP_MAX)
+_STRG = int(Stat.STRG)
+_MAG = int(Stat.MAG)
+_SPD = int(Stat.SPD)
+_LUCK = int(Stat.LUCK)
+_DEFE = int(Stat.DEFE)
+
+
+def color_multiplier(attacker_color: str | None, defender_color: str | None) -> float:
+    """
+    Multiplicador de dano pela vantagem de cor.
+
+    Returns:
+        float: 1.5 com vantagem, 0.75 com desvantagem, 1.0 caso contrário
+    """
+    if COLOR_ADVANTAGES.get(attacker_color) == defender_color:
+        return ADVANTAGE_MULTIPLIER
+    if COLOR_ADVANTAGES.get(defender_color) == attacker_color:
+        return DISADVANTAGE_MULTIPLIER
+    return 1.0
+
+
+class Combatant:
+    """Participante de um combate: atributos, cor e HP atual (alterado no combate)."""
+
+    __slots__ = ("name", "stats", "color", "hp")
+
+    def __init__(self, name: str, stats: StatBlock, color: str | None = "cinza", hp: int | None = None):
+        self.name = name
+        self.stats = stats
+        self.color = color or "cinza"
+        self.hp = stats.values[_HP_MAX] if hp is None else hp
+
+
+def equipment_bonus(items: Mapping[str, int], character_class: str | None) -> StatBlock:
+    """
+    Soma os bônus dos equipamentos do inventário utilizáveis pela classe.
+
+    Args:
+        items: Inventário {nome do item: quantidade}
+        character_class: Classe do personagem
+
+    Returns:
+        StatBlock: Bônus totais (zeros se nenhum equipamento se aplica)
+    """
+    total = StatBlock()
+    for item_name, quantity in items.items():
+        bonus = ItemTable.get_item_bonus(item_name)
+        if bonus is None or not quantity:
+            continue
+        info = ItemTable.get_item_info(item_name)
+        if info.get("tipo") not in EQUIPMENT_TYPES:
+            continue
+        if info.get("classe") not in (None, character_class):
+            continue
+        for index, amount in enumerate(bonus.values):
+            total.values[index] += amount
+    return total
+
+
+def character_combatant(character: Mapping) -> Combatant:
+    """
+    Monta o combatente de um personagem salvo (formato de to_dict_full()).
+
+    O HP atual vem de status.hp_atual; bônus de HP máximo aumentam apenas
+    o limite.
+    """
+    status = character.get("status", {})
+    stats = StatBlock.from_mapping(status)
+    stats[Stat.LV] = character.get("level", 1)
+
+    bonus = equipment_bonus(
+        character.get("itens") or {},
+        character.get("character_class") or character.get("classe")
+    )
+    for index, amount in enumerate(bonus.values):
+        stats.values[index] += amount
+
+    hp = status.get("hp_atual", stats.values[_HP_MAX])
+    return Combatant(character.get("name", ""), stats, character.get("color"), hp)
+
+
+def enemy_combatant(enemy: Mapping, hp: int | None = None) -> Combatant:
+    """
+    Monta o combatente de um inimigo de missão.
+
+    Args:
+        enemy: Inimigo do catálogo (hp, attack, defense; color opcional)
+        hp: HP restante salvo na sessão (None = HP cheio)
+    """
+    return Combatant(enemy.get("name", ""), StatBlock.from_enemy(enemy), enemy.get("color"), hp)
+
+
+def new_combat_seed() -> int:
+    """Gera a semente de combate de uma nova sessão de missão."""
+    return random.SystemRandom().getrandbits(32)
+
+
+def combat_rng(seed: int, round_number: int) -> random.Random:
+    """Gerador determinístico para o turno `round_number` de uma sessão."""
+    return random.Random(seed * 1_000_003 + round_number)
+
+
+def attack(attacker: Combatant, defender: Combatant, rng: random.Random) -> tuple[int, bool]:
+    """
+    Resolve um golpe e aplica o dano ao defensor.
+
+    Returns:
+        tuple[int, bool]: (dano causado, se foi crítico)
+    """
+    a = attacker.stats.values
+    power = a[_STRG] if a[_STRG] >= a[_MAG] else a[_MAG]
+    base = power - defender.stats.values[_DEFE] // 2
+    if base < 1:
+        base = 1
+
+    damage = base * rng.randint(*DAMAGE_VARIANCE) / 100
+    damage *= color_multiplier(attacker.color, defender.color)
+
+    critical = rng.random() * 100 < min(a[_LUCK], MAX_CRITICAL_CHANCE)
+    if critical:
+        damage *= CRITICAL_MULTIPLIER
+
+    damage = max(1, round(damage))
+    defender.hp = max(0, defender.hp - damage)
+    return damage, critical
+
+
+class RoundResult(NamedTuple):
+    """Resultado de um turno (danos 0 = não atacou, pois já estava derrotado)."""
+    character_first: bool
+    damage_dealt: int
+    damage_dealt_critical: bool
+    damage_taken: int
+    damage_taken_critical: bool
+    character_hp: int
+    enemy_hp: int
+
+
+def resolve_round(character: Combatant, enemy: Combatant, rng: random.Random) -> RoundResult:
+    """
+    Resolve um turno: cada lado ataca uma vez, na ordem de velocidade.
+
+    Altera o HP dos dois combatentes.
+    """
+    character_first = character.stats.values[_SPD] >= enemy.stats.values[_SPD]
+    dealt = taken = 0
+    dealt_critical = taken_critical = False
+
+    if character_first:
+        dealt, dealt_critical = attack(character, enemy, rng)
+        if enemy.hp > 0:
+            taken, taken_critical = attack(enemy, character, rng)
+    else:
+        taken, taken_critical = attack(enemy, character, rng)
+        if character.hp > 0:
+            dealt, dealt_critical = attack(character, enemy, rng)
+
+    return RoundResult(
+        character_first, dealt, dealt_critical, taken, taken_critical,
+        character.hp, enemy.hp
+    )
+
+
+class FightResult(NamedTuple):
+    """Resultado de um combate completo."""
+    winner: str | None  # "character", "enemy" ou None (limite de turnos)
+    rounds: int
+    character_hp: int
+    enemy_hp: int
+
+
+def resolve_fight(character: Combatant, enemy: Combatant, rng: random.Random,
+                  max_rounds: int = DEFAULT_MAX_ROUNDS) -> FightResult:
+    """
+    Resolve turnos até um lado ser derrotado ou atingir max_rounds.
+
+    Altera o HP dos dois combatentes.
+    """
+    rounds = 0
+    character_first = character.stats.values[_SPD] >= enemy.stats.values[_SPD]
+    first, second = (character, enemy) if character_first else (enemy, character)
+
+    while character.hp > 0 and enemy.hp > 0 and rounds < max_rounds:
+        rounds += 1
+        attack(first, second, rng)
+        if second.hp > 0:
+            attack(second, first, rng)
+
+    if enemy.hp <= 0:
+        winner = "character"
+    elif character.hp <= 0:
+        winner = "enemy"
+    else:
+        winner = None
+    return FightResult(winner, rounds, character.hp, enemy.hp)
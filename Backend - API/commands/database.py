@@ -1,48 +1,305 @@
 """
-MidianText RPG - Configuração do Banco de Dados Firebase
-==========================================================
+MidianText RPG - Configuração do Banco de Dados
+================================================
 
-Este módulo gerencia a conexão com o Firebase Firestore, o banco de dados NoSQL
-em nuvem utilizado para armazenar todos os dados do jogo.
+Este módulo seleciona e inicializa o backend de armazenamento utilizado pela
+API. As rotas acessam os dados exclusivamente pelos repositórios expostos
+aqui, sem depender de um banco específico.
 
 Funcionalidades:
-    - Inicialização do Firebase Admin SDK
-    - Configuração do cliente Firestore
-    - Definição das collections principais
+    - Seleção do backend via variável de ambiente
+    - Inicialização sob demanda do Firebase Admin SDK
+    - Criação dos repositórios de usuários e personagens
 
-Collections Disponíveis:
-    - usuarios_collection: Armazena dados de autenticação dos usuários
-    - personagens_collection: Armazena personagens criados pelos usuários
+Repositórios Disponíveis:
+    - user_repository: Dados de autenticação dos usuários
+    - character_repository: Personagens criados pelos usuários
+    - async_character_repository: Mesmo armazenamento, para rotas async
+    - mission_session_store: Progresso das missões em andamento
+    - login_attempt_store: Falhas de login e cache de usuários inexistentes
+
+Backends:
+    - firestore (padrão): Firebase Firestore, credenciais em commands/keys/firebase.json
+    - memory: Dicionário em processo, sem rede (testes de carga e benchmarks)
+    - sqlite: Arquivo SQLite local definido por SQLITE_PATH
+
+Sessões de Missão:
+    - memory (padrão): LRU + TTL em processo (apenas um worker)
+    - sqlite: Tabela no arquivo SQLITE_PATH (compartilhada entre workers locais)
+    - firestore: Collection 'mission_sessions' (compartilhada entre máquinas)
+
+Métricas:
+    Os objetos exportados são envolvidos por instrument_storage(): cada
+    operação de dados (OPERATIONS da interface) é contada e cronometrada em
+    GET /metrics (commands/metrics.py).
+
+Proteção do Login:
+    - memory (padrão): Contagem por worker
+    - sqlite: Tabelas no arquivo SQLITE_PATH (compartilhadas entre workers locais)
 
 Estrutura de Dados:
     usuarios/{user_id}:
         - username: str
         - salt: str (para hashing de senha)
         - password: str (hash da senha)
-    
+
     personagens/{user_id}:
         - user_id: str
         - personagens: List[dict] (lista de até 3 personagens)
 
+Environment Variables:
+    STORAGE_BACKEND: firestore | memory | sqlite (padrão: firestore)
+    SQLITE_PATH: Caminho do arquivo SQLite (padrão: midiantext.db)
+    MISSION_SESSION_BACKEND: memory | sqlite | firestore (padrão: memory)
+    MISSION_SESSION_TTL: Segundos até uma missão abandonada expirar (padrão: 7200)
+    MISSION_SESSION_MAX: Máximo de sessões no backend memory (padrão: 10000)
+    STORAGE_LATENCY_MS: Latência simulada por operação nos backends memory/sqlite,
+                        para benchmarks (padrão: 0)
+    LOGIN_GUARD_BACKEND: memory | sqlite (padrão: memory)
+    LOGIN_GUARD_MAX_KEYS: Máximo de chaves no backend memory (padrão: 100000)
+
 Segurança:
     - Credenciais Firebase em arquivo separado (não versionado)
     - Acesso controlado via Firebase Admin SDK
     - Validação de permissões no lado do servidor
 
-Dependencies: firebase-admin
+Dependencies: firebase-admin (apenas para o backend firestore)
 """
 
-import firebase_admin
-from firebase_admin import credentials, firestore
+import os
+import threading
+
+from dotenv import load_dotenv
+
+from commands.metrics import instrument_storage
+from commands.storage.async_repository import AsyncCharacterRepository
+from commands.storage.base import CharacterRepository, UserRepository
+from commands.storage.mission_sessions import (
+    FirestoreMissionSessionStore,
+    MemoryMissionSessionStore,
+    MissionSessionStore,
+    SQLiteMissionSessionStore
+)
+from commands.storage.login_attempts import (
+    LoginAttemptStore,
+    MemoryLoginAttemptStore,
+    SQLiteLoginAttemptStore
+)
+
+# Carregar variáveis de ambiente do arquivo .env (se existir)
+load_dotenv()
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "firestore").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", "midiantext.db")
+STORAGE_LATENCY_MS = float(os.getenv("STORAGE_LATENCY_MS", "0"))
+MISSION_SESSION_BACKEND = os.getenv("MISSION_SESSION_BACKEND", "memory").lower()
+MISSION_SESSION_TTL = float(os.getenv("MISSION_SESSION_TTL", "7200"))
+MISSION_SESSION_MAX = int(os.getenv("MISSION_SESSION_MAX", "10000"))
+LOGIN_GUARD_BACKEND = os.getenv("LOGIN_GUARD_BACKEND", "memory").lower()
+LOGIN_GUARD_MAX_KEYS = int(os.getenv("LOGIN_GUARD_MAX_KEYS", "100000"))
 
-# Inicializa o Firebase Admin SDK com as credenciais do projeto
 # Arquivo firebase.json deve estar em commands/keys/ (não commitar!)
-cred = credentials.Certificate("commands/keys/firebase.json")
-firebase_admin.initialize_app(cred)
+FIREBASE_CREDENTIALS = "commands/keys/firebase.json"
+
+# Clientes por processo: {"sync" | "async": (pid, cliente)}
+_firestore_clients: dict = {}
+_firestore_lock = threading.Lock()
+
+
+def _initialize_firebase_app():
+    """Inicializa o Firebase Admin SDK (uma única vez) e retorna o app."""
+    import firebase_admin
+    from firebase_admin import credentials
+
+    try:
+        return firebase_admin.get_app()
+    except ValueError:
+        cred = credentials.Certificate(FIREBASE_CREDENTIALS)
+        return firebase_admin.initialize_app(cred)
+
+
+def _get_process_client(kind: str):
+    """
+    Retorna o cliente Firestore do processo atual, criando-o se necessário.
+
+    Canais gRPC não sobrevivem a um fork: se o cliente foi criado por outro
+    processo (ex: gunicorn com --preload), um novo é criado para este.
+    """
+    pid = os.getpid()
+    entry = _firestore_clients.get(kind)
+    if entry is not None and entry[0] == pid:
+        return entry[1]
+
+    with _firestore_lock:
+        entry = _firestore_clients.get(kind)
+        if entry is None or entry[0] != pid:
+            from google.cloud import firestore
+
+            app = _initialize_firebase_app()
+            client_class = firestore.Client if kind == "sync" else firestore.AsyncClient
+            client = client_class(
+                project=app.project_id,
+                credentials=app.credential.get_credential()
+            )
+            _firestore_clients[kind] = entry = (pid, client)
+    return entry[1]
+
+
+def get_firestore_client():
+    """
+    Retorna o cliente Firestore, inicializando o Firebase Admin SDK na primeira chamada.
+
+    Returns:
+        google.cloud.firestore.Client: Cliente Firestore do processo atual
+    """
+    return _get_process_client("sync")
+
+
+def get_firestore_async_client():
+    """
+    Retorna o cliente assíncrono do Firestore (usado pelas rotas async).
+
+    Returns:
+        google.cloud.firestore.AsyncClient: Cliente Firestore assíncrono do processo atual
+    """
+    return _get_process_client("async")
+
+
+def _build_repositories(backend: str) -> tuple[UserRepository, CharacterRepository,
+                                               AsyncCharacterRepository]:
+    """
+    Cria os repositórios do backend informado.
+
+    Args:
+        backend (str): Nome do backend (firestore, memory ou sqlite)
+
+    Returns:
+        tuple[UserRepository, CharacterRepository, AsyncCharacterRepository]:
+            Repositórios configurados (os de personagens compartilham os dados)
+
+    Raises:
+        ValueError: Se o backend não for suportado
+    """
+    if backend == "firestore":
+        from commands.storage.async_repository import AsyncFirestoreCharacterRepository
+        from commands.storage.firestore_repository import (
+            FirestoreCharacterRepository,
+            FirestoreUserRepository
+        )
+        return (
+            FirestoreUserRepository(get_firestore_client),
+            FirestoreCharacterRepository(get_firestore_client),
+            AsyncFirestoreCharacterRepository(get_firestore_async_client)
+        )
+
+    if backend in ("memory", "sqlite"):
+        from commands.storage.async_repository import AsyncLocalCharacterRepository
+        from commands.storage.local_repository import (
+            LocalCharacterRepository,
+            LocalUserRepository,
+            MemoryDocumentStore,
+            SQLiteDocumentStore
+        )
+        store = MemoryDocumentStore() if backend == "memory" else SQLiteDocumentStore(SQLITE_PATH)
+        latency = STORAGE_LATENCY_MS / 1000
+        return (
+            LocalUserRepository(store),
+            LocalCharacterRepository(store, latency),
+            AsyncLocalCharacterRepository(
+                LocalCharacterRepository(store),
+                offload=backend == "sqlite",
+                latency=latency
+            )
+        )
+
+    raise ValueError(
+        f"STORAGE_BACKEND inválido: '{backend}'. Use firestore, memory ou sqlite."
+    )
+
+
+def _build_mission_session_store(backend: str) -> MissionSessionStore:
+    """
+    Cria o armazenamento de sessões de missão do backend informado.
+
+    Args:
+        backend (str): Nome do backend (memory, sqlite ou firestore)
+
+    Returns:
+        MissionSessionStore: Armazenamento configurado
+
+    Raises:
+        ValueError: Se o backend não for suportado
+    """
+    if backend == "memory":
+        return MemoryMissionSessionStore(MISSION_SESSION_TTL, MISSION_SESSION_MAX)
+    if backend == "sqlite":
+        return SQLiteMissionSessionStore(MISSION_SESSION_TTL, SQLITE_PATH)
+    if backend == "firestore":
+        return FirestoreMissionSessionStore(MISSION_SESSION_TTL, get_firestore_client)
+
+    raise ValueError(
+        f"MISSION_SESSION_BACKEND inválido: '{backend}'. Use memory, sqlite ou firestore."
+    )
+
+
+def _build_login_attempt_store(backend: str) -> LoginAttemptStore:
+    """
+    Cria o armazenamento de tentativas de login do backend informado.
+
+    Args:
+        backend (str): Nome do backend (memory ou sqlite)
+
+    Returns:
+        LoginAttemptStore: Armazenamento configurado
+
+    Raises:
+        ValueError: Se o backend não for suportado
+    """
+    if backend == "memory":
+        return MemoryLoginAttemptStore(LOGIN_GUARD_MAX_KEYS)
+    if backend == "sqlite":
+        return SQLiteLoginAttemptStore(SQLITE_PATH)
+
+    raise ValueError(
+        f"LOGIN_GUARD_BACKEND inválido: '{backend}'. Use memory ou sqlite."
+    )
+
+
+# Repositórios utilizados pelas rotas (instrumentados para GET /metrics)
+_user_repository, _character_repository, _async_character_repository = \
+    _build_repositories(STORAGE_BACKEND)
+user_repository = instrument_storage(_user_repository, "users", UserRepository.OPERATIONS)
+character_repository = instrument_storage(
+    _character_repository, "characters", CharacterRepository.OPERATIONS
+)
+async_character_repository = instrument_storage(
+    _async_character_repository, "characters_async", AsyncCharacterRepository.OPERATIONS
+)
+mission_session_store = instrument_storage(
+    _build_mission_session_store(MISSION_SESSION_BACKEND), "mission_sessions",
+    MissionSessionStore.OPERATIONS
+)
+login_attempt_store = instrument_storage(
+    _build_login_attempt_store(LOGIN_GUARD_BACKEND), "login_attempts",
+    LoginAttemptStore.OPERATIONS
+)
+
+
+def get_unshared_backends() -> dict[str, str]:
+    """
+    Lista os armazenamentos configurados que existem apenas no processo atual.
 
-# Cliente Firestore para interação com o banco de dados
-db = firestore.client()
+    Com mais de um worker, cada processo teria a sua própria cópia desses
+    dados (personagens, missões em andamento, contagem de falhas de login).
 
-# Collections principais do sistema
-usuarios_collection = db.collection("usuarios")  # Autenticação e dados de usuários
-personagens_collection = db.collection("personagens")  # Personagens dos usuários
+    Returns:
+        dict[str, str]: Variável de ambiente → backend em memória configurado
+    """
+    unshared = {}
+    if not character_repository.shareable:
+        unshared["STORAGE_BACKEND"] = STORAGE_BACKEND
+    if not mission_session_store.shareable:
+        unshared["MISSION_SESSION_BACKEND"] = MISSION_SESSION_BACKEND
+    if not login_attempt_store.shareable:
+        unshared["LOGIN_GUARD_BACKEND"] = LOGIN_GUARD_BACKEND
+    return unshared
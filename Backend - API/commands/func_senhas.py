@@ -35,11 +35,51 @@ Fluxo de Uso:
         3. verificar_senha() aplica mesmo processo
         4. Compara hashes → Autentica se iguais
 
-Dependencies: hashlib (built-in), os (built-in)
+Execução Assíncrona (rotas):
+    O PBKDF2 leva dezenas de milissegundos de CPU. As rotas de registro e
+    login usam hash_senha_async() / verificar_senha_async(), que executam o
+    cálculo em um pool dedicado e limitado, sem ocupar o event loop nem as
+    threads usadas pelos endpoints de personagens e missões.
+
+    Backpressure: no máximo PASSWORD_HASH_MAX_PENDING cálculos podem estar
+    em andamento ou na fila. Acima disso, PasswordHashingBusyError é lançada
+    imediatamente (as rotas respondem 503) em vez de acumular requisições.
+
+    O pool de processos usa o método "spawn": scripts que chamam as funções
+    async diretamente precisam do bloco `if __name__ == "__main__":`.
+
+    Recuperação: se um processo do pool morrer (OOM, segfault), o pool fica
+    quebrado (BrokenProcessPool) para sempre. O cálculo que o encontrar
+    descarta o pool, que é recriado na próxima chamada, e tenta mais uma
+    vez; se o novo pool também quebrar, a rota responde 503.
+
+Environment Variables:
+    PASSWORD_HASH_EXECUTOR: process | thread (padrão: process)
+    PASSWORD_HASH_WORKERS: Tamanho do pool (padrão: min(4, núcleos da CPU))
+    PASSWORD_HASH_MAX_PENDING: Cálculos simultâneos + fila (padrão: workers × 8)
+
+Dependencies: hashlib (built-in), os (built-in), concurrent.futures (built-in)
 """
 
+import asyncio
 import hashlib
+import multiprocessing
 import os
+import threading
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+# Carregar variáveis de ambiente do arquivo .env (se existir)
+load_dotenv()
+
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "process").lower()
+PASSWORD_HASH_WORKERS = int(
+    os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+PASSWORD_HASH_MAX_PENDING = int(
+    os.getenv("PASSWORD_HASH_MAX_PENDING", str(PASSWORD_HASH_WORKERS * 8))
+)
 
 
 def hash_senha(senha: str) -> tuple[str, str]:
@@ -156,3 +196,138 @@ def verificar_senha(senha: str, salt: str, senha_hash: str) -> bool:
     # Comparação segura de bytes (tempo constante)
     # Previne timing attacks ao não retornar early em diferenças
     return nova_senha_hash == senha_hash_bytes
+
+
+class PasswordHashingBusyError(Exception):
+    """Lançada quando o pool de hashing atingiu o limite de cálculos pendentes."""
+
+
+_executor: Executor | None = None
+_executor_lock = threading.Lock()
+_pending = 0
+_rejected = 0
+_rebuilds = 0
+
+
+def _get_executor() -> Executor:
+    """
+    Retorna o pool de hashing, criando-o na primeira chamada.
+
+    A criação é tardia para que cada worker do servidor tenha seu próprio
+    pool, criado depois do fork.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            if PASSWORD_HASH_EXECUTOR == "thread":
+                _executor = ThreadPoolExecutor(
+                    max_workers=PASSWORD_HASH_WORKERS,
+                    thread_name_prefix="password-hash"
+                )
+            elif PASSWORD_HASH_EXECUTOR == "process":
+                # spawn, e não fork: o processo da API já tem threads (event
+                # loop, recarga dos catálogos, logs) cujos locks seriam
+                # copiados presos para os processos do pool
+                _executor = ProcessPoolExecutor(
+                    max_workers=PASSWORD_HASH_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                raise ValueError(
+                    f"PASSWORD_HASH_EXECUTOR inválido: '{PASSWORD_HASH_EXECUTOR}'. "
+                    "Use process ou thread."
+                )
+        return _executor
+
+
+def _discard_broken_executor(executor: Executor) -> None:
+    """
+    Descarta um pool quebrado para que a próxima chamada crie outro.
+
+    Só descarta se o pool atual ainda for o quebrado: outra requisição que
+    falhou no mesmo pool pode já ter criado o substituto.
+    """
+    global _executor, _rebuilds
+    with _executor_lock:
+        if _executor is not executor:
+            return
+        _executor = None
+        _rebuilds += 1
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def _run_in_pool(func, *args):
+    """Executa func(*args) no pool de hashing respeitando o limite de pendências."""
+    global _pending, _rejected
+    with _executor_lock:
+        if _pending >= PASSWORD_HASH_MAX_PENDING:
+            _rejected += 1
+            raise PasswordHashingBusyError("Pool de hashing de senhas saturado")
+        _pending += 1
+
+    try:
+        loop = asyncio.get_running_loop()
+        for _ in range(2):
+            executor = _get_executor()
+            try:
+                return await loop.run_in_executor(executor, func, *args)
+            except BrokenExecutor:
+                _discard_broken_executor(executor)
+        raise PasswordHashingBusyError("Pool de hashing de senhas indisponível")
+    finally:
+        with _executor_lock:
+            _pending -= 1
+
+
+async def hash_senha_async(senha: str) -> tuple[str, str]:
+    """
+    Versão assíncrona de hash_senha(), executada no pool de hashing.
+
+    Raises:
+        PasswordHashingBusyError: Se o pool estiver saturado ou quebrar duas vezes
+    """
+    return await _run_in_pool(hash_senha, senha)
+
+
+async def verificar_senha_async(senha: str, salt: str, senha_hash: str) -> bool:
+    """
+    Versão assíncrona de verificar_senha(), executada no pool de hashing.
+
+    Raises:
+        PasswordHashingBusyError: Se o pool estiver saturado ou quebrar duas vezes
+    """
+    return await _run_in_pool(verificar_senha, senha, salt, senha_hash)
+
+
+def get_hash_pool_stats() -> dict:
+    """
+    Retorna o estado atual do pool de hashing.
+
+    Returns:
+        dict: executor, workers (tamanho do pool), max_pending (limite),
+              in_flight (em execução ou na fila), queue_depth (aguardando
+              um worker livre), rejected (recusadas por saturação) e
+              rebuilds (pools quebrados descartados e recriados)
+    """
+    with _executor_lock:
+        pending = _pending
+        rejected = _rejected
+        rebuilds = _rebuilds
+    return {
+        "executor": PASSWORD_HASH_EXECUTOR,
+        "workers": PASSWORD_HASH_WORKERS,
+        "max_pending": PASSWORD_HASH_MAX_PENDING,
+        "in_flight": pending,
+        "queue_depth": max(0, pending - PASSWORD_HASH_WORKERS),
+        "rejected": rejected,
+        "rebuilds": rebuilds
+    }
+
+
+def shutdown_hash_pool() -> None:
+    """Encerra o pool de hashing (chamado no desligamento da API)."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
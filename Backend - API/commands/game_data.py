@@ -0,0 +1,286 @@
+"""
+MidianText RPG - Catálogos de Conteúdo (Itens e Missões)
+=========================================================
+
+Os itens e as missões do jogo ficam em arquivos JSON versionados, fora do
+código. Este módulo lê, valida e (re)publica esses catálogos, permitindo
+atualizar o conteúdo sem novo deploy e sem reiniciar a API.
+
+Arquivos (em GAME_DATA_DIR):
+    items.json:    {"version": int, "items": {nome: item}}
+    missions.json: {"version": int, "missions": {id: missão}}
+
+Funcionalidades:
+    - Validação com Pydantic: ItemDefinition (abaixo) e Mission/MissionRoom/
+      Enemy/Treasure de commands/models/mission_model.py (inimigos e tesouros
+      sem os campos usados em combate e coleta são recusados), mais
+      consistência de ids e sala inicial; ItemTable valida as classes e os
+      itens iniciais e mission_graph valida o grafo de salas (saídas,
+      alcance, "fim")
+    - Recarga sem reinício: reload_game_data() lê, valida e compila os dois
+      catálogos ANTES de publicar; cada catálogo é trocado em uma única
+      atribuição, então requisições em andamento continuam com a versão que
+      já tinham em mãos. Se algo falhar, a versão atual continua ativa
+    - Versão obrigatória: a recarga só acontece quando o campo "version" de
+      algum arquivo muda (edições sem nova versão são ignoradas com aviso)
+    - Gatilhos: alteração dos arquivos (verificada periodicamente) ou SIGHUP
+    - on_reload(): caches derivados (ex: catálogos HTTP pré-codificados) são
+      reconstruídos após cada recarga
+
+Environment Variables:
+    GAME_DATA_DIR: Diretório dos arquivos (padrão: commands/data)
+    GAME_DATA_RELOAD_INTERVAL: Segundos entre verificações dos arquivos;
+                               0 desliga a verificação (padrão: 5)
+
+Notes:
+    - Com vários workers, cada processo verifica os arquivos e recarrega por
+      conta própria. Enviar SIGHUP ao processo principal do Uvicorn reinicia
+      os workers (o que também carrega a nova versão); SIGHUP enviado a um
+      worker recarrega apenas aquele processo, sem reiniciá-lo
+    - Sessões de missão guardam apenas ids de salas/inimigos/tesouros: se a
+      sala atual de uma sessão deixar de existir, POST /missions/action
+      responde 409 e o jogador reinicia a missão
+"""
+
+import asyncio
+import json
+import logging
+import os
+import signal
+import threading
+from typing import Callable, Dict, Optional
+
+from dotenv import load_dotenv
+from pydantic import BaseModel, Field
+
+from commands.models.mission_model import Mission
+
+# Carregar variáveis de ambiente do arquivo .env (se existir)
+load_dotenv()
+
+GAME_DATA_DIR = os.getenv(
+    "GAME_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+)
+GAME_DATA_RELOAD_INTERVAL = float(os.getenv("GAME_DATA_RELOAD_INTERVAL", "5"))
+
+ITEMS_FILE = "items.json"
+MISSIONS_FILE = "missions.json"
+
+logger = logging.getLogger("midiantext.game_data")
+
+
+class ItemDefinition(BaseModel):
+    """Item do catálogo (a ordem dos campos é a ordem servida pela API)."""
+    tipo: str
+    efeito: str
+    descricao: str
+    emoji: str
+    valor: int = Field(ge=0)
+    classe: Optional[str] = None
+    # Bônus de atributos em combate, ex: {"strg": 4} (ver commands/models/stats.py)
+    bonus: Optional[Dict[str, int]] = None
+
+
+class ItemCatalogFile(BaseModel):
+    version: int = Field(ge=1)
+    items: Dict[str, ItemDefinition]
+
+
+class MissionCatalogFile(BaseModel):
+    version: int = Field(ge=1)
+    missions: Dict[str, Mission]
+
+
+def _read_json(filename: str) -> dict:
+    with open(os.path.join(GAME_DATA_DIR, filename), encoding="utf-8") as file:
+        return json.load(file)
+
+
+def read_item_catalog() -> tuple[int, dict]:
+    """
+    Lê e valida o catálogo de itens.
+
+    Returns:
+        tuple[int, dict]: (versão, {nome: item})
+
+    Raises:
+        OSError: Arquivo inexistente ou ilegível
+        ValueError: JSON inválido ou item fora do formato
+    """
+    catalog = ItemCatalogFile(**_read_json(ITEMS_FILE))
+    items = {
+        name: item.model_dump(exclude_none=True)
+        for name, item in catalog.items.items()
+    }
+    return catalog.version, items
+
+
+def read_mission_catalog() -> tuple[int, dict]:
+    """
+    Lê e valida o catálogo de missões.
+
+    Returns:
+        tuple[int, dict]: (versão, {id: missão})
+
+    Raises:
+        OSError: Arquivo inexistente ou ilegível
+        ValueError: JSON inválido, missão fora do formato ou ids inconsistentes
+    """
+    catalog = MissionCatalogFile(**_read_json(MISSIONS_FILE))
+
+    errors = []
+    for mission_id, mission in catalog.missions.items():
+        if mission.id != mission_id:
+            errors.append(f"Missão '{mission_id}' declara id '{mission.id}'")
+        if mission.starting_room not in mission.rooms:
+            errors.append(f"Missão '{mission_id}': sala inicial '{mission.starting_room}' não existe")
+        errors.extend(
+            f"Missão '{mission_id}': sala '{room_id}' declara id '{room.id}'"
+            for room_id, room in mission.rooms.items() if room.id != room_id
+        )
+    if errors:
+        raise ValueError("Catálogo de missões inválido:\n" + "\n".join(errors))
+
+    # exclude_none: campos opcionais ausentes (ex: cor do inimigo) não
+    # aparecem nas salas servidas pela API
+    missions = {
+        mission_id: mission.model_dump(exclude_none=True)
+        for mission_id, mission in catalog.missions.items()
+    }
+    return catalog.version, missions
+
+
+# ==================== RECARGA ====================
+
+_reload_lock = threading.Lock()
+_listeners: list[Callable[[], None]] = []
+
+
+def on_reload(callback: Callable[[], None]) -> None:
+    """Registra uma função chamada após cada recarga bem-sucedida."""
+    _listeners.append(callback)
+
+
+def get_game_data_versions() -> dict:
+    """Retorna as versões dos catálogos em uso, ex: {"items": 3, "missions": 2}."""
+    from commands.mission_graph import get_missions_version
+    from commands.models.items_table import ItemTable
+
+    return {"items": ItemTable.VERSION, "missions": get_missions_version()}
+
+
+def reload_game_data(force: bool = False) -> bool:
+    """
+    Relê os arquivos e publica os novos catálogos.
+
+    Args:
+        force (bool): Recarrega mesmo sem mudança de versão
+
+    Returns:
+        bool: True se os catálogos foram trocados
+
+    Raises:
+        OSError, ValueError: Arquivos ilegíveis ou inválidos (nada é trocado)
+    """
+    # Importados aqui: esses módulos carregam os arquivos por este módulo
+    from commands import missions_data
+    from commands.mission_graph import compile_catalog, publish_catalog
+    from commands.models.items_table import ItemTable
+
+    with _reload_lock:
+        current = get_game_data_versions()
+        items_version, items = read_item_catalog()
+        missions_version, missions = read_mission_catalog()
+        if not force and current == {"items": items_version, "missions": missions_version}:
+            logger.warning(
+                "game_data_unchanged_version",
+                extra={"fields": {"versions": current}}
+            )
+            return False
+
+        # Valida e compila tudo antes de publicar qualquer coisa
+        item_indexes = ItemTable.build_indexes(items, items_version)
+        compiled = compile_catalog(missions, missions_version)
+
+        ItemTable.publish(item_indexes)
+        missions_data.MISSIONS_VERSION, missions_data.MISSIONS = missions_version, missions
+        publish_catalog(compiled)
+
+    for listener in _listeners:
+        listener()
+
+    logger.info(
+        "game_data_reloaded",
+        extra={"fields": {"previous": current, "versions": get_game_data_versions()}}
+    )
+    return True
+
+
+def _reload_safely() -> None:
+    try:
+        reload_game_data()
+    except Exception:
+        logger.exception("game_data_reload_failed")
+
+
+def _file_signature() -> tuple:
+    signature = []
+    for filename in (ITEMS_FILE, MISSIONS_FILE):
+        try:
+            stat = os.stat(os.path.join(GAME_DATA_DIR, filename))
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+
+_watcher: threading.Thread | None = None
+_stop_watcher = threading.Event()
+
+
+def _watch_files(interval: float) -> None:
+    last_signature = _file_signature()
+    while not _stop_watcher.wait(interval):
+        signature = _file_signature()
+        if signature != last_signature:
+            last_signature = signature
+            _reload_safely()
+
+
+def start_game_data_reloader() -> None:
+    """
+    Ativa a recarga automática: verificação dos arquivos e SIGHUP.
+
+    Chamado na inicialização da API (dentro do event loop).
+    """
+    global _watcher
+
+    if hasattr(signal, "SIGHUP"):
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(
+                signal.SIGHUP, lambda: loop.run_in_executor(None, _reload_safely)
+            )
+        except (NotImplementedError, RuntimeError, ValueError):
+            # Event loop fora da thread principal (ex: TestClient) ou sem suporte
+            logger.debug("game_data_sighup_unavailable")
+
+    if GAME_DATA_RELOAD_INTERVAL > 0 and _watcher is None:
+        _stop_watcher.clear()
+        _watcher = threading.Thread(
+            target=_watch_files,
+            args=(GAME_DATA_RELOAD_INTERVAL,),
+            name="game-data-watcher",
+            daemon=True
+        )
+        _watcher.start()
+
+
+def stop_game_data_reloader() -> None:
+    """Encerra a verificação periódica dos arquivos."""
+    global _watcher
+    if _watcher is not None:
+        _stop_watcher.set()
+        _watcher.join()
+        _watcher = None
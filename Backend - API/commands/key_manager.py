@@ -23,16 +23,28 @@ Fluxo de Autenticação:
     4. Requisições posteriores incluem token no header Authorization
     5. verify_key() valida token em cada requisição protegida
 
+Cache de Tokens Verificados:
+    Clientes consultam vários endpoints por tela com o mesmo token. Após a
+    primeira verificação, o user_id e o instante de expiração do token ficam
+    em um cache LRU limitado, e as requisições seguintes dentro da validade
+    de 2 horas dispensam a verificação HMAC. Entradas expiradas são
+    descartadas na consulta; tokens inválidos nunca são armazenados.
+
 Environment Variables:
     SECRET_KEY: Chave secreta para assinatura de tokens
                 (use valor forte em produção!)
+    TOKEN_CACHE_SIZE: Máximo de tokens no cache de verificação (padrão: 10000)
 
 Dependencies: itsdangerous, python-dotenv
 """
 
 from itsdangerous import URLSafeTimedSerializer
 from dotenv import load_dotenv
+from collections import OrderedDict
+import logging
 import os
+import threading
+import time
 
 # Carregar variáveis de ambiente do arquivo .env (se existir)
 load_dotenv()
@@ -47,6 +59,15 @@ SECRET_KEY = os.getenv(
 # Serializer para gerar e verificar tokens com tempo de expiração
 # URLSafeTimedSerializer garante tokens seguros e URL-safe
 serializer = URLSafeTimedSerializer(SECRET_KEY)
+logger = logging.getLogger("midiantext.auth")
+
+# Validade dos tokens em segundos (2 horas)
+TOKEN_MAX_AGE = 7200
+
+# Cache LRU de tokens verificados: token -> (user_id, instante de expiração)
+TOKEN_CACHE_SIZE = int(os.getenv('TOKEN_CACHE_SIZE', '10000'))
+_token_cache: OrderedDict[str, tuple[str, float]] = OrderedDict()
+_token_cache_lock = threading.Lock()
 
 
 def generate_key(user_id: str) -> str:
@@ -103,20 +124,41 @@ def verify_key(key: str) -> str | None:
     
     Notes:
         - Expiração: 2 horas (7200 segundos) após geração
-        - Logs de debug podem ser removidos em produção
+        - Tokens já verificados são respondidos pelo cache até expirarem
+        - Logs de debug (LOG_LEVEL=DEBUG) nunca incluem o token
         - Em caso de falha, sempre retorna None (seguro por padrão)
     """
+    now = time.time()
+    with _token_cache_lock:
+        cached = _token_cache.get(key)
+        if cached is not None:
+            user_id, expires_at = cached
+            if now <= expires_at:
+                _token_cache.move_to_end(key)
+                return user_id
+            # Token expirou desde a última verificação
+            del _token_cache[key]
+    
     try:
-        print(f"DEBUG verify_key: Attempting to verify token")
-        
         # Verifica o token com tempo de expiração de 2 horas (7200 segundos)
         # max_age: tempo máximo (em segundos) desde a criação do token
-        user_id = serializer.loads(key, max_age=7200)
+        user_id, issued_at = serializer.loads(
+            key, max_age=TOKEN_MAX_AGE, return_timestamp=True
+        )
         
-        print(f"DEBUG verify_key: Token valid, user_id: {user_id}")
-        return user_id
+        logger.debug("token_verified", extra={"fields": {"user_id": user_id}})
     
     except Exception as e:
         # Captura qualquer erro (expiração, assinatura inválida, formato incorreto)
-        print(f"DEBUG verify_key: Token validation failed - {type(e).__name__}: {str(e)}")
+        logger.debug("token_rejected", extra={"fields": {"reason": type(e).__name__}})
         return None
+    
+    # Mesmo critério do itsdangerous: válido enquanto idade <= max_age
+    expires_at = issued_at.timestamp() + TOKEN_MAX_AGE
+    with _token_cache_lock:
+        _token_cache[key] = (user_id, expires_at)
+        _token_cache.move_to_end(key)
+        while len(_token_cache) > TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+    
+    return user_id
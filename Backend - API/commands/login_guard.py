@@ -0,0 +1,189 @@
+"""
+MidianText RPG - Proteção do Login contra Força Bruta
+======================================================
+
+Este módulo decide, antes de qualquer leitura no banco ou cálculo PBKDF2,
+se uma tentativa de login deve ser processada.
+
+Funcionalidades:
+    - Limite de falhas por username e por IP em janela deslizante
+    - Cache negativo: usernames inexistentes são lembrados por alguns
+      segundos e recusados sem consultar o banco
+    - Cache positivo: usuários encontrados recentemente (user_id, salt, hash)
+      são reutilizados sem nova leitura no banco
+
+Fluxo no Login:
+    1. retry_after() > 0 → 429 (sem tocar no banco nem no pool de hashing)
+    2. is_known_missing() → 401 imediato (conta como falha)
+    3. Busca o usuário (cache positivo ou banco); inexistente → remember_missing()
+    4. Senha incorreta → record_failure(); correta → record_success()
+
+Armazenamento:
+    As falhas e o cache negativo ficam em `login_attempt_store`
+    (commands/database.py), que pode ser compartilhado entre workers
+    (LOGIN_GUARD_BACKEND=sqlite). O cache positivo é sempre em processo.
+
+Rotas Assíncronas:
+    Os métodos *_async() executam as operações do store em uma thread
+    (sqlite pode esperar até 30s por um lock do arquivo), exceto no backend
+    memory, que responde direto no event loop.
+
+Environment Variables:
+    LOGIN_MAX_FAILURES_PER_USER: Falhas por username na janela (padrão: 5)
+    LOGIN_MAX_FAILURES_PER_IP: Falhas por IP na janela (padrão: 20)
+    LOGIN_FAILURE_WINDOW: Tamanho da janela em segundos (padrão: 300)
+    LOGIN_NEGATIVE_CACHE_TTL: Segundos que um username inexistente fica em cache (padrão: 60)
+    LOGIN_USER_CACHE_TTL: Segundos que um usuário encontrado fica em cache (padrão: 300)
+    LOGIN_USER_CACHE_SIZE: Máximo de usuários no cache positivo (padrão: 10000)
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+from commands.database import login_attempt_store
+from commands.storage.base import normalize_username
+from commands.storage.login_attempts import LoginAttemptStore
+
+# Carregar variáveis de ambiente do arquivo .env (se existir)
+load_dotenv()
+
+LOGIN_MAX_FAILURES_PER_USER = int(os.getenv("LOGIN_MAX_FAILURES_PER_USER", "5"))
+LOGIN_MAX_FAILURES_PER_IP = int(os.getenv("LOGIN_MAX_FAILURES_PER_IP", "20"))
+LOGIN_FAILURE_WINDOW = float(os.getenv("LOGIN_FAILURE_WINDOW", "300"))
+LOGIN_NEGATIVE_CACHE_TTL = float(os.getenv("LOGIN_NEGATIVE_CACHE_TTL", "60"))
+LOGIN_USER_CACHE_TTL = float(os.getenv("LOGIN_USER_CACHE_TTL", "300"))
+LOGIN_USER_CACHE_SIZE = int(os.getenv("LOGIN_USER_CACHE_SIZE", "10000"))
+
+
+class LoginGuard:
+    """Limites de falhas por username/IP e caches de busca de usuários."""
+
+    def __init__(self, store: LoginAttemptStore, max_per_user: int, max_per_ip: int,
+                 window: float, negative_ttl: float, user_cache_ttl: float,
+                 user_cache_size: int):
+        self.store = store
+        self.max_per_user = max_per_user
+        self.max_per_ip = max_per_ip
+        self.window = window
+        self.negative_ttl = negative_ttl
+        self.user_cache_ttl = user_cache_ttl
+        self.user_cache_size = user_cache_size
+        self._users: OrderedDict[str, tuple[float, str, dict]] = OrderedDict()
+        self._users_lock = threading.Lock()
+
+    @staticmethod
+    def _user_key(username: str) -> str:
+        # Normalizado: variações de maiúsculas não escapam do limite
+        return f"user:{normalize_username(username)}"
+
+    @staticmethod
+    def _ip_key(ip: str) -> str:
+        return f"ip:{ip}"
+
+    @staticmethod
+    def _missing_key(username: str) -> str:
+        # Exato: o login compara o username exatamente como foi registrado
+        return f"missing:{username}"
+
+    def retry_after(self, username: str, ip: str) -> float:
+        """
+        Retorna quantos segundos faltam para o username/IP poder tentar de novo.
+
+        Returns:
+            float: 0 se a tentativa pode ser processada
+        """
+        wait = 0.0
+        for key, limit in ((self._user_key(username), self.max_per_user),
+                           (self._ip_key(ip), self.max_per_ip)):
+            count, retry = self.store.window_state(key, self.window)
+            if count >= limit:
+                wait = max(wait, retry)
+        return wait
+
+    def record_failure(self, username: str, ip: str) -> None:
+        """Registra uma tentativa malsucedida para o username e para o IP."""
+        self.store.hit(self._user_key(username), self.window)
+        self.store.hit(self._ip_key(ip), self.window)
+
+    def record_success(self, username: str) -> None:
+        """Zera as falhas do username após um login bem-sucedido."""
+        self.store.clear(self._user_key(username))
+
+    def is_known_missing(self, username: str) -> bool:
+        """Indica se o username foi recentemente buscado e não existia."""
+        return self.store.is_marked(self._missing_key(username))
+
+    def remember_missing(self, username: str) -> None:
+        """Guarda no cache negativo que o username não existe."""
+        self.store.mark(self._missing_key(username), self.negative_ttl)
+
+    def forget_missing(self, username: str) -> None:
+        """Remove o username do cache negativo (chamado ao registrá-lo)."""
+        self.store.unmark(self._missing_key(username))
+
+    async def _call(self, method, *args):
+        if self.store.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def retry_after_async(self, username: str, ip: str) -> float:
+        """Versão assíncrona de retry_after()."""
+        return await self._call(self.retry_after, username, ip)
+
+    async def record_failure_async(self, username: str, ip: str) -> None:
+        """Versão assíncrona de record_failure()."""
+        await self._call(self.record_failure, username, ip)
+
+    async def record_success_async(self, username: str) -> None:
+        """Versão assíncrona de record_success()."""
+        await self._call(self.record_success, username)
+
+    async def is_known_missing_async(self, username: str) -> bool:
+        """Versão assíncrona de is_known_missing()."""
+        return await self._call(self.is_known_missing, username)
+
+    async def remember_missing_async(self, username: str) -> None:
+        """Versão assíncrona de remember_missing()."""
+        await self._call(self.remember_missing, username)
+
+    async def forget_missing_async(self, username: str) -> None:
+        """Versão assíncrona de forget_missing()."""
+        await self._call(self.forget_missing, username)
+
+    def get_cached_user(self, username: str) -> tuple[str, dict] | None:
+        """Retorna (user_id, dados) do cache positivo ou None."""
+        with self._users_lock:
+            entry = self._users.get(username)
+            if entry is None:
+                return None
+            expires_at, user_id, user = entry
+            if expires_at <= time.monotonic():
+                del self._users[username]
+                return None
+            self._users.move_to_end(username)
+            return user_id, user
+
+    def cache_user(self, username: str, user_id: str, user: dict) -> None:
+        """Guarda um usuário encontrado no cache positivo."""
+        with self._users_lock:
+            self._users[username] = (time.monotonic() + self.user_cache_ttl, user_id, user)
+            self._users.move_to_end(username)
+            while len(self._users) > self.user_cache_size:
+                self._users.popitem(last=False)
+
+
+# Instância utilizada pela rota de login
+login_guard = LoginGuard(
+    login_attempt_store,
+    max_per_user=LOGIN_MAX_FAILURES_PER_USER,
+    max_per_ip=LOGIN_MAX_FAILURES_PER_IP,
+    window=LOGIN_FAILURE_WINDOW,
+    negative_ttl=LOGIN_NEGATIVE_CACHE_TTL,
+    user_cache_ttl=LOGIN_USER_CACHE_TTL,
+    user_cache_size=LOGIN_USER_CACHE_SIZE
+)
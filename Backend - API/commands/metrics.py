@@ -0,0 +1,390 @@
+"""
+MidianText RPG - Métricas da API (formato Prometheus)
+======================================================
+
+Este módulo coleta as métricas expostas em GET /metrics:
+    - Latência por rota (histograma) e contagem por rota/status
+    - Tamanho do corpo das requisições e respostas (histogramas)
+    - Operações de armazenamento: contagem e duração por repositório/método
+    - Operações de armazenamento por requisição (histograma por rota): rotas
+      que fazem várias leituras para uma única resposta (N+1) aparecem aqui
+    - Estado do pool de hashing de senhas
+
+Como Funciona:
+    - MetricsMiddleware mede cada requisição e cria um RequestStats em uma
+      contextvar, visível também nas threads do FastAPI
+    - instrument_storage() envolve os repositórios de commands/database.py:
+      cada chamada de uma operação de dados (lista OPERATIONS da interface)
+      é cronometrada e somada ao RequestStats atual; os demais métodos
+      (ex: set_expire_handler) passam sem medição
+    - Resultado (rótulo outcome) das operações: ok; error (falha do
+      armazenamento ou personagem inexistente); rejected (exceção lançada
+      pelo callback recebido, ex: o mutator de update_character recusando
+      uma compra sem ouro; nada é gravado)
+    - As rotas são identificadas pelo template (ex: /missions/{mission_id}),
+      mantendo o número de séries limitado
+
+Example:
+    >>> repository = instrument_storage(
+    ...     LocalCharacterRepository(store), "characters", CharacterRepository.OPERATIONS
+    ... )
+    >>> repository.get_characters("abc")  # contado em midiantext_storage_*
+
+Notes:
+    Os valores ficam na memória de cada processo: com vários workers, cada
+    um expõe as próprias métricas (o Prometheus deve coletar por worker ou
+    via agregador).
+
+Dependencies: nenhuma além do FastAPI/Starlette
+"""
+
+import functools
+import inspect
+import threading
+import time
+from contextvars import ContextVar
+
+from commands.func_senhas import get_hash_pool_stats
+from commands.structured_logging import get_dropped_events
+
+# Limites dos histogramas
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000)
+STORAGE_CALLS_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21)
+
+# Rótulo das requisições que não correspondem a nenhuma rota (ex: 404)
+UNMATCHED_ROUTE = "unmatched"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """Contador monotônico com rótulos."""
+
+    def __init__(self, name: str, help_text: str, label_names: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {_format_number(value)}")
+        return lines
+
+
+class Histogram:
+    """Histograma cumulativo com rótulos (buckets fixos)."""
+
+    def __init__(self, name: str, help_text: str, label_names: tuple, buckets: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        # rótulos → [contagem por bucket..., soma, total]
+        self._values: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float) -> None:
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, list(series)) for labels, series in self._values.items())
+        for labels, series in items:
+            for bound, count in zip(self.buckets, series):
+                le = _format_labels(self.label_names, labels, f'le="{_format_number(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {count}")
+            inf = _format_labels(self.label_names, labels, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{inf} {series[-1]}")
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_number(series[-2])}")
+            lines.append(f"{self.name}_count{label_text} {series[-1]}")
+        return lines
+
+
+HTTP_REQUESTS = Counter(
+    "midiantext_http_requests_total",
+    "Requisições HTTP finalizadas.",
+    ("method", "route", "status")
+)
+HTTP_DURATION = Histogram(
+    "midiantext_http_request_duration_seconds",
+    "Latência das requisições HTTP.",
+    ("method", "route"),
+    LATENCY_BUCKETS
+)
+HTTP_REQUEST_SIZE = Histogram(
+    "midiantext_http_request_size_bytes",
+    "Tamanho do corpo das requisições HTTP.",
+    ("method", "route"),
+    SIZE_BUCKETS
+)
+HTTP_RESPONSE_SIZE = Histogram(
+    "midiantext_http_response_size_bytes",
+    "Tamanho do corpo das respostas HTTP.",
+    ("method", "route"),
+    SIZE_BUCKETS
+)
+STORAGE_CALLS = Counter(
+    "midiantext_storage_calls_total",
+    "Operações de armazenamento por repositório, método e resultado.",
+    ("repository", "operation", "outcome")
+)
+STORAGE_DURATION = Histogram(
+    "midiantext_storage_call_duration_seconds",
+    "Duração das operações de armazenamento.",
+    ("repository", "operation"),
+    LATENCY_BUCKETS
+)
+STORAGE_CALLS_PER_REQUEST = Histogram(
+    "midiantext_storage_calls_per_request",
+    "Operações de armazenamento feitas por uma única requisição.",
+    ("method", "route"),
+    STORAGE_CALLS_BUCKETS
+)
+STORAGE_TIME_PER_REQUEST = Histogram(
+    "midiantext_storage_seconds_per_request",
+    "Tempo total em operações de armazenamento por requisição.",
+    ("method", "route"),
+    LATENCY_BUCKETS
+)
+
+METRICS = (
+    HTTP_REQUESTS, HTTP_DURATION, HTTP_REQUEST_SIZE, HTTP_RESPONSE_SIZE,
+    STORAGE_CALLS, STORAGE_DURATION, STORAGE_CALLS_PER_REQUEST, STORAGE_TIME_PER_REQUEST
+)
+
+
+class RequestStats:
+    """Operações de armazenamento acumuladas durante uma requisição."""
+
+    __slots__ = ("storage_calls", "storage_seconds")
+
+    def __init__(self):
+        self.storage_calls = 0
+        self.storage_seconds = 0.0
+
+
+# Objeto mutável: as cópias de contexto feitas pelas threads do FastAPI
+# continuam apontando para o mesmo RequestStats
+_request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def _record_storage_call(repository: str, operation: str, elapsed: float, outcome: str) -> None:
+    STORAGE_CALLS.inc((repository, operation, outcome))
+    STORAGE_DURATION.observe((repository, operation), elapsed)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.storage_calls += 1
+        stats.storage_seconds += elapsed
+
+
+def _guard_callbacks(args: tuple, kwargs: dict, raised: list) -> tuple[tuple, dict]:
+    """Envolve os callbacks recebidos para anotar as exceções lançadas por eles."""
+    def guard(callback):
+        @functools.wraps(callback)
+        def guarded(*callback_args, **callback_kwargs):
+            try:
+                return callback(*callback_args, **callback_kwargs)
+            except Exception as error:
+                raised.append(error)
+                raise
+        return guarded
+
+    args = tuple(guard(arg) if callable(arg) else arg for arg in args)
+    kwargs = {key: guard(arg) if callable(arg) else arg for key, arg in kwargs.items()}
+    return args, kwargs
+
+
+def _failure_outcome(error: Exception, raised: list) -> str:
+    return "rejected" if any(error is callback_error for callback_error in raised) else "error"
+
+
+class InstrumentedStorage:
+    """Proxy que mede as operações de dados de um repositório/armazenamento."""
+
+    def __init__(self, target, name: str, operations: frozenset):
+        self._target = target
+        self._name = name
+        self._operations = operations
+
+    def __getattr__(self, attribute: str):
+        value = getattr(self._target, attribute)
+        if attribute not in self._operations:
+            return value
+
+        name = self._name
+        if inspect.iscoroutinefunction(value):
+            @functools.wraps(value)
+            async def timed_async(*args, **kwargs):
+                raised = []
+                args, kwargs = _guard_callbacks(args, kwargs, raised)
+                start = time.perf_counter()
+                outcome = "error"
+                try:
+                    result = await value(*args, **kwargs)
+                    outcome = "ok"
+                    return result
+                except Exception as error:
+                    outcome = _failure_outcome(error, raised)
+                    raise
+                finally:
+                    _record_storage_call(name, attribute, time.perf_counter() - start, outcome)
+            return timed_async
+
+        @functools.wraps(value)
+        def timed(*args, **kwargs):
+            raised = []
+            args, kwargs = _guard_callbacks(args, kwargs, raised)
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                result = value(*args, **kwargs)
+                outcome = "ok"
+                return result
+            except Exception as error:
+                outcome = _failure_outcome(error, raised)
+                raise
+            finally:
+                _record_storage_call(name, attribute, time.perf_counter() - start, outcome)
+        return timed
+
+
+def instrument_storage(target, name: str, operations: frozenset) -> InstrumentedStorage:
+    """
+    Envolve um repositório para que suas operações de dados entrem nas métricas.
+
+    Args:
+        target: Repositório ou armazenamento (síncrono ou assíncrono)
+        name (str): Rótulo `repository` das métricas (ex: "characters")
+        operations (frozenset): Métodos medidos, em geral o OPERATIONS da
+                                interface (ex: CharacterRepository.OPERATIONS)
+
+    Returns:
+        InstrumentedStorage: Proxy com os mesmos métodos e atributos
+    """
+    return InstrumentedStorage(target, name, operations)
+
+
+class MetricsMiddleware:
+    """Middleware ASGI que registra latência, status, tamanhos e armazenamento por rota."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status = 500
+        request_size = 0
+        response_size = 0
+
+        async def receive_wrapper():
+            nonlocal request_size
+            message = await receive()
+            if message["type"] == "http.request":
+                request_size += len(message.get("body", b""))
+            return message
+
+        async def send_wrapper(message):
+            nonlocal status, response_size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            _request_stats.reset(token)
+            elapsed = time.perf_counter() - start
+
+            # O roteador do FastAPI grava a rota encontrada no scope
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or UNMATCHED_ROUTE
+            labels = (scope["method"], route_path)
+
+            HTTP_REQUESTS.inc(labels + (str(status),))
+            HTTP_DURATION.observe(labels, elapsed)
+            HTTP_REQUEST_SIZE.observe(labels, request_size)
+            HTTP_RESPONSE_SIZE.observe(labels, response_size)
+            STORAGE_CALLS_PER_REQUEST.observe(labels, stats.storage_calls)
+            STORAGE_TIME_PER_REQUEST.observe(labels, stats.storage_seconds)
+
+
+def _render_hash_pool() -> list[str]:
+    stats = get_hash_pool_stats()
+    gauges = (
+        ("midiantext_password_hash_workers", "Tamanho do pool de hashing de senhas.", "workers"),
+        ("midiantext_password_hash_max_pending", "Limite de cálculos em andamento + fila.", "max_pending"),
+        ("midiantext_password_hash_in_flight", "Cálculos de hash em andamento ou na fila.", "in_flight"),
+        ("midiantext_password_hash_queue_depth", "Cálculos aguardando um worker livre.", "queue_depth"),
+    )
+    lines = []
+    for name, help_text, key in gauges:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {stats[key]}"]
+    lines += [
+        "# HELP midiantext_password_hash_rejected_total Cálculos recusados por saturação (503).",
+        "# TYPE midiantext_password_hash_rejected_total counter",
+        f"midiantext_password_hash_rejected_total {stats['rejected']}",
+        "# HELP midiantext_password_hash_pool_rebuilds_total Pools de hashing quebrados descartados e recriados.",
+        "# TYPE midiantext_password_hash_pool_rebuilds_total counter",
+        f"midiantext_password_hash_pool_rebuilds_total {stats['rebuilds']}"
+    ]
+    return lines
+
+
+def render_metrics() -> str:
+    """
+    Gera todas as métricas no formato de texto do Prometheus (versão 0.0.4).
+
+    Returns:
+        str: Corpo da resposta de GET /metrics
+    """
+    lines = []
+    for metric in METRICS:
+        lines += metric.render()
+    lines += _render_hash_pool()
+    lines += [
+        "# HELP midiantext_log_events_dropped_total Eventos de log descartados por fila cheia.",
+        "# TYPE midiantext_log_events_dropped_total counter",
+        f"midiantext_log_events_dropped_total {get_dropped_events()}"
+    ]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,300 @@
+"""
+MidianText RPG - Grafo Compilado de Missões
+============================================
+
+Este módulo compila as missões de `missions_data.py` uma única vez, na
+inicialização, em uma estrutura indexada usada pelas rotas de missão.
+A cada recarga dos arquivos de conteúdo (commands/game_data.py), um novo
+catálogo é compilado por inteiro e publicado em uma única atribuição.
+
+Validação (a missão inteira é recusada se houver erro):
+    - Toda saída aponta para uma sala existente ou para "fim"
+    - Toda sala é alcançável a partir da sala inicial
+    - A sala inicial alcança a saída "fim"
+    - IDs de inimigos e de tesouros são únicos dentro da missão (o progresso
+      da sessão guarda apenas os IDs)
+
+O que é pré-calculado:
+    - Índices id → inimigo e id → tesouro por sala (busca O(1))
+    - Distância (em movimentos) de cada sala até a saída "fim" e o conjunto
+      de tesouros alcançáveis a partir dela (BFS no grafo de saídas)
+    - Fragmento estático de cada sala (id, nome, descrição, saídas), montado
+      uma vez e reutilizado em todas as respostas
+    - Resumo e detalhes de cada missão (listagem e GET /missions/{id})
+
+Progresso do Jogador:
+    O progresso continua sendo salvo na sessão como listas (JSON), mas as
+    rotas convertem essas listas em sets ao carregar a sessão, e as salas
+    são montadas por CompiledRoom.view() a partir dos sets.
+
+Example:
+    >>> mission = get_compiled_mission("tumbas_farao")
+    >>> room = mission.rooms[mission.starting_room]
+    >>> room.view(defeated=set(), collected=set())["name"]
+    'Entrada da Tumba'
+"""
+
+from collections import deque
+from typing import NamedTuple
+
+from commands.missions_data import MISSIONS, MISSIONS_VERSION
+
+# Saída especial que conclui a missão
+EXIT_ROOM = "fim"
+
+
+class CompiledRoom:
+    """Sala compilada: template imutável com índices e fragmento estático."""
+
+    __slots__ = (
+        "id", "name", "description", "exits",
+        "enemies", "treasures", "enemies_by_id", "treasures_by_id",
+        "distance_to_exit", "reachable_treasures", "_static_view"
+    )
+
+    def __init__(self, room: dict):
+        self.id = room["id"]
+        self.name = room["name"]
+        self.description = room["description"]
+        self.exits = dict(room["exits"])
+        self.enemies = tuple(room.get("enemies", []))
+        self.treasures = tuple(room.get("treasures", []))
+        self.enemies_by_id = {enemy["id"]: enemy for enemy in self.enemies}
+        self.treasures_by_id = {treasure["id"]: treasure for treasure in self.treasures}
+        # Preenchidos por CompiledMission a partir do grafo completo
+        self.distance_to_exit: int | None = None
+        self.reachable_treasures: frozenset = frozenset()
+        self._static_view = {
+            "id": self.id,
+            "name": self.name,
+            "description": self.description,
+            "exits": self.exits
+        }
+
+    def view(self, defeated: set, collected: set) -> dict:
+        """
+        Monta a sala vista pelo jogador.
+
+        Args:
+            defeated (set): IDs dos inimigos já derrotados na missão
+            collected (set): IDs dos tesouros já coletados na missão
+
+        Returns:
+            dict: Sala com id, name, description, enemies, treasures e exits
+        """
+        view = dict(self._static_view)
+        view["enemies"] = [e for e in self.enemies if e["id"] not in defeated]
+        view["treasures"] = [t for t in self.treasures if t["id"] not in collected]
+        return view
+
+
+class CompiledMission:
+    """Missão compilada: metadados, salas indexadas e respostas pré-montadas."""
+
+    __slots__ = (
+        "id", "name", "description", "difficulty", "min_level",
+        "rewards", "starting_room", "rooms", "summary", "info"
+    )
+
+    def __init__(self, mission: dict):
+        self.id = mission["id"]
+        self.name = mission["name"]
+        self.description = mission["description"]
+        self.difficulty = mission["difficulty"]
+        self.min_level = mission["min_level"]
+        self.rewards = mission["rewards"]
+        self.starting_room = mission["starting_room"]
+        self.rooms = {
+            room_id: CompiledRoom(room)
+            for room_id, room in mission["rooms"].items()
+        }
+
+        distances = _distances_to_exit(self.rooms)
+        for room_id, room in self.rooms.items():
+            room.distance_to_exit = distances.get(room_id)
+            room.reachable_treasures = frozenset(
+                treasure_id
+                for reachable_id in _reachable_rooms(self.rooms, room_id)
+                for treasure_id in self.rooms[reachable_id].treasures_by_id
+            )
+
+        # Usado em GET /missions e GET /missions/{id}
+        self.summary = {
+            "id": self.id,
+            "name": self.name,
+            "description": self.description,
+            "difficulty": self.difficulty,
+            "min_level": self.min_level,
+            "rewards": self.rewards
+        }
+        # Usado em POST /missions/start
+        self.info = {
+            "id": self.id,
+            "name": self.name,
+            "description": self.description,
+            "difficulty": self.difficulty
+        }
+
+
+def _reachable_rooms(rooms: dict, start: str) -> set[str]:
+    """Salas alcançáveis a partir de `start` (inclusive), sem contar "fim"."""
+    reachable = {start}
+    queue = deque([start])
+    while queue:
+        for target in rooms[queue.popleft()].exits.values():
+            if target in rooms and target not in reachable:
+                reachable.add(target)
+                queue.append(target)
+    return reachable
+
+
+def _distances_to_exit(rooms: dict) -> dict[str, int]:
+    """Menor número de movimentos de cada sala até "fim" (BFS no grafo invertido)."""
+    incoming: dict[str, list[str]] = {}
+    for room_id, room in rooms.items():
+        for target in room.exits.values():
+            incoming.setdefault(target, []).append(room_id)
+
+    distances = {}
+    queue = deque((room_id, 1) for room_id in incoming.get(EXIT_ROOM, []))
+    while queue:
+        room_id, distance = queue.popleft()
+        if room_id in distances:
+            continue
+        distances[room_id] = distance
+        queue.extend((source, distance + 1) for source in incoming.get(room_id, []))
+    return distances
+
+
+def validate_mission(mission_id: str, mission: dict) -> list[str]:
+    """
+    Verifica o grafo de salas e os IDs de uma missão.
+
+    Args:
+        mission_id (str): ID da missão (usado nas mensagens)
+        mission (dict): Missão no formato de MISSIONS
+
+    Returns:
+        list[str]: Erros encontrados (vazia se a missão é válida)
+    """
+    rooms = mission["rooms"]
+    errors = []
+
+    for room_id, room in rooms.items():
+        for direction, target in room["exits"].items():
+            if target != EXIT_ROOM and target not in rooms:
+                errors.append(
+                    f"Missão '{mission_id}': saída '{direction}' da sala '{room_id}' "
+                    f"aponta para a sala inexistente '{target}'"
+                )
+
+    for kind in ("enemies", "treasures"):
+        seen = set()
+        for room in rooms.values():
+            for entry in room.get(kind, []):
+                if entry["id"] in seen:
+                    errors.append(f"Missão '{mission_id}': id '{entry['id']}' repetido em {kind}")
+                seen.add(entry["id"])
+
+    starting_room = mission["starting_room"]
+    if starting_room not in rooms:
+        errors.append(f"Missão '{mission_id}': sala inicial '{starting_room}' não existe")
+        return errors
+
+    # Apenas saídas válidas entram na busca; as inválidas já foram reportadas
+    reachable = {starting_room}
+    exit_reached = False
+    queue = deque([starting_room])
+    while queue:
+        for target in rooms[queue.popleft()]["exits"].values():
+            if target == EXIT_ROOM:
+                exit_reached = True
+            elif target in rooms and target not in reachable:
+                reachable.add(target)
+                queue.append(target)
+
+    errors.extend(
+        f"Missão '{mission_id}': sala '{room_id}' não é alcançável a partir de '{starting_room}'"
+        for room_id in rooms if room_id not in reachable
+    )
+    if not exit_reached:
+        errors.append(f"Missão '{mission_id}': a sala inicial não alcança a saída '{EXIT_ROOM}'")
+    return errors
+
+
+def compile_missions(missions: dict) -> dict[str, CompiledMission]:
+    """
+    Valida e compila todas as missões de um catálogo.
+
+    Args:
+        missions (dict): Catálogo no formato de MISSIONS
+
+    Returns:
+        dict[str, CompiledMission]: Missões compiladas indexadas por ID
+
+    Raises:
+        ValueError: Alguma missão tem grafo ou IDs inválidos (nenhuma é compilada)
+    """
+    errors = [
+        error
+        for mission_id, mission in missions.items()
+        for error in validate_mission(mission_id, mission)
+    ]
+    if errors:
+        raise ValueError("Catálogo de missões inválido:\n" + "\n".join(errors))
+
+    return {
+        mission_id: CompiledMission(mission)
+        for mission_id, mission in missions.items()
+    }
+
+
+class MissionCatalog(NamedTuple):
+    """Versão publicada do catálogo de missões."""
+    version: int
+    missions: dict[str, CompiledMission]
+    summaries: list[dict]
+
+
+def compile_catalog(missions: dict, version: int) -> MissionCatalog:
+    """
+    Compila um catálogo completo sem publicá-lo (ver publish_catalog()).
+
+    Args:
+        missions (dict): Catálogo no formato de MISSIONS
+        version (int): Versão do arquivo de origem
+
+    Returns:
+        MissionCatalog: Missões compiladas e resumos pré-montados
+    """
+    compiled = compile_missions(missions)
+    return MissionCatalog(
+        version=version,
+        missions=compiled,
+        summaries=[mission.summary for mission in compiled.values()]
+    )
+
+
+def publish_catalog(catalog: MissionCatalog) -> None:
+    """Torna um catálogo compilado o catálogo em uso (troca atômica)."""
+    global _catalog
+    _catalog = catalog
+
+
+# Compilado uma única vez na importação (inicialização da API)
+_catalog = compile_catalog(MISSIONS, MISSIONS_VERSION)
+
+
+def get_compiled_mission(mission_id: str) -> CompiledMission | None:
+    """Retorna a missão compilada ou None se mission_id não existir."""
+    return _catalog.missions.get(mission_id)
+
+
+def get_mission_summaries() -> list[dict]:
+    """Retorna a lista resumida (pré-montada) de todas as missões."""
+    return _catalog.summaries
+
+
+def get_missions_version() -> int:
+    """Retorna a versão do catálogo de missões em uso."""
+    return _catalog.version
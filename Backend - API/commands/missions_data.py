@@ -5,6 +5,10 @@ MidianText RPG - Banco de Dados de Missões
 Este módulo centraliza todas as missões disponíveis no jogo, incluindo estrutura de salas,
 inimigos, tesouros e sistema de progressão.
 
+As missões são definidas em commands/data/missions.json (versionado e validado
+com os modelos Mission/MissionRoom; ver commands/game_data.py) e podem ser
+atualizadas sem reiniciar a API.
+
 Estrutura de Dados:
     Cada missão contém:
         - Metadados: ID, nome, descrição, dificuldade, nível mínimo
@@ -31,7 +35,10 @@ Estrutura de Inimigo:
         "attack": int,       # Poder de ataque
         "defense": int,      # Defesa
         "gold_drop": int,    # Ouro dropado ao morrer
-        "exp_drop": int      # Experiência dropada ao morrer
+        "exp_drop": int,     # Experiência dropada ao morrer
+        "speed": int,        # Opcional: velocidade (padrão 0)
+        "level": int,        # Opcional: nível (padrão 1)
+        "color": str         # Opcional: verde | vermelho | azul | cinza
     }
 
 Estrutura de Tesouro:
@@ -55,7 +62,8 @@ Fluxo de Uso:
     5. Estado de visitação atualizado conforme progressão
 
 Design Patterns:
-    - Singleton: MISSIONS é dicionário global compartilhado
+    - Singleton: MISSIONS é dicionário global compartilhado (trocado por
+      inteiro a cada recarga dos arquivos)
     - Grafo: Salas conectadas por exits formam mapa navegável
     - Factory: Funções get_* retornam instâncias/views dos dados
 
@@ -67,130 +75,11 @@ Future Enhancements:
 
 """
 
-MISSIONS = {
-    "tumbas_farao": {
-        "id": "tumbas_farao",
-        "name": "Tumbas do Faraó",
-        "description": "Uma antiga tumba foi descoberta no deserto. Dizem que grandes tesouros e perigos aguardam aqueles corajosos o suficiente para explorá-la.",
-        "difficulty": "Médio",
-        "min_level": 1,
-        "rewards": {
-            "gold": 200,
-            "exp": 150,
-            "items": ["Amuleto do Faraó", "Poção de Cura"]
-        },
-        "rooms": {
-            "entrada": {
-                "id": "entrada",
-                "name": "Entrada da Tumba",
-                "description": "Você está na entrada de uma antiga tumba. Tochas iluminam fracamente as paredes cobertas de hieróglifos. O ar é pesado e úmido. Duas passagens se abrem à sua frente: uma à esquerda e outra à direita.",
-                "enemies": [],
-                "treasures": [],
-                "exits": {
-                    "esquerda": "sala_guardiao",
-                    "direita": "corredor_armadilhas"
-                },
-                "visited": False
-            },
-            "sala_guardiao": {
-                "id": "sala_guardiao",
-                "name": "Sala do Guardião",
-                "description": "Uma sala ampla com pilares de pedra. No centro, uma estátua de Anúbis observa silenciosamente. Ao se aproximar, a estátua ganha vida! Um Guardião Esquelético emerge das sombras.",
-                "enemies": [
-                    {
-                        "id": "guardiao_1",
-                        "name": "Guardião Esquelético",
-                        "hp": 30,
-                        "attack": 8,
-                        "defense": 5,
-                        "gold_drop": 50,
-                        "exp_drop": 40
-                    }
-                ],
-                "treasures": [
-                    {
-                        "id": "bau_1",
-                        "name": "Baú Antigo",
-                        "contents": {"gold": 75, "items": ["Poção de Cura"]}
-                    }
-                ],
-                "exits": {
-                    "frente": "camara_tesouro",
-                    "voltar": "entrada"
-                },
-                "visited": False
-            },
-            "corredor_armadilhas": {
-                "id": "corredor_armadilhas",
-                "name": "Corredor das Armadilhas",
-                "description": "Um corredor estreito com marcas no chão. Você nota pequenos buracos nas paredes. De repente, dardos envenenados começam a voar! Você precisa ser rápido.",
-                "enemies": [],
-                "treasures": [
-                    {
-                        "id": "bau_2",
-                        "name": "Baú Escondido",
-                        "contents": {"gold": 60, "items": ["Antídoto"]}
-                    }
-                ],
-                "exits": {
-                    "frente": "sala_escaravelhos",
-                    "voltar": "entrada"
-                },
-                "visited": False
-            },
-            "sala_escaravelhos": {
-                "id": "sala_escaravelhos",
-                "name": "Sala dos Escaravelhos",
-                "description": "O chão desta sala está coberto por milhares de escaravelhos dourados. Ao pisar neles, alguns ganham vida e atacam em enxame!",
-                "enemies": [
-                    {
-                        "id": "enxame_1",
-                        "name": "Enxame de Escaravelhos",
-                        "hp": 20,
-                        "attack": 6,
-                        "defense": 2,
-                        "gold_drop": 30,
-                        "exp_drop": 25
-                    }
-                ],
-                "treasures": [],
-                "exits": {
-                    "frente": "camara_tesouro",
-                    "voltar": "corredor_armadilhas"
-                },
-                "visited": False
-            },
-            "camara_tesouro": {
-                "id": "camara_tesouro",
-                "name": "Câmara do Tesouro",
-                "description": "Você finalmente chegou à câmara principal! Um sarcófago dourado repousa no centro, rodeado por pilhas de ouro e artefatos. Mas ao se aproximar, o Faraó Múmia desperta para proteger seu tesouro!",
-                "enemies": [
-                    {
-                        "id": "farao_mumia",
-                        "name": "Faraó Múmia",
-                        "hp": 50,
-                        "attack": 12,
-                        "defense": 8,
-                        "gold_drop": 150,
-                        "exp_drop": 100
-                    }
-                ],
-                "treasures": [
-                    {
-                        "id": "tesouro_principal",
-                        "name": "Sarcófago Dourado",
-                        "contents": {"gold": 300, "items": ["Amuleto do Faraó", "Poção de Cura", "Pergaminho Antigo"]}
-                    }
-                ],
-                "exits": {
-                    "saida": "fim"
-                },
-                "visited": False
-            }
-        },
-        "starting_room": "entrada"
-    }
-}
+from commands.game_data import read_mission_catalog
+
+# Catálogo lido de commands/data/missions.json. Nunca é alterado: uma recarga
+# (commands/game_data.py) substitui o dicionário inteiro
+MISSIONS_VERSION, MISSIONS = read_mission_catalog()
 
 
 def get_mission(mission_id: str) -> dict | None:
@@ -230,9 +119,10 @@ def get_mission(mission_id: str) -> dict | None:
         }
     
     Notes:
-        - Retorna cópia completa dos dados (todas as salas e metadados)
-        - Estado de visitação (visited) deve ser gerenciado pelo backend
-        - Dados de inimigos/tesouros são templates (instanciar por jogador)
+        - Retorna o template compartilhado (todas as salas e metadados), sem cópia
+        - O template NUNCA deve ser alterado: o progresso de cada jogador
+          (sala atual, inimigos derrotados, tesouros coletados) fica na sessão
+          da missão e é aplicado sobre o template ao montar as respostas
     """
     return MISSIONS.get(mission_id)
 
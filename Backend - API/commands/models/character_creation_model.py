@@ -3,6 +3,8 @@ from typing import Optional
 from datetime import datetime
 import uuid
 from .items_table import ItemTable
+from .stats import Stat, StatusView, stat_property
+from commands.combat_engine import color_multiplier
 
 class CharacterCreationRequest(BaseModel):
     name: str
@@ -52,26 +54,31 @@ class CharacterResponse(BaseModel):
     created_at: str
     
 class Character:
+    # Atributos (um único StatBlock; `status` e os campos de compatibilidade
+    # são visões dele, não cópias)
+    hp_max = stat_property(Stat.HP_MAX)
+    hp_tmp = stat_property(Stat.HP_TMP)
+    level = stat_property(Stat.LV)
+    strg = stat_property(Stat.STRG)
+    mag = stat_property(Stat.MAG)
+    spd = stat_property(Stat.SPD)
+    luck = stat_property(Stat.LUCK)
+    defe = stat_property(Stat.DEFE)
+    mov = stat_property(Stat.MOV)
+
     def __init__(self, name: str, character_class: str, class_instance, color: str = "cinza"):
         self.id = str(uuid.uuid4())
         self.name = name
         self.character_class = character_class
-        self.level = 1
         self.gold = 100  # Todo personagem novo recebe 100 moedas
         
         # Aplicar cor escolhida
         class_instance.put_color(color)
         
-        self.status = {
-            "hp_max": class_instance.hp_max,
-            "hp_atual": class_instance.hp_max,
-            "strg": class_instance.strg,
-            "mag": class_instance.mag,
-            "spd": class_instance.spd,
-            "luck": class_instance.luck,
-            "defe": class_instance.defe,
-            "mov": class_instance.mov
-        }
+        # Atributos da classe; personagem novo começa com HP cheio no nível 1
+        self.stats = class_instance.stats.copy()
+        self.hp_tmp = self.hp_max
+        self.level = 1
         
         # Itens iniciais baseados na classe
         self.itens = getattr(class_instance, 'starting_items', {}).copy()
@@ -79,39 +86,25 @@ class Character:
         # Habilidades da classe
         self.habilidades = getattr(class_instance, 'habilidades', [])
         self.color = color  # Cor do personagem
-        
-        # Manter compatibilidade com sistema antigo
-        self.hp_max = class_instance.hp_max
-        self.hp_tmp = class_instance.hp_max
-        self.strg = class_instance.strg
-        self.mag = class_instance.mag
-        self.spd = class_instance.spd
-        self.luck = class_instance.luck
-        self.defe = class_instance.defe
-        self.mov = class_instance.mov
         self.created_at = datetime.now().isoformat()
     
+    @property
+    def status(self) -> StatusView:
+        """
+        Atributos no formato salvo no banco ("hp_atual" = HP atual).
+
+        Visão do StatBlock: status["hp_atual"] = 5 altera hp_tmp. Chaves
+        fora desse formato levam a KeyError.
+        """
+        return StatusView(self.stats)
+    
     def calculate_damage_multiplier(self, target_color: str) -> float:
         """
         Calcula o multiplicador de dano baseado na vantagem de cor.
         Vermelho > Verde > Azul > Vermelho (como pedra, papel, tesoura)
         Cinza é neutro (sem vantagem nem desvantagem)
         """
-        if self.color == "cinza" or target_color == "cinza":
-            return 1.0  # Neutro
-        
-        advantages = {
-            "vermelho": "verde",  # Vermelho ganha do verde
-            "verde": "azul",      # Verde ganha do azul
-            "azul": "vermelho"    # Azul ganha do vermelho
-        }
-        
-        if advantages.get(self.color) == target_color:
-            return 1.5  # Vantagem: x1.5 de dano
-        elif advantages.get(target_color) == self.color:
-            return 0.75  # Desvantagem: reduz dano
-        else:
-            return 1.0  # Sem vantagem/desvantagem
+        return color_multiplier(self.color, target_color)
     
     def get_color_info(self) -> dict:
         """Retorna informações sobre a cor e suas vantagens."""
@@ -186,7 +179,7 @@ class Character:
         return {
             "classe": self.character_class,
             "level": self.level,
-            "status": self.status,
+            "status": dict(self.status),
             "itens": self.itens,
             "habilidades": self.habilidades,
             "color": self.color,
@@ -200,7 +193,7 @@ class Character:
             "name": self.name,
             "character_class": self.character_class,
             "level": self.level,
-            "status": self.status,
+            "status": dict(self.status),
             "itens": self.itens,
             "habilidades": self.habilidades,
             "color": self.color,
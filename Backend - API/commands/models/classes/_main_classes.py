@@ -1,29 +1,27 @@
+from ..stats import Stat, StatBlock, stat_property
+
+
 class MainClasses():
+    # Atributos guardados em um StatBlock (array compacto indexado por Stat)
+    hp_max = stat_property(Stat.HP_MAX)
+    hp_tmp = stat_property(Stat.HP_TMP)
+    lv = stat_property(Stat.LV)
+    strg = stat_property(Stat.STRG)
+    mag = stat_property(Stat.MAG)
+    spd = stat_property(Stat.SPD)
+    luck = stat_property(Stat.LUCK)
+    defe = stat_property(Stat.DEFE)
+    mov = stat_property(Stat.MOV)
+
     def __init__(self):
-        self.hp_max = 0
-        self.hp_tmp = 0
+        self.stats = StatBlock()
         self.lv = 1
-        self.strg = 0
-        self.mag = 0
-        self.spd = 0
-        self.luck = 0
-        self.defe = 0
-        self.mov = 0
         self.color = None
     
     def get_status(self):
-        return {
-            "hp_max": self.hp_max,
-            "hp_tmp": self.hp_tmp ,
-            "lv": self.lv,
-            "strg": self.strg,
-            "mag": self.mag,
-            "spd": self.spd,
-            "luck": self.luck,
-            "defe": self.defe,
-            "mov": self.mov,
-            "color": self.color
-        }
+        status = self.stats.to_dict()
+        status["color"] = self.color
+        return status
     
     def put_color(self, color):
         if color in ["verde", "vermelho", "azul", "cinza"]:
@@ -33,25 +31,22 @@ class MainClasses():
 
 
     def put_status(self, status, number):
-        if status in ["hp_max", "hp_tmp", "lv", "strg", "mag", "spd", "luck", "defe", "mov"]:
-            setattr(self, status, number)
+        stat = Stat.from_name(status)
+        if stat is not None:
+            self.stats[stat] = number
             return True  # retorna sucesso
         return False  # retorna falha se o status não existir
 
     def add_status(self, status, number):
-        if status in ["hp_max", "hp_tmp", "lv", "strg", "mag", "spd", "luck", "defe", "mov"]:
-            current = getattr(self, status)
-            if current is None:
-                current = 0
-            setattr(self, status, current + number)
+        stat = Stat.from_name(status)
+        if stat is not None:
+            self.stats.add(stat, number)
             return True
         return False
 
     def sub_status(self, status, number):
-        if status in ["hp_max", "hp_tmp", "lv", "strg", "mag", "spd", "luck", "defe", "mov"]:
-            current = getattr(self, status)
-            if current is None:
-                current = 0
-            setattr(self, status, current - number)
+        stat = Stat.from_name(status)
+        if stat is not None:
+            self.stats.add(stat, -number)
             return True
-        return False
\ No newline at end of file
+        return False
@@ -1,77 +1,123 @@
 # Tabela de Itens do Jogo
-from typing import Dict, Any
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, NamedTuple
+
+from commands.game_data import read_item_catalog
+from .stats import Stat, StatBlock
+from .classes.assassino_class import Assassino
+from .classes.arqueiro_class import Arqueiro
+from .classes.mage_class import Mago
+from .classes.soldado_class import Soldado
+
+# Classes jogáveis (os itens iniciais de cada uma ficam no arquivo da classe)
+CHARACTER_CLASSES = {
+    "Assassino": Assassino,
+    "Arqueiro": Arqueiro,
+    "Mago": Mago,
+    "Soldado": Soldado
+}
+
+
+class _ItemIndexes(NamedTuple):
+    """Versão do catálogo de itens e índices somente leitura sobre ela."""
+    version: int
+    items: MappingProxyType
+    by_type: MappingProxyType
+    by_class: MappingProxyType
+    starting_items: MappingProxyType
+    bonuses: MappingProxyType
+
 
 class ItemTable:
     """
     Catálogo centralizado de todos os itens existentes no sistema.
-    Este arquivo serve apenas como referência de todos os itens disponíveis.
+    Os itens são definidos em commands/data/items.json (ver commands/game_data.py).
     Os itens iniciais de cada classe estão definidos nos respectivos arquivos de classe.
     """
     
-    # Catálogo completo de itens do jogo
-    ALL_ITEMS = {
-        # Itens Consumíveis
-        "Poção de Cura": {
-            "tipo": "consumivel",
-            "efeito": "Restaura 25 HP",
-            "descricao": "Uma poção mágica que cura ferimentos menores",
-            "emoji": "🧪",
-            "valor": 50
-        },
-        "Fuga": {
-            "tipo": "consumivel", 
-            "efeito": "Permite escapar de qualquer combate",
-            "descricao": "Pergaminho mágico que permite fuga instantânea",
-            "emoji": "📜",
-            "valor": 100
-        },
-        
-        # Armas de Assassino
-        "Adagas Gêmeas": {
-            "tipo": "arma",
-            "efeito": "+3 Velocidade, +2 Sorte em combate",
-            "descricao": "Par de adagas afiadas e equilibradas, perfeitas para ataques rápidos",
-            "emoji": "🗡️",
-            "valor": 300,
-            "classe": "Assassino"
-        },
-        
-        # Armas de Arqueiro
-        "Arco Élfico": {
-            "tipo": "arma",
-            "efeito": "+4 Força, +2 Velocidade em combate",
-            "descricao": "Arco feito de madeira élfica, aumenta precisão e alcance",
-            "emoji": "🏹",
-            "valor": 350,
-            "classe": "Arqueiro"
-        },
-        
-        # Armas de Mago
-        "Cajado Arcano": {
-            "tipo": "arma",
-            "efeito": "+5 Magia, +1 Defesa mágica",
-            "descricao": "Cajado imbuído com cristais mágicos, amplifica poderes arcanos",
-            "emoji": "🔮",
-            "valor": 400,
-            "classe": "Mago"
-        },
-        
-        # Armaduras de Soldado
-        "Escudo de Ferro": {
-            "tipo": "armadura",
-            "efeito": "+4 Defesa, +2 HP máximo",
-            "descricao": "Escudo robusto forjado em ferro, oferece proteção superior",
-            "emoji": "🛡️",
-            "valor": 250,
-            "classe": "Soldado"
-        }
-    }
+    # Catálogo completo de itens do jogo, lido de commands/data/items.json
+    # (ver commands/game_data.py) e preenchido por publish()
+    ALL_ITEMS: Mapping[str, Dict[str, Any]] = MappingProxyType({})
+    VERSION: int = 0
     
-    @classmethod 
+    @classmethod
+    def build_indexes(cls, items: Dict[str, Dict[str, Any]], version: int) -> _ItemIndexes:
+        """
+        Valida um catálogo de itens e monta os índices usados nas consultas.
+
+        Nada é publicado aqui: use publish() com o resultado.
+
+        Args:
+            items: Catálogo {nome: item}
+            version: Versão do arquivo de origem
+
+        Returns:
+            _ItemIndexes: Catálogo e índices imutáveis
+
+        Raises:
+            ValueError: Item de classe desconhecida ou item inicial inexistente
+        """
+        errors = []
+        by_type: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        by_class: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        bonuses: Dict[str, StatBlock] = {}
+
+        for name, info in items.items():
+            by_type.setdefault(info.get("tipo"), {})[name] = info
+            if info.get("bonus"):
+                bonus = StatBlock()
+                for stat_name, amount in info["bonus"].items():
+                    stat = Stat.from_name(stat_name)
+                    if stat is None:
+                        errors.append(f"Item '{name}' tem bônus no atributo desconhecido '{stat_name}'")
+                    else:
+                        bonus[stat] = amount
+                bonuses[name] = bonus
+            item_class = info.get("classe")
+            if item_class is None:
+                continue
+            if item_class not in CHARACTER_CLASSES:
+                errors.append(f"Item '{name}' referencia a classe desconhecida '{item_class}'")
+            by_class.setdefault(item_class, {})[name] = info
+
+        starting_items = {}
+        for class_name, class_type in CHARACTER_CLASSES.items():
+            class_items = getattr(class_type(), "starting_items", {})
+            errors.extend(
+                f"Item inicial '{item_name}' da classe '{class_name}' não existe no catálogo"
+                for item_name in class_items if item_name not in items
+            )
+            starting_items[class_name] = MappingProxyType(dict(class_items))
+
+        if errors:
+            raise ValueError("Catálogo de itens inválido:\n" + "\n".join(errors))
+
+        return _ItemIndexes(
+            version=version,
+            items=MappingProxyType(items),
+            by_type=MappingProxyType({key: MappingProxyType(group) for key, group in by_type.items()}),
+            by_class=MappingProxyType({key: MappingProxyType(group) for key, group in by_class.items()}),
+            starting_items=MappingProxyType(starting_items),
+            bonuses=MappingProxyType(bonuses)
+        )
+
+    @classmethod
+    def publish(cls, indexes: _ItemIndexes) -> None:
+        """
+        Torna um catálogo validado por build_indexes() o catálogo em uso.
+
+        Os métodos de consulta leem apenas `_indexes`, trocado em uma única
+        atribuição: leitores concorrentes nunca veem versões misturadas.
+        """
+        cls._indexes = indexes
+        cls.ALL_ITEMS = indexes.items
+        cls.VERSION = indexes.version
+
+    @classmethod
     def get_starting_items(cls, character_class: str) -> Dict[str, int]:
         """
         Retorna os itens iniciais para uma classe específica.
-        NOTA: Este método agora busca os itens diretamente da instância da classe.
+        Os itens são definidos nos arquivos de classe e lidos uma única vez.
         
         Args:
             character_class: Nome da classe do personagem
@@ -79,24 +125,7 @@ class ItemTable:
         Returns:
             Dicionário com nome do item como chave e quantidade como valor
         """
-        # Importar as classes aqui para evitar import circular
-        from .classes.assassino_class import Assassino
-        from .classes.arqueiro_class import Arqueiro
-        from .classes.mage_class import Mago
-        from .classes.soldado_class import Soldado
-        
-        class_map = {
-            "Assassino": Assassino,
-            "Arqueiro": Arqueiro,
-            "Mago": Mago,
-            "Soldado": Soldado
-        }
-        
-        if character_class in class_map:
-            instance = class_map[character_class]()
-            return getattr(instance, 'starting_items', {})
-        
-        return {}
+        return dict(cls._indexes.starting_items.get(character_class, {}))
     
     @classmethod
     def get_item_info(cls, item_name: str) -> Dict[str, Any]:
@@ -109,7 +138,16 @@ class ItemTable:
         Returns:
             Dicionário com informações do item ou None se não encontrado
         """
-        return cls.ALL_ITEMS.get(item_name)
+        return cls._indexes.items.get(item_name)
+    
+    @classmethod
+    def get_item_bonus(cls, item_name: str) -> StatBlock | None:
+        """
+        Retorna o bônus de atributos de um item (pré-calculado) ou None.
+        
+        O StatBlock retornado é compartilhado: não deve ser alterado.
+        """
+        return cls._indexes.bonuses.get(item_name)
     
     @classmethod
     def get_all_items_by_type(cls, item_type: str) -> Dict[str, Dict[str, Any]]:
@@ -122,10 +160,7 @@ class ItemTable:
         Returns:
             Dicionário com itens do tipo especificado
         """
-        return {
-            name: info for name, info in cls.ALL_ITEMS.items() 
-            if info.get("tipo") == item_type
-        }
+        return dict(cls._indexes.by_type.get(item_type, {}))
     
     @classmethod
     def get_all_items_by_class(cls, character_class: str) -> Dict[str, Dict[str, Any]]:
@@ -138,10 +173,7 @@ class ItemTable:
         Returns:
             Dicionário com itens da classe especificada
         """
-        return {
-            name: info for name, info in cls.ALL_ITEMS.items() 
-            if info.get("classe") == character_class
-        }
+        return dict(cls._indexes.by_class.get(character_class, {}))
     
     @classmethod
     def get_items_summary(cls) -> Dict[str, Any]:
@@ -156,19 +188,19 @@ class ItemTable:
         armaduras = cls.get_all_items_by_type("armadura")
         
         summary = {
-            "total_itens": len(cls.ALL_ITEMS),
+            "total_itens": len(cls._indexes.items),
             "consumiveis": consumiveis,
             "armas": armas,
             "armaduras": armaduras,
-            "tipos_disponiveis": list(set(
-                item.get("tipo", "indefinido") 
-                for item in cls.ALL_ITEMS.values()
-            )),
-            "classes_com_itens": list(set(
-                item.get("classe", "comum") 
-                for item in cls.ALL_ITEMS.values()
-                if item.get("classe")
-            ))
+            "tipos_disponiveis": sorted(
+                tipo or "indefinido" for tipo in cls._indexes.by_type
+            ),
+            "classes_com_itens": sorted(cls._indexes.by_class)
         }
         
-        return summary
\ No newline at end of file
+        return summary
+
+
+# Carrega, valida e indexa o catálogo na importação (falha o startup se inválido)
+_version, _items = read_item_catalog()
+ItemTable.publish(ItemTable.build_indexes(_items, _version))
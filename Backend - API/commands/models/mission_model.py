@@ -1,13 +1,38 @@
-from pydantic import BaseModel
-from typing import List, Dict, Optional, Any
+from pydantic import BaseModel, Field
+from typing import List, Dict, Optional, Any, Literal
+
+class Enemy(BaseModel):
+    """Inimigo de uma sala (atributos lidos pelo motor de combate)"""
+    id: str
+    name: str
+    hp: int = Field(ge=1)
+    attack: int = Field(ge=0)
+    defense: int = Field(ge=0)
+    gold_drop: int = Field(default=0, ge=0)
+    exp_drop: int = Field(default=0, ge=0)
+    # Opcionais: sem eles o inimigo é cinza, nível 1 e velocidade 0
+    speed: Optional[int] = Field(default=None, ge=0)
+    level: Optional[int] = Field(default=None, ge=1)
+    color: Optional[Literal["verde", "vermelho", "azul", "cinza"]] = None
+
+class TreasureContents(BaseModel):
+    """Conteúdo de um tesouro"""
+    gold: int = Field(ge=0)
+    items: List[str] = []
+
+class Treasure(BaseModel):
+    """Baú/tesouro de uma sala"""
+    id: str
+    name: str
+    contents: TreasureContents
 
 class MissionRoom(BaseModel):
     """Representa uma sala/área da missão"""
     id: str
     name: str
     description: str
-    enemies: List[Dict[str, Any]] = []
-    treasures: List[Dict[str, Any]] = []
+    enemies: List[Enemy] = []
+    treasures: List[Treasure] = []
     exits: Dict[str, str]  # direção: id_da_sala
     visited: bool = False
 
@@ -39,8 +64,10 @@ class StartMissionRequest(BaseModel):
 class MissionActionRequest(BaseModel):
     character_name: str
     mission_id: str
-    action: str  # "move", "fight", "collect"
+    action: str  # "move", "fight", "fight_until_done", "collect"
     target: Optional[str] = None
+    # fight_until_done: limite de turnos (o servidor aplica o próprio teto)
+    max_rounds: Optional[int] = None
 
 class MissionActionResponse(BaseModel):
     success: bool
@@ -0,0 +1,169 @@
+# Bloco de Atributos (stats) de Classes, Personagens e Inimigos
+from array import array
+from collections.abc import MutableMapping
+from enum import IntEnum
+from typing import Mapping
+
+
+class Stat(IntEnum):
+    """Atributos de combate; o valor é a posição no StatBlock."""
+    HP_MAX = 0
+    HP_TMP = 1
+    LV = 2
+    STRG = 3
+    MAG = 4
+    SPD = 5
+    LUCK = 6
+    DEFE = 7
+    MOV = 8
+
+    @classmethod
+    def from_name(cls, name: str) -> "Stat | None":
+        """Converte o nome usado na API/banco ("hp_max", "strg"...) ou None."""
+        return _STAT_BY_NAME.get(name)
+
+
+_STAT_BY_NAME = {stat.name.lower(): stat for stat in Stat}
+
+# Nomes alternativos aceitos em from_mapping() (Character.status usa "hp_atual")
+_STAT_ALIASES = {**_STAT_BY_NAME, "hp_atual": Stat.HP_TMP}
+
+_STAT_COUNT = len(Stat)
+
+# Campos de Character.status, na ordem salva no banco
+STATUS_FIELDS = {
+    "hp_max": Stat.HP_MAX,
+    "hp_atual": Stat.HP_TMP,
+    "strg": Stat.STRG,
+    "mag": Stat.MAG,
+    "spd": Stat.SPD,
+    "luck": Stat.LUCK,
+    "defe": Stat.DEFE,
+    "mov": Stat.MOV
+}
+
+
+class StatBlock:
+    """
+    Atributos em um array compacto de inteiros indexado por Stat.
+
+    Acesso O(1) por Stat (bloco[Stat.STRG]) ou por nome (bloco["strg"]);
+    nomes desconhecidos levam a KeyError.
+    """
+
+    __slots__ = ("values",)
+
+    def __init__(self, values=None):
+        self.values = array("i", values if values is not None else [0] * _STAT_COUNT)
+        if len(self.values) != _STAT_COUNT:
+            raise ValueError(f"StatBlock exige {_STAT_COUNT} valores")
+
+    @staticmethod
+    def _index(stat) -> int:
+        if isinstance(stat, Stat):
+            return stat
+        index = _STAT_BY_NAME.get(stat)
+        if index is None:
+            raise KeyError(stat)
+        return index
+
+    def __getitem__(self, stat) -> int:
+        return self.values[self._index(stat)]
+
+    def __setitem__(self, stat, value: int) -> None:
+        self.values[self._index(stat)] = value
+
+    def add(self, stat, amount: int) -> None:
+        """Soma amount ao atributo (use valores negativos para subtrair)."""
+        self.values[self._index(stat)] += amount
+
+    def copy(self) -> "StatBlock":
+        return StatBlock(self.values)
+
+    def to_dict(self) -> dict:
+        """Retorna {nome: valor} com os nomes em minúsculas ("hp_max", "strg"...)."""
+        return {stat.name.lower(): self.values[stat] for stat in Stat}
+
+    @classmethod
+    def from_mapping(cls, values: Mapping) -> "StatBlock":
+        """
+        Monta o bloco a partir de um dicionário de atributos por nome.
+
+        Aceita o formato de Character.status ("hp_atual") e o de
+        MainClasses.get_status() ("hp_tmp"); nomes ausentes ficam 0 e
+        chaves que não são atributos (ex: "color") são ignoradas.
+        """
+        block = cls()
+        for name, value in values.items():
+            stat = _STAT_ALIASES.get(name)
+            if stat is not None and value is not None:
+                block.values[stat] = int(value)
+        return block
+
+    @classmethod
+    def from_enemy(cls, enemy: Mapping) -> "StatBlock":
+        """
+        Monta o bloco de um inimigo das missões (hp, attack, defense, speed).
+
+        attack ocupa STRG e defense ocupa DEFE, para que inimigos e
+        personagens usem as mesmas fórmulas de combate.
+        """
+        block = cls()
+        values = block.values
+        values[Stat.HP_MAX] = values[Stat.HP_TMP] = enemy.get("hp", 0)
+        values[Stat.LV] = enemy.get("level", 1)
+        values[Stat.STRG] = enemy.get("attack", 0)
+        values[Stat.SPD] = enemy.get("speed", 0)
+        values[Stat.DEFE] = enemy.get("defense", 0)
+        return block
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, StatBlock) and self.values == other.values
+
+    def __repr__(self) -> str:
+        return f"StatBlock({self.to_dict()})"
+
+
+class StatusView(MutableMapping):
+    """
+    Visão {nome: valor} de um StatBlock no formato de Character.status.
+
+    Leituras e escritas vão direto ao bloco (status["hp_atual"] = 5 altera
+    o HP atual). As chaves são fixas: nomes fora de STATUS_FIELDS levam a
+    KeyError e nenhuma chave pode ser removida. Use dict(view) para gravar.
+    """
+
+    __slots__ = ("block",)
+
+    def __init__(self, block: StatBlock):
+        self.block = block
+
+    def __getitem__(self, name: str) -> int:
+        return self.block.values[STATUS_FIELDS[name]]
+
+    def __setitem__(self, name: str, value: int) -> None:
+        self.block.values[STATUS_FIELDS[name]] = value
+
+    def __delitem__(self, name: str) -> None:
+        raise TypeError("Atributos de status não podem ser removidos")
+
+    def __iter__(self):
+        return iter(STATUS_FIELDS)
+
+    def __len__(self) -> int:
+        return len(STATUS_FIELDS)
+
+    def __repr__(self) -> str:
+        return f"StatusView({dict(self)})"
+
+
+def stat_property(stat: Stat) -> property:
+    """Propriedade que lê/grava um atributo no StatBlock `self.stats`."""
+
+    def getter(self) -> int:
+        return self.stats.values[stat]
+
+    def setter(self, value: int) -> None:
+        self.stats.values[stat] = value
+
+    return property(getter, setter, doc=f"Atributo {stat.name.lower()} (em self.stats)")
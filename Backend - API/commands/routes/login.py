@@ -18,9 +18,9 @@ Segurança:
 Fluxo de Registro:
     1. Cliente envia username + password
     2. Validações de comprimento (username ≤ 14, password 6-14)
-    3. Verificação de username duplicado
+    3. Verificação de username duplicado (índice, sem distinção de maiúsculas)
     4. Geração de salt + hash da senha
-    5. Criação de documento no Firebase (usuarios)
+    5. Criação do usuário e do índice de username (mesma transação)
     6. Inicialização de lista de personagens vazia
     7. Retorno de confirmação
 
@@ -45,10 +45,17 @@ Estrutura de Dados:
             "personagens": []      # Lista de personagens (inicialmente vazia)
         }
 
+Concorrência:
+    As rotas são assíncronas. O hashing PBKDF2 roda no pool dedicado de
+    func_senhas e os acessos ao banco em threads (run_in_threadpool), então
+    uma rajada de logins não bloqueia os demais endpoints.
+
 HTTP Status Codes:
     - 200: Operação bem-sucedida
     - 400: Validação falhou (username/password inválidos ou duplicados)
     - 401: Credenciais incorretas (login falhou)
+    - 429: Muitas tentativas falhas para o username ou IP (login_guard)
+    - 503: Pool de hashing saturado (tente novamente em instantes)
 
 Dependencies:
     - FastAPI: Framework web
@@ -59,18 +66,34 @@ Dependencies:
 
 """
 
-from fastapi import APIRouter, HTTPException
-from commands.database import usuarios_collection, personagens_collection
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from commands.database import user_repository, character_repository
 from commands.models.user_model import Usuario
-from commands.func_senhas import hash_senha, verificar_senha
+from commands.func_senhas import (
+    PasswordHashingBusyError,
+    hash_senha_async,
+    verificar_senha_async
+)
 from commands.key_manager import generate_key
+from commands.login_guard import login_guard
+from commands.storage.base import DuplicateUsernameError
 
 router = APIRouter()
 
 
+def _hashing_busy() -> HTTPException:
+    """Resposta 503 para quando o pool de hashing está saturado."""
+    return HTTPException(
+        status_code=503,
+        detail="Servidor ocupado, tente novamente em instantes",
+        headers={"Retry-After": "1"}
+    )
+
+
 # Endpoint de Registro
 @router.post("/register")
-def register(usuario: Usuario) -> dict:
+async def register(usuario: Usuario) -> dict:
     """
     Registra um novo usuário no sistema com senha hasheada e personagem inicial.
     
@@ -94,6 +117,7 @@ def register(usuario: Usuario) -> dict:
             - Username > 14 caracteres
             - Password < 6 ou > 14 caracteres
             - Username já existe no banco
+        HTTPException 503: Pool de hashing saturado
     
     Example:
         >>> # Requisição HTTP
@@ -118,7 +142,7 @@ def register(usuario: Usuario) -> dict:
         2. Valida comprimento de password (6-14 chars)
         3. Verifica se username já existe no Firestore
         4. Gera salt aleatório (16 bytes) + hash PBKDF2
-        5. Cria documento em 'usuarios' collection
+        5. Cria documento em 'usuarios' e índice em 'usernames' (transação)
         6. Cria documento em 'personagens' collection (lista vazia)
         7. Retorna confirmação
     
@@ -130,6 +154,7 @@ def register(usuario: Usuario) -> dict:
     
     Database Changes:
         - Collection 'usuarios': +1 documento
+        - Collection 'usernames': +1 documento (índice do username)
         - Collection 'personagens': +1 documento
         - Ambos com mesmo ID de referência
     
@@ -158,34 +183,39 @@ def register(usuario: Usuario) -> dict:
         )
 
     # Verifica se o usuário já existe
-    query = usuarios_collection.where("username", "==", usuario.username).get()
-    if len(query) > 0:
+    if await run_in_threadpool(user_repository.find_by_username, usuario.username) is not None:
         raise HTTPException(status_code=400, detail="Usuário já existe")
 
-    # Gera salt e hash da senha
-    salt, senha_hash = hash_senha(usuario.password)
+    # Gera salt e hash da senha (no pool de hashing)
+    try:
+        salt, senha_hash = await hash_senha_async(usuario.password)
+    except PasswordHashingBusyError:
+        raise _hashing_busy()
     
-    # Adiciona usuário ao Firestore
-    user_ref = usuarios_collection.add({
-        "username": usuario.username,
-        "salt": salt,
-        "password": senha_hash
-    })
-    user_id = user_ref[1].id  # O ID do documento criado
+    # Adiciona usuário e índice de username na mesma transação; um registro
+    # simultâneo com o mesmo nome perde aqui, mesmo tendo passado na checagem
+    try:
+        user_id = await run_in_threadpool(user_repository.create_user, {
+            "username": usuario.username,
+            "salt": salt,
+            "password": senha_hash
+        })
+    except DuplicateUsernameError:
+        raise HTTPException(status_code=400, detail="Usuário já existe")
 
     # Cria documento de personagens associado ao usuário
     # Inicializa com lista vazia (personagens criados posteriormente)
-    personagens_collection.document(user_id).set({
-        "user_id": user_id,
-        "personagens": []
-    })
+    await run_in_threadpool(character_repository.create_document, user_id)
+
+    # O username pode ter sido buscado (e não encontrado) antes do registro
+    await login_guard.forget_missing_async(usuario.username)
 
     return {"message": "Usuário criado com sucesso"}
 
 
 # Endpoint de Login
 @router.post("/login")
-def login(usuario: Usuario) -> dict:
+async def login(usuario: Usuario, request: Request) -> dict:
     """
     Autentica usuário e retorna token JWT para sessão.
     
@@ -209,6 +239,8 @@ def login(usuario: Usuario) -> dict:
         HTTPException 401:
             - Usuário não encontrado no banco
             - Senha incorreta
+        HTTPException 429: Muitas falhas recentes para o username ou IP
+        HTTPException 503: Pool de hashing saturado
     
     Example:
         >>> # Requisição HTTP
@@ -230,7 +262,7 @@ def login(usuario: Usuario) -> dict:
         ... }
     
     Process:
-        1. Busca usuário no Firestore por username
+        1. Busca usuário pelo índice de usernames (leitura pontual)
         2. Verifica se usuário existe
         3. Extrai salt e password_hash armazenados
         4. Aplica PBKDF2 na senha fornecida com salt armazenado
@@ -269,26 +301,53 @@ def login(usuario: Usuario) -> dict:
         4. Backend valida token via verify_key()
         5. Token expira → Cliente faz login novamente
     """
-    # Busca usuário por username
-    query = usuarios_collection.where("username", "==", usuario.username).get()
-    if not query:
+    client_ip = request.client.host if request.client else "unknown"
+
+    # Força bruta: recusa antes de tocar no banco ou no pool de hashing
+    retry_after = await login_guard.retry_after_async(usuario.username, client_ip)
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=429,
+            detail="Muitas tentativas de login. Tente novamente mais tarde.",
+            headers={"Retry-After": str(int(retry_after) + 1)}
+        )
+
+    # Busca usuário por username (cache negativo → cache positivo → banco)
+    found = None
+    if not await login_guard.is_known_missing_async(usuario.username):
+        found = login_guard.get_cached_user(usuario.username)
+        if found is None:
+            found = await run_in_threadpool(user_repository.find_by_username, usuario.username)
+            if found:
+                login_guard.cache_user(usuario.username, *found)
+            else:
+                await login_guard.remember_missing_async(usuario.username)
+
+    if not found:
+        await login_guard.record_failure_async(usuario.username, client_ip)
         raise HTTPException(
             status_code=401,
             detail="Usuário ou Senha inválido!"
         )
 
     # Extrai dados do primeiro documento encontrado
-    user_doc = query[0]
-    user = user_doc.to_dict()
-    user_id = user_doc.id
+    user_id, user = found
+
+    # Verifica senha com salt armazenado (no pool de hashing)
+    try:
+        senha_valida = await verificar_senha_async(usuario.password, user["salt"], user["password"])
+    except PasswordHashingBusyError:
+        raise _hashing_busy()
 
-    # Verifica senha com salt armazenado
-    if not verificar_senha(usuario.password, user["salt"], user["password"]):
+    if not senha_valida:
+        await login_guard.record_failure_async(usuario.username, client_ip)
         raise HTTPException(
             status_code=401,
             detail="Usuário ou Senha inválido!"
         )
 
+    await login_guard.record_success_async(usuario.username)
+
     # Gera token JWT com user_id (válido por 2 horas)
     temp_key = generate_key(user_id)
 
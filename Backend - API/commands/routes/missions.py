@@ -1,173 +1,171 @@
-from fastapi import APIRouter, HTTPException, Header
-from commands.database import personagens_collection
-from commands.key_manager import verify_key
-from commands.missions_data import get_mission, get_all_missions
+from fastapi import APIRouter, HTTPException, Depends
+from commands.auth import get_current_user, get_user_characters
+from commands.combat_engine import (
+    character_combatant,
+    combat_rng,
+    enemy_combatant,
+    new_combat_seed,
+    resolve_round
+)
+from commands.database import async_character_repository, character_repository, mission_session_store
+from commands.mission_graph import EXIT_ROOM, get_compiled_mission, get_mission_summaries
 from commands.models.mission_model import (
     StartMissionRequest, 
     MissionActionRequest, 
     MissionActionResponse
 )
-from google.cloud import firestore
-import copy
+from commands.storage.unit_of_work import CharacterUnitOfWork, apply_updates
+import logging
+import os
 
 router = APIRouter()
+logger = logging.getLogger("midiantext.missions")
 
-# Armazena progresso de missões em memória (em produção, usar Firebase)
-mission_progress_storage = {}
+# O progresso das missões fica em mission_session_store (ver commands/database.py)
 
-def update_character_in_firebase(username: str, character_name: str, updates: dict):
-    """Helper para atualizar um personagem no Firebase"""
-    personagens_doc = personagens_collection.document(username).get()
-    if not personagens_doc.exists:
-        return False
-    
-    personagens_data = personagens_doc.to_dict().get("personagens", [])
-    
-    # Encontrar e atualizar o personagem
-    for idx, char in enumerate(personagens_data):
-        if char.get('name') == character_name:
-            # Atualizar campos
-            for key, value in updates.items():
-                if '.' in key:  # Suporta nested keys como "status.hp_atual"
-                    keys = key.split('.')
-                    current = char
-                    for k in keys[:-1]:
-                        if k not in current:
-                            current[k] = {}
-                        current = current[k]
-                    current[keys[-1]] = value
-                else:
-                    char[key] = value
-            
-            # Salvar de volta no Firebase
-            personagens_collection.document(username).update({"personagens": personagens_data})
-            return True
+# Quando ativo, alterações não críticas (ouro, HP) das ações de luta e coleta
+# ficam pendentes no progresso (como incrementos) e só são gravadas na troca
+# de sala, ao completar ou reiniciar a missão ou quando a sessão expira
+DEFER_MISSION_UPDATES = os.getenv("MISSION_DEFER_UPDATES", "false").lower() in ("1", "true", "yes")
+
+# Teto de turnos resolvidos por uma ação fight_until_done
+MAX_FIGHT_ROUNDS = int(os.getenv("MISSION_MAX_FIGHT_ROUNDS", "50"))
+
+# Colunas do log compacto de fight_until_done (uma lista por turno)
+FIGHT_LOG_COLUMNS = ["dealt", "taken", "character_hp", "enemy_hp", "critical"]
+
+async def commit_action_updates(uow: CharacterUnitOfWork, pending: dict, defer: bool):
+    """Grava as alterações da ação em uma única escrita ou as mantém pendentes"""
+    if defer:
+        for field, amount in uow.increments.items():
+            pending[field] = pending.get(field, 0) + amount
+        uow.increments = {}
+        return
     
-    return False
+    await uow.commit_async()
+    pending.clear()
+
+def pending_unit_of_work(repository, user_id: str, session: dict) -> CharacterUnitOfWork:
+    """Unidade de trabalho com as alterações adiadas de uma sessão de missão"""
+    uow = CharacterUnitOfWork(repository, user_id, session['character_name'])
+    # 'pending_updates': valores absolutos de sessões gravadas por versões anteriores
+    uow.merge(session.get('pending_updates'), session.get('pending_increments'))
+    return uow
+
+def flush_expired_session(key: str, session: dict) -> None:
+    """Grava as alterações adiadas de uma sessão descartada pelo armazenamento"""
+    user_id = session.get('user_id')
+    if user_id is None:
+        return
+    if not pending_unit_of_work(character_repository, user_id, session).commit():
+        logger.warning("mission_pending_updates_lost", extra={"fields": {
+            "user_id": user_id,
+            "character_name": session['character_name'],
+            "mission_id": session.get('mission_id')
+        }})
+
+mission_session_store.set_expire_handler(flush_expired_session)
 
 @router.get("/missions")
-def list_missions(authorization: str = Header(None)):
+def list_missions(username: str = Depends(get_current_user)):
     """Lista todas as missões disponíveis"""
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Não autorizado")
-    
     try:
-        print(f"DEBUG: Authorization header: {authorization[:50]}..." if len(authorization) > 50 else f"DEBUG: Authorization header: {authorization}")
-        
-        # Remover o prefixo "Bearer " se existir
-        token = authorization.replace("Bearer ", "") if authorization.startswith("Bearer ") else authorization
-        print(f"DEBUG: Token after removing Bearer: {token[:50]}...")
-        
-        username = verify_key(token)
-        print(f"DEBUG: verify_key returned: {username}")
-        if not username:
-            print("DEBUG: Token validation failed - username is None")
-            raise HTTPException(status_code=401, detail="Token inválido ou expirado")
-        print(f"DEBUG: Token validated successfully for user: {username}")
-        missions = get_all_missions()
-        return {"missions": missions}
+        return {"missions": get_mission_summaries()}
     except HTTPException as e:
         raise e
     except Exception as e:
-        import traceback
-        print(f"ERROR in list_missions: {str(e)}\n{traceback.format_exc()}")
+        logger.exception("list_missions_failed")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/missions/start")
-def start_mission(request: StartMissionRequest, authorization: str = Header(None)):
+def start_mission(
+    request: StartMissionRequest,
+    username: str = Depends(get_current_user),
+    personagens_data: list | None = Depends(get_user_characters)
+):
     """Inicia uma missão para um personagem"""
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Não autorizado")
-    
     try:
-        # Remover o prefixo "Bearer " se existir
-        token = authorization.replace("Bearer ", "") if authorization.startswith("Bearer ") else authorization
-        username = verify_key(token)
-        if not username:
-            raise HTTPException(status_code=401, detail="Token inválido ou expirado")
-        
-        print(f"DEBUG start_mission: username={username}, character_name={request.character_name}, mission_id={request.mission_id}")
+        logger.debug("start_mission", extra={"fields": {
+            "user_id": username,
+            "character_name": request.character_name,
+            "mission_id": request.mission_id
+        }})
         
-        # Buscar personagens do usuário (estrutura correta)
-        personagens_doc = personagens_collection.document(username).get()
-        if not personagens_doc.exists:
+        if personagens_data is None:
             raise HTTPException(status_code=404, detail="Usuário não possui personagens")
         
-        personagens_data = personagens_doc.to_dict().get("personagens", [])
-        print(f"DEBUG start_mission: Found {len(personagens_data)} characters")
-        
         # Procurar o personagem específico
         character = None
         for char in personagens_data:
-            print(f"DEBUG start_mission: Checking character: {char.get('name')}")
             if char.get('name') == request.character_name:
                 character = char
                 break
         
         if not character:
             char_names = [c.get('name') for c in personagens_data]
-            print(f"DEBUG start_mission: Character not found. Available: {char_names}")
+            logger.debug("start_mission_character_not_found", extra={"fields": {
+                "character_count": len(personagens_data)
+            }})
             raise HTTPException(status_code=404, detail=f"Personagem '{request.character_name}' não encontrado. Personagens disponíveis: {char_names}")
         
-        print(f"DEBUG start_mission: Character found: {character.get('name')}")
-        
-        # Carregar dados da missão
-        mission_data = get_mission(request.mission_id)
-        print(f"DEBUG: mission_data type: {type(mission_data)}")
-        print(f"DEBUG: mission_data keys: {mission_data.keys() if mission_data else 'None'}")
+        # Carregar dados da missão (compilada na inicialização)
+        mission = get_compiled_mission(request.mission_id)
         
-        if not mission_data:
+        if not mission:
             raise HTTPException(status_code=404, detail="Missão não encontrada")
         
         # Verificar nível mínimo
-        if character.get('level', 1) < mission_data['min_level']:
+        if character.get('level', 1) < mission.min_level:
             raise HTTPException(
                 status_code=400, 
-                detail=f"Nível mínimo necessário: {mission_data['min_level']}"
+                detail=f"Nível mínimo necessário: {mission.min_level}"
             )
         
-        # Criar cópia da missão para este progresso
-        mission_instance = copy.deepcopy(mission_data)
-        
-        # Inicializar progresso
+        # Alterações adiadas da sessão anterior são gravadas antes de ela ser
+        # substituída
         progress_key = f"{username}_{request.character_name}_{request.mission_id}"
-        mission_progress_storage[progress_key] = {
+        previous = mission_session_store.get(progress_key)
+        if previous is not None:
+            uow = pending_unit_of_work(character_repository, username, previous)
+            if uow.commit() and uow.character is not None:
+                character = uow.character
+        
+        # Toda missão começa com HP cheio, qualquer que seja o HP atual
+        # (derrotado ou não); dentro da missão o HP não se recupera
+        status = character.get('status', {})
+        if status.get('hp_atual', 0) != status.get('hp_max', 0):
+            def restore_hp(personagem: dict) -> None:
+                personagem['status']['hp_atual'] = personagem['status'].get('hp_max', 0)
+            
+            character = character_repository.update_character(
+                username, request.character_name, restore_hp
+            )
+        
+        # Inicializar progresso (apenas o delta; a missão em si é o template
+        # compartilhado de missions_data, que nunca é alterado)
+        current_room_id = mission.starting_room
+        progress = {
+            "user_id": username,
             "character_name": request.character_name,
             "mission_id": request.mission_id,
-            "current_room": mission_instance['starting_room'],
-            "visited_rooms": [mission_instance['starting_room']],
+            "current_room": current_room_id,
+            "visited_rooms": [current_room_id],  # Sala inicial já visitada
             "defeated_enemies": [],
             "collected_treasures": [],
             "completed": False,
-            "mission_data": mission_instance
+            # Combate (commands/combat_engine.py): semente, turnos jogados e
+            # HP restante dos inimigos feridos
+            "combat_seed": new_combat_seed(),
+            "combat_rounds": 0,
+            "enemy_hp": {}
         }
-        
-        # Marcar sala inicial como visitada
-        current_room_id = mission_instance['starting_room']
-        print(f"DEBUG: current_room_id: {current_room_id}")
-        print(f"DEBUG: rooms keys: {mission_instance['rooms'].keys()}")
-        print(f"DEBUG: room type: {type(mission_instance['rooms'][current_room_id])}")
-        
-        current_room = mission_instance['rooms'][current_room_id]
-        current_room['visited'] = True
+        mission_session_store.save(progress_key, progress)
         
         return {
             "success": True,
-            "message": f"Missão '{mission_data['name']}' iniciada!",
-            "mission_info": {
-                "id": mission_data['id'],
-                "name": mission_data['name'],
-                "description": mission_data['description'],
-                "difficulty": mission_data['difficulty']
-            },
-            "current_room": {
-                "id": current_room['id'],
-                "name": current_room['name'],
-                "description": current_room['description'],
-                "enemies": current_room['enemies'],
-                "treasures": current_room['treasures'],
-                "exits": current_room['exits']
-            },
+            "message": f"Missão '{mission.name}' iniciada!",
+            "mission_info": mission.info,
+            "current_room": mission.rooms[current_room_id].view(set(), set()),
             "character_status": {
                 "hp": character.get('status', {}).get('hp_atual', 100),
                 "hp_max": character.get('status', {}).get('hp_max', 100),
@@ -179,27 +177,16 @@ def start_mission(request: StartMissionRequest, authorization: str = Header(None
     except HTTPException as e:
         raise e
     except Exception as e:
-        import traceback
-        error_detail = f"{str(e)}\n\nTraceback:\n{traceback.format_exc()}"
-        print(f"ERROR in start_mission: {error_detail}")
+        logger.exception("start_mission_failed")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/missions/action")
-def mission_action(request: MissionActionRequest, authorization: str = Header(None)):
+async def mission_action(request: MissionActionRequest, username: str = Depends(get_current_user)):
     """Executa uma ação durante a missão"""
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Não autorizado")
-    
     try:
-        # Remover o prefixo "Bearer " se existir
-        token = authorization.replace("Bearer ", "") if authorization.startswith("Bearer ") else authorization
-        username = verify_key(token)
-        if not username:
-            raise HTTPException(status_code=401, detail="Token inválido ou expirado")
-        
         # Buscar progresso da missão
         progress_key = f"{username}_{request.character_name}_{request.mission_id}"
-        progress = mission_progress_storage.get(progress_key)
+        progress = await mission_session_store.get_async(progress_key)
         
         if not progress:
             raise HTTPException(status_code=404, detail="Missão não iniciada ou não encontrada")
@@ -207,27 +194,57 @@ def mission_action(request: MissionActionRequest, authorization: str = Header(No
         if progress['completed']:
             raise HTTPException(status_code=400, detail="Missão já foi completada")
         
-        mission_data = progress['mission_data']
-        current_room_id = progress['current_room']
-        current_room = mission_data['rooms'][current_room_id]
+        mission = get_compiled_mission(progress['mission_id'])
+        if not mission:
+            raise HTTPException(status_code=404, detail="Missão não encontrada")
+        
+        # Uma recarga do catálogo pode ter removido a sala da sessão
+        current_room = mission.rooms.get(progress['current_room'])
+        if current_room is None:
+            raise HTTPException(
+                status_code=409,
+                detail="A missão foi alterada desde o início. Inicie a missão novamente."
+            )
+        
+        # Listas da sessão (JSON) viram sets para consultas O(1)
+        visited = set(progress['visited_rooms'])
+        defeated = set(progress['defeated_enemies'])
+        collected = set(progress['collected_treasures'])
         
         # Buscar personagem (usando estrutura correta)
-        personagens_doc = personagens_collection.document(username).get()
-        if not personagens_doc.exists:
+        personagens_data = await async_character_repository.get_characters(username)
+        if personagens_data is None:
             raise HTTPException(status_code=404, detail="Usuário não possui personagens")
-        
-        personagens_data = personagens_doc.to_dict().get("personagens", [])
         character = None
-        char_index = None
-        for idx, char in enumerate(personagens_data):
+        for char in personagens_data:
             if char.get('name') == request.character_name:
                 character = char
-                char_index = idx
                 break
         
         if not character:
             raise HTTPException(status_code=404, detail="Personagem não encontrado")
         
+        # Alterações adiadas de ações anteriores valem para a visão atual
+        legacy = progress.pop('pending_updates', None)
+        pending = progress.setdefault('pending_increments', {})
+        apply_updates(character, legacy, pending)
+        
+        # Personagem derrotado não age: a missão termina na derrota, mas
+        # sessões antigas (ou HP zerado fora da missão) chegam aqui
+        if character.get('status', {}).get('hp_atual', 1) <= 0:
+            raise HTTPException(
+                status_code=400,
+                detail="Personagem sem HP. Inicie a missão novamente para se recuperar."
+            )
+        
+        # Todas as alterações desta ação são gravadas juntas no final, como
+        # incrementos sobre o personagem lido na transação
+        uow = CharacterUnitOfWork(async_character_repository, username, request.character_name)
+        defer = DEFER_MISSION_UPDATES and request.action != "move" and not legacy
+        if not defer:
+            uow.merge(legacy, pending)
+        
+        mission_failed = False
         result = {
             "success": False,
             "message": "",
@@ -239,19 +256,19 @@ def mission_action(request: MissionActionRequest, authorization: str = Header(No
         # AÇÃO: MOVER
         if request.action == "move":
             direction = request.target
-            if direction not in current_room['exits']:
+            next_room_id = current_room.exits.get(direction)
+            if next_room_id is None:
                 raise HTTPException(status_code=400, detail="Direção inválida")
             
-            next_room_id = current_room['exits'][direction]
-            
             # Verificar se é o fim da missão
-            if next_room_id == "fim":
+            if next_room_id == EXIT_ROOM:
                 # Completar missão e dar recompensas
-                rewards = mission_data['rewards']
+                rewards = mission.rewards
                 character['gold'] = character.get('gold', 0) + rewards.get('gold', 0)
                 
-                # Atualizar no Firebase
-                update_character_in_firebase(username, request.character_name, {"gold": character['gold']})
+                uow.add("gold", rewards.get('gold', 0))
+                await commit_action_updates(uow, pending, defer)
+                character = uow.character or character
                 
                 progress['completed'] = True
                 
@@ -266,123 +283,155 @@ def mission_action(request: MissionActionRequest, authorization: str = Header(No
                     "hp_max": character.get('status', {}).get('hp_max', 100),
                     "gold": character['gold']
                 }
+                await mission_session_store.save_async(progress_key, progress)
                 return result
             
             # Mover para próxima sala
             progress['current_room'] = next_room_id
-            if next_room_id not in progress['visited_rooms']:
+            if next_room_id not in visited:
+                visited.add(next_room_id)
                 progress['visited_rooms'].append(next_room_id)
             
-            mission_data['rooms'][next_room_id]['visited'] = True
-            next_room = mission_data['rooms'][next_room_id]
+            next_room = mission.rooms[next_room_id]
             
             result['success'] = True
-            result['message'] = f"Você se moveu para: {next_room['name']}"
-            result['current_room'] = {
-                "id": next_room['id'],
-                "name": next_room['name'],
-                "description": next_room['description'],
-                "enemies": next_room['enemies'],
-                "treasures": next_room['treasures'],
-                "exits": next_room['exits']
-            }
+            result['message'] = f"Você se moveu para: {next_room.name}"
+            result['current_room'] = next_room.view(defeated, collected)
         
-        # AÇÃO: LUTAR
-        elif request.action == "fight":
+        # AÇÃO: LUTAR (um turno) / LUTAR ATÉ O FIM (vários turnos, uma escrita)
+        elif request.action in ("fight", "fight_until_done"):
             enemy_id = request.target
-            enemy = None
-            
-            for e in current_room['enemies']:
-                if e['id'] == enemy_id:
-                    enemy = e
-                    break
+            enemy = current_room.enemies_by_id.get(enemy_id)
             
             if not enemy:
                 raise HTTPException(status_code=400, detail="Inimigo não encontrado nesta sala")
             
-            if enemy_id in progress['defeated_enemies']:
+            if enemy_id in defeated:
                 raise HTTPException(status_code=400, detail="Inimigo já foi derrotado")
             
-            # Combate simplificado (o frontend pode fazer mais elaborado)
-            char_hp = character.get('status', {}).get('hp_atual', 100)
-            enemy_hp = enemy['hp']
+            fighter = character_combatant(character)
+            hp_before = fighter.hp
             
-            # Personagem ataca primeiro
-            enemy_hp -= 15  # Dano fixo simplificado
+            if request.action == "fight":
+                round_limit = 1
+            else:
+                requested = request.max_rounds if request.max_rounds is not None else MAX_FIGHT_ROUNDS
+                round_limit = min(requested, MAX_FIGHT_ROUNDS)
+                if round_limit < 1:
+                    raise HTTPException(status_code=400, detail="max_rounds deve ser maior que zero")
             
-            if enemy_hp > 0:
-                # Inimigo contra-ataca
-                char_hp -= enemy['attack']
+            # Turnos de combate; sessões antigas ganham semente na primeira luta.
+            # Cada turno usa o gerador do seu número, então lutar turno a turno
+            # ou com fight_until_done leva ao mesmo resultado
+            enemy_hp = progress.setdefault('enemy_hp', {})
+            opponent = enemy_combatant(enemy, enemy_hp.get(enemy_id))
+            seed = progress.setdefault('combat_seed', new_combat_seed())
+            round_number = progress.get('combat_rounds', 0)
+            fight_log = []
+            dealt_total = taken_total = 0
+            while True:
+                outcome = resolve_round(fighter, opponent, combat_rng(seed, round_number))
+                round_number += 1
+                dealt_total += outcome.damage_dealt
+                taken_total += outcome.damage_taken
+                fight_log.append([
+                    outcome.damage_dealt,
+                    outcome.damage_taken,
+                    outcome.character_hp,
+                    outcome.enemy_hp,
+                    outcome.damage_dealt_critical | outcome.damage_taken_critical << 1
+                ])
+                if outcome.enemy_hp <= 0 or outcome.character_hp <= 0 or len(fight_log) >= round_limit:
+                    break
+            progress['combat_rounds'] = round_number
             
             # Atualizar HP do personagem
-            character['status']['hp_atual'] = max(0, char_hp)
-            update_character_in_firebase(username, request.character_name, {"status.hp_atual": character['status']['hp_atual']})
+            character['status']['hp_atual'] = outcome.character_hp
+            uow.add("status.hp_atual", outcome.character_hp - hp_before)
+            
+            if request.action == "fight":
+                attack_text = f"Você causou {outcome.damage_dealt} de dano"
+                if outcome.damage_dealt_critical:
+                    attack_text += " (crítico!)"
+                if outcome.damage_taken:
+                    attack_text += f" e recebeu {outcome.damage_taken}"
+                    if outcome.damage_taken_critical:
+                        attack_text += " (crítico!)"
+            else:
+                attack_text = (
+                    f"Em {len(fight_log)} turno(s) você causou {dealt_total} de dano "
+                    f"e recebeu {taken_total}"
+                )
             
-            if enemy_hp <= 0:
+            if outcome.enemy_hp <= 0:
                 # Inimigo derrotado
+                enemy_hp.pop(enemy_id, None)
+                defeated.add(enemy_id)
                 progress['defeated_enemies'].append(enemy_id)
                 character['gold'] = character.get('gold', 0) + enemy.get('gold_drop', 0)
-                update_character_in_firebase(username, request.character_name, {"gold": character['gold']})
-                
-                # Remover inimigo da sala
-                current_room['enemies'] = [e for e in current_room['enemies'] if e['id'] != enemy_id]
+                uow.add("gold", enemy.get('gold_drop', 0))
                 
                 result['success'] = True
-                result['message'] = f"⚔️ Você derrotou {enemy['name']}! Ganhou {enemy.get('gold_drop', 0)} de ouro."
+                result['message'] = f"⚔️ {attack_text}. Você derrotou {enemy['name']}! Ganhou {enemy.get('gold_drop', 0)} de ouro."
+            elif outcome.character_hp <= 0:
+                enemy_hp[enemy_id] = outcome.enemy_hp
+                result['success'] = True
+                result['message'] = f"💀 {attack_text}. Você foi derrotado por {enemy['name']}! Missão fracassada."
+                # Derrota encerra a missão: pendências são gravadas agora
+                mission_failed = True
+                if defer:
+                    uow.merge(increments=pending)
+                    defer = False
             else:
+                enemy_hp[enemy_id] = outcome.enemy_hp
                 result['success'] = True
-                result['message'] = f"⚔️ Você atacou {enemy['name']}! O inimigo ainda tem {enemy_hp} HP."
+                result['message'] = f"⚔️ {attack_text}. {enemy['name']} ainda tem {outcome.enemy_hp} HP."
             
-            result['current_room'] = {
-                "id": current_room['id'],
-                "name": current_room['name'],
-                "description": current_room['description'],
-                "enemies": current_room['enemies'],
-                "treasures": current_room['treasures'],
-                "exits": current_room['exits']
-            }
+            if request.action == "fight":
+                result['combat'] = outcome._asdict()
+            else:
+                # critical: 1 = seu golpe foi crítico, 2 = o do inimigo, 3 = ambos
+                result['combat'] = {
+                    "rounds": len(fight_log),
+                    "finished": outcome.enemy_hp <= 0 or outcome.character_hp <= 0,
+                    "columns": FIGHT_LOG_COLUMNS,
+                    "log": fight_log
+                }
+            
+            result['current_room'] = current_room.view(defeated, collected)
         
         # AÇÃO: COLETAR
         elif request.action == "collect":
             treasure_id = request.target
-            treasure = None
-            
-            for t in current_room['treasures']:
-                if t['id'] == treasure_id:
-                    treasure = t
-                    break
+            treasure = current_room.treasures_by_id.get(treasure_id)
             
             if not treasure:
                 raise HTTPException(status_code=400, detail="Tesouro não encontrado nesta sala")
             
-            if treasure_id in progress['collected_treasures']:
+            if treasure_id in collected:
                 raise HTTPException(status_code=400, detail="Tesouro já foi coletado")
             
             # Coletar tesouro
+            collected.add(treasure_id)
             progress['collected_treasures'].append(treasure_id)
             contents = treasure.get('contents', {})
             
             gold_gained = contents.get('gold', 0)
             character['gold'] = character.get('gold', 0) + gold_gained
-            update_character_in_firebase(username, request.character_name, {"gold": character['gold']})
-            
-            # Remover tesouro da sala
-            current_room['treasures'] = [t for t in current_room['treasures'] if t['id'] != treasure_id]
+            uow.add("gold", gold_gained)
             
             result['success'] = True
             result['message'] = f"💰 Você coletou {treasure['name']}! Ganhou {gold_gained} de ouro."
-            result['current_room'] = {
-                "id": current_room['id'],
-                "name": current_room['name'],
-                "description": current_room['description'],
-                "enemies": current_room['enemies'],
-                "treasures": current_room['treasures'],
-                "exits": current_room['exits']
-            }
+            result['current_room'] = current_room.view(defeated, collected)
         
         else:
             raise HTTPException(status_code=400, detail="Ação inválida")
         
+        # Uma única escrita por ação (ou nenhuma, se adiada); após gravar, o
+        # status mostrado é o do personagem gravado
+        await commit_action_updates(uow, pending, defer)
+        character = uow.character or character
+        
         # Atualizar status do personagem
         result['character_status'] = {
             "hp": character.get('status', {}).get('hp_atual', 100),
@@ -398,41 +447,38 @@ def mission_action(request: MissionActionRequest, authorization: str = Header(No
             "completed": progress['completed']
         }
         
+        if mission_failed:
+            result['mission_progress']['failed'] = True
+            await mission_session_store.delete_async(progress_key)
+            return result
+        
+        await mission_session_store.save_async(progress_key, progress)
         return result
         
     except HTTPException as e:
         raise e
     except Exception as e:
+        logger.exception("mission_action_failed", extra={"fields": {
+            "user_id": username,
+            "character_name": request.character_name,
+            "mission_id": request.mission_id,
+            "action": request.action
+        }})
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/missions/{mission_id}")
-def get_mission_details(mission_id: str, authorization: str = Header(None)):
+@router.get("/missions/{mission_id}", dependencies=[Depends(get_current_user)])
+def get_mission_details(mission_id: str):
     """Retorna detalhes de uma missão específica"""
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Não autorizado")
-    
     try:
-        # Remover o prefixo "Bearer " se existir
-        token = authorization.replace("Bearer ", "") if authorization.startswith("Bearer ") else authorization
-        username = verify_key(token)
-        if not username:
-            raise HTTPException(status_code=401, detail="Token inválido ou expirado")
+        mission = get_compiled_mission(mission_id)
         
-        mission_data = get_mission(mission_id)
-        
-        if not mission_data:
+        if not mission:
             raise HTTPException(status_code=404, detail="Missão não encontrada")
         
-        return {
-            "id": mission_data['id'],
-            "name": mission_data['name'],
-            "description": mission_data['description'],
-            "difficulty": mission_data['difficulty'],
-            "min_level": mission_data['min_level'],
-            "rewards": mission_data['rewards']
-        }
+        return mission.summary
         
     except HTTPException as e:
         raise e
     except Exception as e:
+        logger.exception("get_mission_details_failed", extra={"fields": {"mission_id": mission_id}})
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,16 +1,20 @@
-from fastapi import APIRouter, HTTPException, Header
-from commands.database import personagens_collection
+from fastapi import APIRouter, HTTPException, Depends, Request
+from commands.auth import get_current_user, get_user_characters
+from commands.database import character_repository, async_character_repository
+from commands.storage.base import DuplicateCharacterError, CharacterLimitError, CharacterNotFoundError
 from commands.models.user_model import Usuario
 from commands.models.character_creation_model import CharacterCreationRequest, CharacterResponse, Character
-from commands.key_manager import verify_key
 from commands.models.classes.assassino_class import Assassino
 from commands.models.classes.arqueiro_class import Arqueiro
 from commands.models.classes.mage_class import Mago
 from commands.models.classes.soldado_class import Soldado
 from commands.models.items_table import ItemTable
-from google.cloud import firestore
+from commands.catalog_cache import CatalogCache
+from commands.game_data import on_reload
+import logging
 
 router = APIRouter()
+logger = logging.getLogger("midiantext.personagens")
 
 # Mapeamento das classes disponíveis
 CLASS_MAP = {
@@ -20,72 +24,28 @@ CLASS_MAP = {
     "Soldado": Soldado
 }
 
+# Limite de personagens por usuário
+MAX_CHARACTERS = 3
+
 @router.get("/personagens", response_model=list)
-def get_personagens(authorization: str = Header(None)) -> list:
+async def get_personagens(personagens_data: list | None = Depends(get_user_characters)) -> list:
     """
     Obtém a lista de personagens associados a um usuário usando Firebase Firestore.
     """
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Não autorizado")
-
-    try:
-        scheme, token = authorization.split()
-        if scheme.lower() != "bearer":
-            raise HTTPException(status_code=401, detail="Formato de token inválido")
-    except ValueError:
-        raise HTTPException(status_code=401, detail="Formato de token inválido")
-
-    user_id = verify_key(token)
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Token inválido ou expirado")
-
-    # Busca os personagens pelo user_id
-    personagens_doc = personagens_collection.document(user_id).get()
-    if not personagens_doc.exists:
+    if personagens_data is None:
         return []
-
-    personagens_data = personagens_doc.to_dict().get("personagens", [])
     
     return personagens_data
 
 @router.post("/personagens/criar", response_model=CharacterResponse)
-def criar_personagem(character_data: CharacterCreationRequest, authorization: str = Header(None)):
+def criar_personagem(character_data: CharacterCreationRequest, user_id: str = Depends(get_current_user)):
     """
     Cria um novo personagem para o usuário autenticado.
     """
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Não autorizado")
-
-    try:
-        scheme, token = authorization.split()
-        if scheme.lower() != "bearer":
-            raise HTTPException(status_code=401, detail="Formato de token inválido")
-    except ValueError:
-        raise HTTPException(status_code=401, detail="Formato de token inválido")
-
-    user_id = verify_key(token)
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Token inválido ou expirado")
-
     # Verifica se a classe existe
     if character_data.character_class not in CLASS_MAP:
         raise HTTPException(status_code=400, detail="Classe de personagem inválida")
     
-    # Busca os personagens existentes
-    personagens_doc = personagens_collection.document(user_id).get()
-    personagens_existentes = []
-    if personagens_doc.exists:
-        personagens_existentes = personagens_doc.to_dict().get("personagens", [])
-    
-    # Verifica se já existe um personagem com o mesmo nome
-    for personagem in personagens_existentes:
-        if personagem.get("name", "").lower() == character_data.name.lower():
-            raise HTTPException(status_code=400, detail="Já existe um personagem com este nome")
-    
-    # Verifica limite de personagens (máximo 3 por usuário)
-    if len(personagens_existentes) >= 3:
-        raise HTTPException(status_code=400, detail="Limite máximo de 3 personagens atingido")
-    
     # Cria a instância da classe do personagem
     class_instance = CLASS_MAP[character_data.character_class]()
     
@@ -97,90 +57,57 @@ def criar_personagem(character_data: CharacterCreationRequest, authorization: st
         color=character_data.color
     )
     
-    # Adiciona o personagem à lista (formato antigo para compatibilidade)
-    personagens_existentes.append(novo_personagem.to_dict_full())
-    
-    # Salva no Firebase com nova estrutura: nome do personagem como chave
+    # Salva em uma única escrita atômica: lista antiga (compatibilidade) e
+    # nova estrutura com o nome do personagem como chave. As verificações de
+    # nome duplicado e de limite acontecem dentro da mesma transação.
     try:
-        # Salvar na estrutura antiga (compatibilidade)
-        personagens_collection.document(user_id).set({
-            "personagens": personagens_existentes
-        })
-        
-        # Salvar na nova estrutura: nome como chave
-        nova_estrutura = personagens_collection.document(user_id).get()
-        dados_atuais = nova_estrutura.to_dict() if nova_estrutura.exists else {}
-        
-        # Adicionar o personagem com nome como chave
-        dados_atuais[character_data.name] = novo_personagem.to_dict()
-        
-        # Atualizar documento com nova estrutura
-        personagens_collection.document(user_id).update(dados_atuais)
-        
+        character_repository.add_character(
+            user_id,
+            novo_personagem.to_dict_full(),
+            novo_personagem.to_dict(),
+            max_characters=MAX_CHARACTERS
+        )
+    except DuplicateCharacterError:
+        raise HTTPException(status_code=400, detail="Já existe um personagem com este nome")
+    except CharacterLimitError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Limite máximo de {MAX_CHARACTERS} personagens atingido"
+        )
     except Exception as e:
+        logger.exception("create_character_failed", extra={"fields": {"user_id": user_id}})
         raise HTTPException(status_code=500, detail=f"Erro ao salvar personagem: {str(e)}")
     
     return CharacterResponse(**novo_personagem.to_dict_full())
 
 @router.delete("/personagens/{character_name}")
-def deletar_personagem(character_name: str, authorization: str = Header(None)):
+def deletar_personagem(
+    character_name: str,
+    user_id: str = Depends(get_current_user)
+):
     """
     Deleta um personagem específico do usuário autenticado.
     """
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Não autorizado")
-
-    try:
-        scheme, token = authorization.split()
-        if scheme.lower() != "bearer":
-            raise HTTPException(status_code=401, detail="Formato de token inválido")
-    except ValueError:
-        raise HTTPException(status_code=401, detail="Formato de token inválido")
-
-    user_id = verify_key(token)
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Token inválido ou expirado")
-
-    # Busca os personagens existentes
-    personagens_doc = personagens_collection.document(user_id).get()
-    if not personagens_doc.exists:
-        raise HTTPException(status_code=404, detail="Nenhum personagem encontrado")
-    
-    personagens_existentes = personagens_doc.to_dict().get("personagens", [])
-    
-    # Procura o personagem para deletar
-    personagem_encontrado = False
-    personagens_atualizados = []
-    
-    for personagem in personagens_existentes:
-        if personagem.get("name", "").lower() != character_name.lower():
-            personagens_atualizados.append(personagem)
-        else:
-            personagem_encontrado = True
-    
-    if not personagem_encontrado:
-        raise HTTPException(status_code=404, detail="Personagem não encontrado")
-    
     try:
-        # Atualizar a lista de personagens (estrutura antiga)
-        personagens_collection.document(user_id).update({
-            "personagens": personagens_atualizados
-        })
-        
-        # Remover da nova estrutura também (nome como chave)
-        personagens_collection.document(user_id).update({
-            character_name: firestore.DELETE_FIELD
-        })
+        # Lista antiga e entrada por nome removidas em uma única transação,
+        # sobre a lista lida na própria transação (não sobre a lida no início
+        # da requisição): compras e missões gravadas em paralelo são mantidas
+        character_repository.delete_character(user_id, character_name)
         
+    except CharacterNotFoundError:
+        raise HTTPException(status_code=404, detail="Personagem não encontrado")
     except Exception as e:
+        logger.exception("delete_character_failed", extra={"fields": {"user_id": user_id}})
         raise HTTPException(status_code=500, detail=f"Erro ao deletar personagem: {str(e)}")
     
     return {"message": f"Personagem '{character_name}' deletado com sucesso"}
 
-@router.get("/personagens/classes")
-def get_classes_disponiveis():
+# ==================== CATÁLOGOS ESTÁTICOS ====================
+# Calculados uma vez na importação e servidos por commands/catalog_cache.py
+
+def build_classes_catalog() -> dict:
     """
-    Retorna as classes de personagem disponíveis com suas estatísticas base.
+    Monta as classes de personagem disponíveis com suas estatísticas base.
     """
     classes_info = {}
     
@@ -202,10 +129,9 @@ def get_classes_disponiveis():
     
     return classes_info
 
-@router.get("/personagens/cores")
-def get_cores_disponiveis():
+def build_cores_catalog() -> dict:
     """
-    Retorna as cores disponíveis e suas vantagens.
+    Monta as cores disponíveis e suas vantagens.
     """
     cores_info = {
         "verde": {
@@ -255,12 +181,64 @@ def get_cores_disponiveis():
         }
     }
 
+def build_starting_items_catalog(character_class: str) -> dict:
+    """
+    Monta os itens iniciais de uma classe, com as informações de cada item.
+    """
+    starting_items = ItemTable.get_starting_items(character_class)
+    detailed_items = {}
+    
+    for item_name, quantity in starting_items.items():
+        item_info = ItemTable.get_item_info(item_name)
+        detailed_items[item_name] = {
+            "quantidade": quantity,
+            "info": item_info
+        }
+    
+    return {
+        "classe": character_class,
+        "itens_iniciais": detailed_items
+    }
+
+catalogs = CatalogCache(
+    {
+        "classes": build_classes_catalog,
+        "cores": build_cores_catalog,
+        "itens": ItemTable.get_items_summary,
+        "shop": lambda: {"items": dict(ItemTable.ALL_ITEMS)},
+        **{
+            f"itens_iniciais:{class_name}": (
+                lambda class_name=class_name: build_starting_items_catalog(class_name)
+            )
+            for class_name in CLASS_MAP
+        }
+    },
+    private=frozenset({"shop"})
+)
+
+# Recalcula os catálogos (e seus ETags) quando itens/missões são recarregados
+on_reload(catalogs.rebuild)
+
+@router.get("/personagens/classes")
+async def get_classes_disponiveis(request: Request):
+    """
+    Retorna as classes de personagem disponíveis com suas estatísticas base.
+    """
+    return catalogs.respond("classes", request)
+
+@router.get("/personagens/cores")
+async def get_cores_disponiveis(request: Request):
+    """
+    Retorna as cores disponíveis e suas vantagens.
+    """
+    return catalogs.respond("cores", request)
+
 @router.get("/personagens/itens")
-def get_itens_disponiveis():
+async def get_itens_disponiveis(request: Request):
     """
     Retorna informações sobre todos os itens do jogo.
     """
-    return ItemTable.get_items_summary()
+    return catalogs.respond("itens", request)
 
 @router.get("/personagens/itens/{item_name}")
 def get_item_info(item_name: str):
@@ -277,28 +255,14 @@ def get_item_info(item_name: str):
     }
 
 @router.get("/personagens/itens/classe/{character_class}")
-def get_starting_items_for_class(character_class: str):
+async def get_starting_items_for_class(character_class: str, request: Request):
     """
     Retorna os itens iniciais para uma classe específica.
     """
-    valid_classes = ['Assassino', 'Arqueiro', 'Mago', 'Soldado']
-    if character_class not in valid_classes:
+    if character_class not in CLASS_MAP:
         raise HTTPException(status_code=400, detail="Classe inválida")
     
-    starting_items = ItemTable.get_starting_items(character_class)
-    detailed_items = {}
-    
-    for item_name, quantity in starting_items.items():
-        item_info = ItemTable.get_item_info(item_name)
-        detailed_items[item_name] = {
-            "quantidade": quantity,
-            "info": item_info
-        }
-    
-    return {
-        "classe": character_class,
-        "itens_iniciais": detailed_items
-    }
+    return catalogs.respond(f"itens_iniciais:{character_class}", request)
 
 # ==================== ENDPOINTS DA LOJA ====================
 
@@ -315,44 +279,11 @@ class SellItemRequest(BaseModel):
     quantity: int = 1
 
 @router.post("/shop/buy")
-def buy_item(request: BuyItemRequest, authorization: str = Header(None)):
+async def buy_item(request: BuyItemRequest, user_id: str = Depends(get_current_user)):
     """
     Compra um item da loja para um personagem.
     Deduz o ouro e adiciona o item ao inventário.
     """
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Não autorizado")
-
-    try:
-        scheme, token = authorization.split()
-        if scheme.lower() != "bearer":
-            raise HTTPException(status_code=401, detail="Formato de token inválido")
-    except ValueError:
-        raise HTTPException(status_code=401, detail="Formato de token inválido")
-
-    user_id = verify_key(token)
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Token inválido ou expirado")
-
-    # Buscar personagens do usuário
-    personagens_doc = personagens_collection.document(user_id).get()
-    if not personagens_doc.exists:
-        raise HTTPException(status_code=404, detail="Nenhum personagem encontrado")
-    
-    personagens_data = personagens_doc.to_dict().get("personagens", [])
-    
-    # Encontrar o personagem específico
-    personagem = None
-    personagem_index = None
-    for i, char in enumerate(personagens_data):
-        if char.get("name", "").lower() == request.character_name.lower():
-            personagem = char
-            personagem_index = i
-            break
-    
-    if not personagem:
-        raise HTTPException(status_code=404, detail="Personagem não encontrado")
-    
     # Verificar se o item existe no catálogo
     item_info = ItemTable.get_item_info(request.item_name)
     if not item_info:
@@ -360,40 +291,46 @@ def buy_item(request: BuyItemRequest, authorization: str = Header(None)):
     
     item_price = item_info.get("valor", 0)
     total_price = item_price * request.quantity
-    
-    # Verificar se tem ouro suficiente
-    current_gold = personagem.get("gold", 0)
-    if current_gold < total_price:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"Ouro insuficiente. Necessário: {total_price}, Disponível: {current_gold}"
-        )
-    
-    # Verificar restrição de classe
     required_class = item_info.get("classe")
-    character_class = personagem.get("character_class")
-    if required_class and required_class != character_class:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Este item é exclusivo para a classe {required_class}"
-        )
-    
-    # Atualizar ouro
-    personagens_data[personagem_index]["gold"] = current_gold - total_price
     
-    # Atualizar inventário
-    if "itens" not in personagens_data[personagem_index]:
-        personagens_data[personagem_index]["itens"] = {}
-    
-    current_quantity = personagens_data[personagem_index]["itens"].get(request.item_name, 0)
-    personagens_data[personagem_index]["itens"][request.item_name] = current_quantity + request.quantity
+    def aplicar_compra(personagem: dict) -> None:
+        # Verificar se tem ouro suficiente
+        current_gold = personagem.get("gold", 0)
+        if current_gold < total_price:
+            raise HTTPException(
+                status_code=400, 
+                detail=f"Ouro insuficiente. Necessário: {total_price}, Disponível: {current_gold}"
+            )
+        
+        # Verificar restrição de classe
+        character_class = personagem.get("character_class")
+        if required_class and required_class != character_class:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Este item é exclusivo para a classe {required_class}"
+            )
+        
+        # Atualizar ouro e o contador do item no inventário
+        personagem["gold"] = current_gold - total_price
+        inventario = personagem.setdefault("itens", {})
+        inventario[request.item_name] = inventario.get(request.item_name, 0) + request.quantity
     
-    # Salvar no Firebase
+    # Leitura, validação e escrita na mesma transação (evita perda de
+    # atualização quando duas compras do mesmo usuário chegam juntas)
     try:
-        personagens_collection.document(user_id).update({
-            "personagens": personagens_data
-        })
+        personagem = await async_character_repository.update_character(
+            user_id, request.character_name, aplicar_compra
+        )
+    except HTTPException:
+        raise
+    except CharacterNotFoundError:
+        raise HTTPException(status_code=404, detail="Personagem não encontrado")
     except Exception as e:
+        logger.exception("shop_transaction_failed", extra={"fields": {
+            "user_id": user_id,
+            "character_name": request.character_name,
+            "item_name": request.item_name
+        }})
         raise HTTPException(status_code=500, detail=f"Erro ao salvar transação: {str(e)}")
     
     return {
@@ -401,59 +338,16 @@ def buy_item(request: BuyItemRequest, authorization: str = Header(None)):
         "message": f"Item '{request.item_name}' comprado com sucesso!",
         "quantity": request.quantity,
         "total_price": total_price,
-        "gold_remaining": personagens_data[personagem_index]["gold"],
-        "inventory": personagens_data[personagem_index]["itens"]
+        "gold_remaining": personagem["gold"],
+        "inventory": personagem["itens"]
     }
 
 @router.post("/shop/sell")
-def sell_item(request: SellItemRequest, authorization: str = Header(None)):
+async def sell_item(request: SellItemRequest, user_id: str = Depends(get_current_user)):
     """
     Vende um item do inventário do personagem.
     Adiciona 50% do valor original em ouro.
     """
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Não autorizado")
-
-    try:
-        scheme, token = authorization.split()
-        if scheme.lower() != "bearer":
-            raise HTTPException(status_code=401, detail="Formato de token inválido")
-    except ValueError:
-        raise HTTPException(status_code=401, detail="Formato de token inválido")
-
-    user_id = verify_key(token)
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Token inválido ou expirado")
-
-    # Buscar personagens do usuário
-    personagens_doc = personagens_collection.document(user_id).get()
-    if not personagens_doc.exists:
-        raise HTTPException(status_code=404, detail="Nenhum personagem encontrado")
-    
-    personagens_data = personagens_doc.to_dict().get("personagens", [])
-    
-    # Encontrar o personagem específico
-    personagem = None
-    personagem_index = None
-    for i, char in enumerate(personagens_data):
-        if char.get("name", "").lower() == request.character_name.lower():
-            personagem = char
-            personagem_index = i
-            break
-    
-    if not personagem:
-        raise HTTPException(status_code=404, detail="Personagem não encontrado")
-    
-    # Verificar se o personagem tem o item
-    inventory = personagem.get("itens", {})
-    current_quantity = inventory.get(request.item_name, 0)
-    
-    if current_quantity < request.quantity:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Quantidade insuficiente. Você tem: {current_quantity}, Tentando vender: {request.quantity}"
-        )
-    
     # Buscar informações do item para calcular preço de venda
     item_info = ItemTable.get_item_info(request.item_name)
     if not item_info:
@@ -462,24 +356,43 @@ def sell_item(request: SellItemRequest, authorization: str = Header(None)):
     item_price = item_info.get("valor", 0)
     sell_price = (item_price // 2) * request.quantity  # 50% do valor original
     
-    # Atualizar ouro
-    current_gold = personagem.get("gold", 0)
-    personagens_data[personagem_index]["gold"] = current_gold + sell_price
-    
-    # Atualizar inventário
-    new_quantity = current_quantity - request.quantity
-    if new_quantity <= 0:
-        # Remove o item do inventário se a quantidade chegar a 0
-        personagens_data[personagem_index]["itens"].pop(request.item_name, None)
-    else:
-        personagens_data[personagem_index]["itens"][request.item_name] = new_quantity
+    def aplicar_venda(personagem: dict) -> None:
+        # Verificar se o personagem tem o item
+        inventario = personagem.setdefault("itens", {})
+        current_quantity = inventario.get(request.item_name, 0)
+        
+        if current_quantity < request.quantity:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Quantidade insuficiente. Você tem: {current_quantity}, Tentando vender: {request.quantity}"
+            )
+        
+        # Atualizar ouro
+        personagem["gold"] = personagem.get("gold", 0) + sell_price
+        
+        # Atualizar inventário
+        new_quantity = current_quantity - request.quantity
+        if new_quantity <= 0:
+            # Remove o item do inventário se a quantidade chegar a 0
+            inventario.pop(request.item_name, None)
+        else:
+            inventario[request.item_name] = new_quantity
     
-    # Salvar no Firebase
+    # Leitura, validação e escrita na mesma transação
     try:
-        personagens_collection.document(user_id).update({
-            "personagens": personagens_data
-        })
+        personagem = await async_character_repository.update_character(
+            user_id, request.character_name, aplicar_venda
+        )
+    except HTTPException:
+        raise
+    except CharacterNotFoundError:
+        raise HTTPException(status_code=404, detail="Personagem não encontrado")
     except Exception as e:
+        logger.exception("shop_transaction_failed", extra={"fields": {
+            "user_id": user_id,
+            "character_name": request.character_name,
+            "item_name": request.item_name
+        }})
         raise HTTPException(status_code=500, detail=f"Erro ao salvar transação: {str(e)}")
     
     return {
@@ -487,59 +400,28 @@ def sell_item(request: SellItemRequest, authorization: str = Header(None)):
         "message": f"Item '{request.item_name}' vendido com sucesso!",
         "quantity": request.quantity,
         "gold_received": sell_price,
-        "gold_total": personagens_data[personagem_index]["gold"],
-        "inventory": personagens_data[personagem_index]["itens"]
+        "gold_total": personagem["gold"],
+        "inventory": personagem["itens"]
     }
 
-@router.get("/shop/items")
-def get_shop_items(authorization: str = Header(None)):
+@router.get("/shop/items", dependencies=[Depends(get_current_user)])
+async def get_shop_items(request: Request):
     """
     Retorna todos os itens disponíveis na loja.
     """
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Não autorizado")
-
-    try:
-        scheme, token = authorization.split()
-        if scheme.lower() != "bearer":
-            raise HTTPException(status_code=401, detail="Formato de token inválido")
-    except ValueError:
-        raise HTTPException(status_code=401, detail="Formato de token inválido")
-
-    user_id = verify_key(token)
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Token inválido ou expirado")
-    
-    return {
-        "items": ItemTable.ALL_ITEMS
-    }
+    return catalogs.respond("shop", request)
 
 @router.get("/personagens/{character_name}/gold")
-def get_character_gold(character_name: str, authorization: str = Header(None)):
+def get_character_gold(
+    character_name: str,
+    personagens_data: list | None = Depends(get_user_characters)
+):
     """
     Retorna o ouro atual de um personagem específico.
     """
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Não autorizado")
-
-    try:
-        scheme, token = authorization.split()
-        if scheme.lower() != "bearer":
-            raise HTTPException(status_code=401, detail="Formato de token inválido")
-    except ValueError:
-        raise HTTPException(status_code=401, detail="Formato de token inválido")
-
-    user_id = verify_key(token)
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Token inválido ou expirado")
-
-    # Buscar personagens do usuário
-    personagens_doc = personagens_collection.document(user_id).get()
-    if not personagens_doc.exists:
+    if personagens_data is None:
         raise HTTPException(status_code=404, detail="Nenhum personagem encontrado")
     
-    personagens_data = personagens_doc.to_dict().get("personagens", [])
-    
     # Encontrar o personagem específico
     for char in personagens_data:
         if char.get("name", "").lower() == character_name.lower():
@@ -0,0 +1,142 @@
+"""
+MidianText RPG - Repositórios Assíncronos de Personagens
+=========================================================
+
+Versões `async` das operações de personagens usadas pelas rotas mais
+acessadas (listagem, compra, venda e ações de missão). Com elas, os
+handlers são `async def` e um único worker mantém muitas requisições ao
+banco em andamento, sem ficar limitado ao tamanho do threadpool do FastAPI.
+
+Implementações:
+    - AsyncFirestoreCharacterRepository: firestore.AsyncClient e transações
+      assíncronas (produção)
+    - AsyncLocalCharacterRepository: Adapta um LocalCharacterRepository
+      (memory chama direto no event loop; sqlite usa uma thread por operação)
+
+Latência Simulada:
+    Para benchmarks sem rede, STORAGE_LATENCY_MS adiciona uma espera por
+    operação nos backends locais: time.sleep() no repositório síncrono e
+    asyncio.sleep() aqui, reproduzindo o custo de ida e volta do Firestore.
+"""
+
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Callable
+
+from commands.storage.base import (
+    CharacterNotFoundError,
+    CharacterRepository,
+    find_character
+)
+
+
+class AsyncCharacterRepository(ABC):
+    """Contrato assíncrono de acesso aos personagens."""
+
+    # Operações de dados medidas em GET /metrics (commands/metrics.py)
+    OPERATIONS = frozenset({"get_document", "update_character", "get_characters"})
+
+    @abstractmethod
+    async def get_document(self, user_id: str) -> dict | None:
+        """Retorna o documento de personagens do usuário ou None se não existir."""
+
+    @abstractmethod
+    async def update_character(self, user_id: str, character_name: str,
+                               mutator: Callable[[dict], None]) -> dict:
+        """
+        Lê, altera e grava um personagem atomicamente.
+
+        Mesma semântica de CharacterRepository.update_character().
+
+        Raises:
+            CharacterNotFoundError: Documento ou personagem inexistente
+        """
+
+    async def get_characters(self, user_id: str) -> list | None:
+        """
+        Retorna a lista de personagens do usuário.
+
+        Returns:
+            list | None: Lista de personagens ou None se o documento não existir
+        """
+        document = await self.get_document(user_id)
+        if document is None:
+            return None
+        return document.get("personagens", [])
+
+
+class AsyncFirestoreCharacterRepository(AsyncCharacterRepository):
+    """Repositório assíncrono sobre a collection 'personagens'."""
+
+    def __init__(self, get_client: Callable):
+        self._get_client = get_client
+
+    @property
+    def client(self):
+        return self._get_client()
+
+    @property
+    def collection(self):
+        return self.client.collection("personagens")
+
+    async def get_document(self, user_id: str) -> dict | None:
+        snapshot = await self.collection.document(user_id).get()
+        if not snapshot.exists:
+            return None
+        return snapshot.to_dict()
+
+    async def update_character(self, user_id: str, character_name: str,
+                               mutator: Callable[[dict], None]) -> dict:
+        from google.cloud import firestore
+
+        document_ref = self.collection.document(user_id)
+
+        @firestore.async_transactional
+        async def _update(transaction):
+            snapshot = await document_ref.get(transaction=transaction)
+            if not snapshot.exists:
+                raise CharacterNotFoundError(user_id)
+
+            personagens = snapshot.to_dict().get("personagens", [])
+            personagem = find_character(personagens, character_name)
+            if personagem is None:
+                raise CharacterNotFoundError(character_name)
+
+            mutator(personagem)
+
+            # Mesma regravação da lista do repositório síncrono
+            transaction.update(document_ref, {"personagens": personagens})
+            return personagem
+
+        return await _update(self.client.transaction())
+
+
+class AsyncLocalCharacterRepository(AsyncCharacterRepository):
+    """Adapta um repositório local (memory/sqlite) à interface assíncrona."""
+
+    def __init__(self, repository: CharacterRepository, offload: bool, latency: float = 0.0):
+        """
+        Args:
+            repository (CharacterRepository): Repositório local sem latência simulada
+            offload (bool): Executa as operações em uma thread (True para sqlite)
+            latency (float): Espera assíncrona por operação, em segundos
+        """
+        self.repository = repository
+        self.offload = offload
+        self.latency = latency
+
+    async def _call(self, func, *args):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.offload:
+            return await asyncio.to_thread(func, *args)
+        return func(*args)
+
+    async def get_document(self, user_id: str) -> dict | None:
+        return await self._call(self.repository.get_document, user_id)
+
+    async def update_character(self, user_id: str, character_name: str,
+                               mutator: Callable[[dict], None]) -> dict:
+        return await self._call(
+            self.repository.update_character, user_id, character_name, mutator
+        )
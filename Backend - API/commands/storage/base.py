@@ -0,0 +1,222 @@
+"""
+MidianText RPG - Interfaces de Repositório
+===========================================
+
+Este módulo define os contratos de acesso a dados utilizados pelas rotas da API.
+As rotas nunca conversam diretamente com o Firestore: elas recebem um
+repositório configurado em `commands/database.py`, o que permite trocar o
+backend de armazenamento sem alterar a lógica de negócio.
+
+Repositórios:
+    - CharacterRepository: Documento de personagens de cada usuário
+    - UserRepository: Dados de autenticação dos usuários
+
+Implementações Disponíveis:
+    - firestore: Firebase Firestore (produção)
+    - memory: Dicionário em processo (testes de carga e benchmarks locais)
+    - sqlite: Arquivo SQLite local (dados quentes sem rede)
+
+Índice de Usernames:
+    usernames/{username normalizado}:
+        - user_id: str
+        - username: str (como foi registrado)
+
+    Criado na mesma transação que o usuário, garante unicidade sem corrida
+    entre registros simultâneos e permite que o login faça uma leitura
+    pontual em vez de uma consulta. Usuários antigos (sem índice) são
+    encontrados pela consulta por username e indexados no primeiro login.
+
+Estrutura do Documento de Personagens:
+    personagens/{user_id}:
+        - user_id: str
+        - personagens: List[dict] (formato antigo, lido pelo frontend)
+        - <nome do personagem>: dict (formato novo, nome como chave)
+"""
+
+from abc import ABC, abstractmethod
+from typing import Callable
+
+
+class StorageError(Exception):
+    """Erro genérico da camada de armazenamento."""
+
+
+class DuplicateCharacterError(StorageError):
+    """Já existe um personagem com o mesmo nome para o usuário."""
+
+
+class CharacterLimitError(StorageError):
+    """O usuário atingiu o limite máximo de personagens."""
+
+
+class CharacterNotFoundError(StorageError):
+    """O documento do usuário ou o personagem solicitado não existe."""
+
+
+class DuplicateUsernameError(StorageError):
+    """Já existe um usuário com o mesmo username (normalizado)."""
+
+
+def normalize_username(username: str) -> str:
+    """Chave do índice de usernames: sem espaços nas pontas e sem distinção de maiúsculas."""
+    return username.strip().casefold()
+
+
+def find_character(personagens: list, character_name: str) -> dict | None:
+    """Retorna o personagem com o nome informado (ignorando maiúsculas) ou None."""
+    for personagem in personagens:
+        if personagem.get("name", "").lower() == character_name.lower():
+            return personagem
+    return None
+
+
+def check_new_character(personagens: list, character_name: str, max_characters: int) -> None:
+    """
+    Valida se um novo personagem pode ser adicionado à lista existente.
+
+    Args:
+        personagens (list): Personagens atuais do usuário
+        character_name (str): Nome do novo personagem
+        max_characters (int): Limite de personagens por usuário
+
+    Raises:
+        DuplicateCharacterError: Se o nome já estiver em uso (ignorando maiúsculas)
+        CharacterLimitError: Se o limite de personagens já foi atingido
+    """
+    for personagem in personagens:
+        if personagem.get("name", "").lower() == character_name.lower():
+            raise DuplicateCharacterError(character_name)
+
+    if len(personagens) >= max_characters:
+        raise CharacterLimitError(max_characters)
+
+
+class CharacterRepository(ABC):
+    """
+    Contrato de acesso aos documentos de personagens.
+
+    Cada usuário possui um único documento identificado pelo seu user_id,
+    contendo a lista de personagens e as entradas indexadas por nome.
+    """
+
+    # Indica se os dados são visíveis para outros processos (workers)
+    shareable = True
+    # Operações de dados medidas em GET /metrics (commands/metrics.py)
+    OPERATIONS = frozenset({
+        "get_document", "create_document", "add_character",
+        "update_character", "delete_character", "get_characters"
+    })
+
+    @abstractmethod
+    def get_document(self, user_id: str) -> dict | None:
+        """Retorna o documento completo do usuário ou None se não existir."""
+
+    @abstractmethod
+    def create_document(self, user_id: str) -> None:
+        """Cria o documento de personagens vazio para um novo usuário."""
+
+    @abstractmethod
+    def add_character(self, user_id: str, character: dict, entry: dict,
+                      max_characters: int) -> None:
+        """
+        Adiciona um personagem em uma única escrita atômica.
+
+        Mantém sincronizadas a lista 'personagens' (formato antigo) e a entrada
+        indexada pelo nome (formato novo). A verificação de nome duplicado e de
+        limite acontece dentro da mesma operação, evitando que duas criações
+        simultâneas ultrapassem o limite.
+
+        Args:
+            user_id (str): ID do usuário
+            character (dict): Personagem completo (formato antigo)
+            entry (dict): Entrada indexada pelo nome (formato novo)
+            max_characters (int): Limite de personagens por usuário
+
+        Raises:
+            DuplicateCharacterError: Nome já utilizado pelo usuário
+            CharacterLimitError: Limite de personagens atingido
+        """
+
+    @abstractmethod
+    def update_character(self, user_id: str, character_name: str,
+                         mutator: Callable[[dict], None]) -> dict:
+        """
+        Altera um personagem dentro de uma transação de leitura e escrita.
+
+        O mutator recebe o dict do personagem lido na própria transação e o
+        altera no lugar. Se ele lançar uma exceção, nada é gravado. Como o
+        Firestore pode repetir a transação em caso de conflito, o mutator deve
+        depender apenas do personagem recebido.
+
+        Args:
+            user_id (str): ID do usuário
+            character_name (str): Nome do personagem (ignorando maiúsculas)
+            mutator (Callable[[dict], None]): Função que altera o personagem
+
+        Returns:
+            dict: Personagem após a alteração
+
+        Raises:
+            CharacterNotFoundError: Documento ou personagem inexistente
+        """
+
+    @abstractmethod
+    def delete_character(self, user_id: str, character_name: str) -> None:
+        """
+        Remove um personagem dentro de uma transação de leitura e escrita.
+
+        Retira o personagem da lista 'personagens' (formato antigo) e apaga a
+        entrada indexada pelo nome (formato novo) no mesmo commit. A lista é
+        lida na própria transação, então alterações gravadas em paralelo
+        (compras, missões, outras exclusões) não são desfeitas.
+
+        Args:
+            user_id (str): ID do usuário
+            character_name (str): Nome do personagem (ignorando maiúsculas)
+
+        Raises:
+            CharacterNotFoundError: Documento ou personagem inexistente
+        """
+
+    def get_characters(self, user_id: str) -> list | None:
+        """
+        Retorna a lista de personagens do usuário.
+
+        Returns:
+            list | None: Lista de personagens ou None se o documento não existir
+        """
+        document = self.get_document(user_id)
+        if document is None:
+            return None
+        return document.get("personagens", [])
+
+
+class UserRepository(ABC):
+    """Contrato de acesso aos dados de autenticação dos usuários."""
+
+    # Operações de dados medidas em GET /metrics (commands/metrics.py)
+    OPERATIONS = frozenset({"find_by_username", "create_user"})
+
+    @abstractmethod
+    def find_by_username(self, username: str) -> tuple[str, dict] | None:
+        """
+        Retorna (user_id, dados) do usuário com o username informado ou None.
+
+        Usa o índice de usernames (leitura pontual). Usuários sem índice são
+        buscados por consulta e indexados na hora.
+        """
+
+    @abstractmethod
+    def create_user(self, data: dict) -> str:
+        """
+        Cria um novo usuário e sua entrada no índice de usernames atomicamente.
+
+        Args:
+            data (dict): Dados do usuário (username, salt, password)
+
+        Returns:
+            str: ID gerado para o usuário
+
+        Raises:
+            DuplicateUsernameError: O username (normalizado) já está em uso
+        """
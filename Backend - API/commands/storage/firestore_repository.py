@@ -0,0 +1,187 @@
+"""
+MidianText RPG - Repositórios Firebase Firestore
+=================================================
+
+Implementação dos repositórios sobre o Firebase Firestore, o backend de
+produção do jogo.
+
+Collections:
+    - usuarios: Dados de autenticação (username, salt, password)
+    - usernames: Índice username normalizado → user_id
+    - personagens: Documento de personagens por user_id
+
+Notes:
+    - Os repositórios recebem uma função que fornece o cliente (e não o
+      cliente em si): após um fork, cada processo obtém o seu próprio cliente
+      gRPC em vez de reutilizar o do processo pai
+    - Escritas parciais usam set(merge=True) para que nomes de personagens
+      com espaços ou pontos sejam tratados como chaves literais, e não como
+      caminhos de campo do Firestore
+"""
+
+import hashlib
+from typing import Callable
+
+from google.api_core.exceptions import AlreadyExists
+from google.cloud import firestore
+
+from commands.storage.base import (
+    CharacterNotFoundError,
+    CharacterRepository,
+    DuplicateUsernameError,
+    UserRepository,
+    check_new_character,
+    find_character,
+    normalize_username
+)
+
+
+class FirestoreCharacterRepository(CharacterRepository):
+    """Repositório de personagens sobre a collection 'personagens'."""
+
+    def __init__(self, get_client: Callable):
+        self._get_client = get_client
+
+    @property
+    def client(self):
+        return self._get_client()
+
+    @property
+    def collection(self):
+        return self.client.collection("personagens")
+
+    def get_document(self, user_id: str) -> dict | None:
+        snapshot = self.collection.document(user_id).get()
+        if not snapshot.exists:
+            return None
+        return snapshot.to_dict()
+
+    def create_document(self, user_id: str) -> None:
+        self.collection.document(user_id).set({
+            "user_id": user_id,
+            "personagens": []
+        })
+
+    def add_character(self, user_id: str, character: dict, entry: dict,
+                      max_characters: int) -> None:
+        document_ref = self.collection.document(user_id)
+
+        @firestore.transactional
+        def _add(transaction):
+            snapshot = document_ref.get(transaction=transaction)
+            personagens = snapshot.to_dict().get("personagens", []) if snapshot.exists else []
+            check_new_character(personagens, character["name"], max_characters)
+
+            # Lista antiga e entrada por nome gravadas no mesmo commit
+            transaction.set(document_ref, {
+                "user_id": user_id,
+                "personagens": personagens + [character],
+                character["name"]: entry
+            }, merge=True)
+
+        _add(self.client.transaction())
+
+    def update_character(self, user_id: str, character_name: str,
+                         mutator: Callable[[dict], None]) -> dict:
+        document_ref = self.collection.document(user_id)
+
+        @firestore.transactional
+        def _update(transaction):
+            snapshot = document_ref.get(transaction=transaction)
+            if not snapshot.exists:
+                raise CharacterNotFoundError(user_id)
+
+            personagens = snapshot.to_dict().get("personagens", [])
+            personagem = find_character(personagens, character_name)
+            if personagem is None:
+                raise CharacterNotFoundError(character_name)
+
+            mutator(personagem)
+
+            # Elementos de arrays não podem ser alterados individualmente no
+            # Firestore; a lista é regravada, mas protegida pela transação
+            transaction.update(document_ref, {"personagens": personagens})
+            return personagem
+
+        return _update(self.client.transaction())
+
+    def delete_character(self, user_id: str, character_name: str) -> None:
+        document_ref = self.collection.document(user_id)
+
+        @firestore.transactional
+        def _delete(transaction):
+            snapshot = document_ref.get(transaction=transaction)
+            if not snapshot.exists:
+                raise CharacterNotFoundError(user_id)
+
+            personagens = snapshot.to_dict().get("personagens", [])
+            personagem = find_character(personagens, character_name)
+            if personagem is None:
+                raise CharacterNotFoundError(character_name)
+
+            # Lista antiga e entrada por nome (como foi gravada e como foi
+            # pedida) removidas no mesmo commit
+            fields = {"personagens": [p for p in personagens if p is not personagem]}
+            for name in {personagem.get("name", character_name), character_name}:
+                fields[name] = firestore.DELETE_FIELD
+            transaction.set(document_ref, fields, merge=True)
+
+        _delete(self.client.transaction())
+
+
+class FirestoreUserRepository(UserRepository):
+    """Repositório de usuários sobre as collections 'usuarios' e 'usernames'."""
+
+    def __init__(self, get_client: Callable):
+        self._get_client = get_client
+
+    @property
+    def client(self):
+        return self._get_client()
+
+    @property
+    def collection(self):
+        return self.client.collection("usuarios")
+
+    @property
+    def index_collection(self):
+        return self.client.collection("usernames")
+
+    def _index_document(self, username: str):
+        # Usernames podem conter '/', inválido em IDs do Firestore
+        key = normalize_username(username).encode("utf-8")
+        return self.index_collection.document(hashlib.sha256(key).hexdigest())
+
+    def find_by_username(self, username: str) -> tuple[str, dict] | None:
+        index_ref = self._index_document(username)
+        index = index_ref.get()
+        if index.exists:
+            user_id = index.get("user_id")
+            user_doc = self.collection.document(user_id).get()
+            if user_doc.exists and user_doc.get("username") == username:
+                return user_id, user_doc.to_dict()
+
+        # Usuário antigo sem índice (ou username que difere só em maiúsculas)
+        query = self.collection.where("username", "==", username).limit(1).get()
+        if not query:
+            return None
+        user_doc = query[0]
+        try:
+            index_ref.create({"user_id": user_doc.id, "username": username})
+        except AlreadyExists:
+            pass
+        return user_doc.id, user_doc.to_dict()
+
+    def create_user(self, data: dict) -> str:
+        index_ref = self._index_document(data["username"])
+        user_ref = self.collection.document()
+
+        @firestore.transactional
+        def _create(transaction):
+            if index_ref.get(transaction=transaction).exists:
+                raise DuplicateUsernameError(data["username"])
+            transaction.create(index_ref, {"user_id": user_ref.id, "username": data["username"]})
+            transaction.set(user_ref, data)
+
+        _create(self.client.transaction())
+        return user_ref.id
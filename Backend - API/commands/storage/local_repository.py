@@ -0,0 +1,302 @@
+"""
+MidianText RPG - Repositórios Locais (Memória e SQLite)
+========================================================
+
+Implementações dos repositórios que não dependem de rede, usadas para testes
+de carga, benchmarks locais e como armazenamento barato para dados quentes.
+
+Ambas as implementações compartilham a mesma lógica de repositório e diferem
+apenas no DocumentStore utilizado:
+    - MemoryDocumentStore: Dicionário em processo (dados perdidos ao reiniciar)
+    - SQLiteDocumentStore: Documentos JSON em um arquivo SQLite
+
+Semântica:
+    - Documentos são copiados na leitura e na escrita, reproduzindo o
+      comportamento do Firestore (alterar o dict retornado não altera o banco)
+    - Todas as operações são protegidas por um lock reentrante do store
+    - Leituras e escritas que precisam ser atômicas (adicionar/alterar
+      personagem, criar usuário) usam store.transaction(): no SQLite, uma
+      transação BEGIN IMMEDIATE, que também as serializa entre processos
+      (workers) que usam o mesmo arquivo
+    - `latency` (STORAGE_LATENCY_MS) simula a ida e volta de rede do Firestore
+      em benchmarks; a espera acontece fora do lock, como numa requisição real
+"""
+
+import copy
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable
+
+from commands.storage.base import (
+    CharacterNotFoundError,
+    CharacterRepository,
+    DuplicateUsernameError,
+    UserRepository,
+    check_new_character,
+    find_character,
+    normalize_username
+)
+
+
+class DocumentStore(ABC):
+    """Armazenamento mínimo de documentos JSON agrupados por collection."""
+
+    # Indica se os documentos são visíveis para outros processos (workers)
+    shareable = True
+
+    def __init__(self):
+        self.lock = threading.RLock()
+
+    @contextmanager
+    def transaction(self):
+        """Agrupa leituras e escritas em uma operação atômica (reentrante)."""
+        with self.lock:
+            yield
+
+    @abstractmethod
+    def get(self, collection: str, doc_id: str) -> dict | None:
+        """Retorna uma cópia do documento ou None se não existir."""
+
+    @abstractmethod
+    def set(self, collection: str, doc_id: str, data: dict) -> None:
+        """Grava (substitui) o documento."""
+
+    @abstractmethod
+    def create(self, collection: str, doc_id: str, data: dict) -> bool:
+        """Grava o documento apenas se ele não existir; retorna False se já existia."""
+
+    @abstractmethod
+    def find(self, collection: str, field: str, value) -> list[tuple[str, dict]]:
+        """Retorna os documentos cujo campo de primeiro nível é igual a value."""
+
+
+class MemoryDocumentStore(DocumentStore):
+    """DocumentStore em memória, sem persistência."""
+
+    shareable = False
+
+    def __init__(self):
+        super().__init__()
+        self._collections: dict[str, dict[str, dict]] = {}
+
+    def get(self, collection: str, doc_id: str) -> dict | None:
+        with self.lock:
+            document = self._collections.get(collection, {}).get(doc_id)
+            return copy.deepcopy(document) if document is not None else None
+
+    def set(self, collection: str, doc_id: str, data: dict) -> None:
+        with self.lock:
+            self._collections.setdefault(collection, {})[doc_id] = copy.deepcopy(data)
+
+    def create(self, collection: str, doc_id: str, data: dict) -> bool:
+        with self.lock:
+            documents = self._collections.setdefault(collection, {})
+            if doc_id in documents:
+                return False
+            documents[doc_id] = copy.deepcopy(data)
+            return True
+
+    def find(self, collection: str, field: str, value) -> list[tuple[str, dict]]:
+        with self.lock:
+            return [
+                (doc_id, copy.deepcopy(document))
+                for doc_id, document in self._collections.get(collection, {}).items()
+                if document.get(field) == value
+            ]
+
+
+class SQLiteDocumentStore(DocumentStore):
+    """DocumentStore persistido como JSON em uma tabela SQLite."""
+
+    def __init__(self, path: str):
+        super().__init__()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._in_transaction = False
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                "collection TEXT NOT NULL, "
+                "doc_id TEXT NOT NULL, "
+                "data TEXT NOT NULL, "
+                "PRIMARY KEY (collection, doc_id))"
+            )
+
+    @contextmanager
+    def transaction(self):
+        """
+        Transação BEGIN IMMEDIATE: o lock de escrita do arquivo é obtido já
+        na leitura, então outro processo não intercala uma escrita entre a
+        leitura e a gravação. Transações aninhadas fazem parte da externa.
+        """
+        with self.lock:
+            if self._in_transaction:
+                yield
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._in_transaction = True
+            try:
+                yield
+            except BaseException:
+                self._conn.rollback()
+                raise
+            else:
+                self._conn.commit()
+            finally:
+                self._in_transaction = False
+
+    def get(self, collection: str, doc_id: str) -> dict | None:
+        with self.lock:
+            row = self._conn.execute(
+                "SELECT data FROM documents WHERE collection = ? AND doc_id = ?",
+                (collection, doc_id)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, collection: str, doc_id: str, data: dict) -> None:
+        payload = json.dumps(data, ensure_ascii=False)
+        with self.transaction():
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents (collection, doc_id, data) VALUES (?, ?, ?)",
+                (collection, doc_id, payload)
+            )
+
+    def create(self, collection: str, doc_id: str, data: dict) -> bool:
+        payload = json.dumps(data, ensure_ascii=False)
+        with self.transaction():
+            # INSERT OR IGNORE é atômico também entre processos no mesmo arquivo
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO documents (collection, doc_id, data) VALUES (?, ?, ?)",
+                (collection, doc_id, payload)
+            )
+        return cursor.rowcount == 1
+
+    def find(self, collection: str, field: str, value) -> list[tuple[str, dict]]:
+        with self.lock:
+            rows = self._conn.execute(
+                "SELECT doc_id, data FROM documents "
+                "WHERE collection = ? AND json_extract(data, ?) = ?",
+                (collection, f'$."{field}"', value)
+            ).fetchall()
+        return [(doc_id, json.loads(data)) for doc_id, data in rows]
+
+
+class LocalCharacterRepository(CharacterRepository):
+    """Repositório de personagens sobre um DocumentStore local."""
+
+    COLLECTION = "personagens"
+
+    def __init__(self, store: DocumentStore, latency: float = 0.0):
+        self.store = store
+        self.latency = latency
+
+    @property
+    def shareable(self) -> bool:
+        return self.store.shareable
+
+    def _simulate_latency(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get_document(self, user_id: str) -> dict | None:
+        self._simulate_latency()
+        return self.store.get(self.COLLECTION, user_id)
+
+    def create_document(self, user_id: str) -> None:
+        self._simulate_latency()
+        self.store.set(self.COLLECTION, user_id, {
+            "user_id": user_id,
+            "personagens": []
+        })
+
+    def add_character(self, user_id: str, character: dict, entry: dict,
+                      max_characters: int) -> None:
+        self._simulate_latency()
+        with self.store.transaction():
+            document = self.store.get(self.COLLECTION, user_id) or {"user_id": user_id}
+            personagens = document.get("personagens", [])
+            check_new_character(personagens, character["name"], max_characters)
+
+            document["personagens"] = personagens + [character]
+            document[character["name"]] = entry
+            self.store.set(self.COLLECTION, user_id, document)
+
+    def update_character(self, user_id: str, character_name: str,
+                         mutator: Callable[[dict], None]) -> dict:
+        self._simulate_latency()
+        with self.store.transaction():
+            document = self.store.get(self.COLLECTION, user_id)
+            if document is None:
+                raise CharacterNotFoundError(user_id)
+
+            personagem = find_character(document.get("personagens", []), character_name)
+            if personagem is None:
+                raise CharacterNotFoundError(character_name)
+
+            mutator(personagem)
+            self.store.set(self.COLLECTION, user_id, document)
+            return personagem
+
+    def delete_character(self, user_id: str, character_name: str) -> None:
+        self._simulate_latency()
+        with self.store.transaction():
+            document = self.store.get(self.COLLECTION, user_id)
+            if document is None:
+                raise CharacterNotFoundError(user_id)
+
+            personagens = document.get("personagens", [])
+            personagem = find_character(personagens, character_name)
+            if personagem is None:
+                raise CharacterNotFoundError(character_name)
+
+            document["personagens"] = [p for p in personagens if p is not personagem]
+            for name in {personagem.get("name", character_name), character_name}:
+                document.pop(name, None)
+            self.store.set(self.COLLECTION, user_id, document)
+
+
+class LocalUserRepository(UserRepository):
+    """Repositório de usuários sobre um DocumentStore local."""
+
+    COLLECTION = "usuarios"
+    INDEX_COLLECTION = "usernames"
+
+    def __init__(self, store: DocumentStore):
+        self.store = store
+
+    def find_by_username(self, username: str) -> tuple[str, dict] | None:
+        index = self.store.get(self.INDEX_COLLECTION, normalize_username(username))
+        if index is not None:
+            user = self.store.get(self.COLLECTION, index["user_id"])
+            if user is not None and user.get("username") == username:
+                return index["user_id"], user
+
+        # Usuário antigo sem índice (ou username que difere só em maiúsculas)
+        matches = self.store.find(self.COLLECTION, "username", username)
+        if not matches:
+            return None
+        user_id, user = matches[0]
+        self.store.create(
+            self.INDEX_COLLECTION,
+            normalize_username(username),
+            {"user_id": user_id, "username": username}
+        )
+        return user_id, user
+
+    def create_user(self, data: dict) -> str:
+        # IDs no mesmo formato dos IDs automáticos do Firestore (20 caracteres)
+        user_id = uuid.uuid4().hex[:20]
+        with self.store.transaction():
+            # O índice é reservado primeiro: só um registro simultâneo vence
+            if not self.store.create(
+                self.INDEX_COLLECTION,
+                normalize_username(data["username"]),
+                {"user_id": user_id, "username": data["username"]}
+            ):
+                raise DuplicateUsernameError(data["username"])
+            self.store.set(self.COLLECTION, user_id, data)
+        return user_id
@@ -0,0 +1,214 @@
+"""
+MidianText RPG - Armazenamento de Tentativas de Login
+======================================================
+
+Este módulo guarda o estado usado pela proteção contra força bruta do login
+(commands/login_guard.py):
+    - Janelas deslizantes de falhas por chave ("user:<nome>", "ip:<endereço>")
+    - Marcações com expiração (cache de "usuário não existe")
+
+Implementações:
+    - MemoryLoginAttemptStore: Em processo, limitado a `max_keys` chaves
+      (cada worker tem sua própria contagem)
+    - SQLiteLoginAttemptStore: Tabelas no arquivo SQLite (compartilhado entre
+      workers da mesma máquina)
+"""
+
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+
+
+class LoginAttemptStore(ABC):
+    """Contrato de armazenamento das tentativas de login."""
+
+    # Indica se as tentativas são visíveis para outros processos (workers)
+    shareable = True
+    # Indica se as operações fazem I/O (as rotas async as executam em uma thread)
+    blocking = True
+    # Operações de dados medidas em GET /metrics (commands/metrics.py)
+    OPERATIONS = frozenset({"hit", "window_state", "clear", "mark", "is_marked", "unmark"})
+
+    @abstractmethod
+    def hit(self, key: str, window: float) -> None:
+        """Registra uma falha para a chave (falhas fora da janela são descartadas)."""
+
+    @abstractmethod
+    def window_state(self, key: str, window: float) -> tuple[int, float]:
+        """
+        Retorna (falhas na janela, segundos até a falha mais antiga sair da janela).
+
+        Sem falhas na janela, retorna (0, 0.0).
+        """
+
+    @abstractmethod
+    def clear(self, key: str) -> None:
+        """Remove todas as falhas da chave."""
+
+    @abstractmethod
+    def mark(self, key: str, ttl: float) -> None:
+        """Cria (ou renova) uma marcação que expira após ttl segundos."""
+
+    @abstractmethod
+    def is_marked(self, key: str) -> bool:
+        """Indica se existe uma marcação válida para a chave."""
+
+    @abstractmethod
+    def unmark(self, key: str) -> None:
+        """Remove a marcação da chave, se existir."""
+
+
+class MemoryLoginAttemptStore(LoginAttemptStore):
+    """Tentativas em memória; as chaves menos usadas são descartadas acima de max_keys."""
+
+    shareable = False
+    blocking = False
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._attempts: OrderedDict[str, deque] = OrderedDict()
+        self._marks: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _trim(self, key: str, window: float, now: float) -> deque | None:
+        attempts = self._attempts.get(key)
+        if attempts is None:
+            return None
+        while attempts and attempts[0] <= now - window:
+            attempts.popleft()
+        if not attempts:
+            del self._attempts[key]
+            return None
+        return attempts
+
+    def hit(self, key: str, window: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            attempts = self._trim(key, window, now)
+            if attempts is None:
+                attempts = self._attempts[key] = deque()
+            attempts.append(now)
+            self._attempts.move_to_end(key)
+            while len(self._attempts) > self.max_keys:
+                self._attempts.popitem(last=False)
+
+    def window_state(self, key: str, window: float) -> tuple[int, float]:
+        with self._lock:
+            now = time.monotonic()
+            attempts = self._trim(key, window, now)
+            if attempts is None:
+                return 0, 0.0
+            return len(attempts), attempts[0] + window - now
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            self._attempts.pop(key, None)
+
+    def mark(self, key: str, ttl: float) -> None:
+        with self._lock:
+            self._marks[key] = time.monotonic() + ttl
+            self._marks.move_to_end(key)
+            while len(self._marks) > self.max_keys:
+                self._marks.popitem(last=False)
+
+    def is_marked(self, key: str) -> bool:
+        with self._lock:
+            expires_at = self._marks.get(key)
+            if expires_at is None:
+                return False
+            if expires_at <= time.monotonic():
+                del self._marks[key]
+                return False
+            return True
+
+    def unmark(self, key: str) -> None:
+        with self._lock:
+            self._marks.pop(key, None)
+
+
+class SQLiteLoginAttemptStore(LoginAttemptStore):
+    """Tentativas persistidas em tabelas SQLite, visíveis para todos os workers."""
+
+    # Intervalo (em gravações) entre limpezas dos registros expirados
+    CLEANUP_EVERY = 500
+
+    # Janela máxima mantida na limpeza periódica (segundos)
+    RETENTION = 86400
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._lock = threading.Lock()
+        self._writes = 0
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS login_attempts ("
+                "attempt_key TEXT NOT NULL, "
+                "ts REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS login_attempts_key "
+                "ON login_attempts (attempt_key, ts)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS login_marks ("
+                "mark_key TEXT PRIMARY KEY, "
+                "expires_at REAL NOT NULL)"
+            )
+
+    def _maybe_cleanup(self, now: float) -> None:
+        self._writes += 1
+        if self._writes % self.CLEANUP_EVERY == 0:
+            self._conn.execute("DELETE FROM login_attempts WHERE ts <= ?", (now - self.RETENTION,))
+            self._conn.execute("DELETE FROM login_marks WHERE expires_at <= ?", (now,))
+
+    def hit(self, key: str, window: float) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM login_attempts WHERE attempt_key = ? AND ts <= ?",
+                (key, now - window)
+            )
+            self._conn.execute(
+                "INSERT INTO login_attempts (attempt_key, ts) VALUES (?, ?)",
+                (key, now)
+            )
+            self._maybe_cleanup(now)
+
+    def window_state(self, key: str, window: float) -> tuple[int, float]:
+        now = time.time()
+        with self._lock:
+            count, oldest = self._conn.execute(
+                "SELECT COUNT(*), MIN(ts) FROM login_attempts "
+                "WHERE attempt_key = ? AND ts > ?",
+                (key, now - window)
+            ).fetchone()
+        if not count:
+            return 0, 0.0
+        return count, oldest + window - now
+
+    def clear(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM login_attempts WHERE attempt_key = ?", (key,))
+
+    def mark(self, key: str, ttl: float) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO login_marks (mark_key, expires_at) VALUES (?, ?)",
+                (key, now + ttl)
+            )
+            self._maybe_cleanup(now)
+
+    def is_marked(self, key: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM login_marks WHERE mark_key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+        return row is not None
+
+    def unmark(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM login_marks WHERE mark_key = ?", (key,))
@@ -0,0 +1,317 @@
+"""
+MidianText RPG - Armazenamento de Sessões de Missão
+====================================================
+
+Este módulo guarda o progresso de cada missão em andamento (sala atual,
+inimigos derrotados, tesouros coletados...). A sessão é identificada pela
+chave "{user_id}_{personagem}_{missão}" e precisa ser serializável em JSON.
+
+Implementações:
+    - MemoryMissionSessionStore: LRU + TTL em processo (limitado em memória,
+      perdido ao reiniciar, não compartilhado entre workers)
+    - SQLiteMissionSessionStore: Arquivo SQLite local (sobrevive a reinícios e
+      é compartilhado entre workers da mesma máquina)
+    - FirestoreMissionSessionStore: Collection 'mission_sessions' (compartilhado
+      entre máquinas)
+
+Expiração:
+    Toda sessão expira após `ttl` segundos sem ser gravada. Missões abandonadas
+    são descartadas automaticamente, mantendo o armazenamento limitado.
+
+    Sessões descartadas (expiradas ou, no backend memory, removidas pelo
+    limite de tamanho) são entregues ao handler de set_expire_handler(), uma
+    única vez, para que alterações ainda pendentes nelas sejam gravadas. As
+    sessões expiradas são recolhidas quando lidas novamente e a cada
+    CLEANUP_EVERY gravações (memory: a cada leitura/gravação).
+
+    No Firestore, configure a política de TTL sobre o campo 'purge_at'
+    (expires_at + PURGE_GRACE), e não sobre 'expires_at': assim a limpeza
+    periódica entrega as sessões ao handler antes da remoção física.
+
+Rotas Assíncronas:
+    get_async() / save_async() / delete_async() executam as operações em uma thread, exceto
+    no backend memory, que responde direto no event loop.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+logger = logging.getLogger("midiantext.mission_sessions")
+
+
+class MissionSessionStore(ABC):
+    """Contrato de armazenamento das sessões de missão."""
+
+    # Indica se a sessão é visível para outros processos (workers)
+    shareable = True
+    # Operações de dados medidas em GET /metrics (commands/metrics.py);
+    # set_expire_handler() é configuração e não entra
+    OPERATIONS = frozenset({
+        "get", "save", "delete", "get_async", "save_async", "delete_async"
+    })
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._expire_handler: Callable[[str, dict], None] | None = None
+
+    def set_expire_handler(self, handler: Callable[[str, dict], None]) -> None:
+        """Registra a função chamada com (chave, sessão) para cada sessão descartada."""
+        self._expire_handler = handler
+
+    def _notify_expired(self, sessions: list[tuple[str, dict]]) -> None:
+        """Entrega as sessões descartadas ao handler (chamado fora dos locks)."""
+        if self._expire_handler is None:
+            return
+        for key, session in sessions:
+            try:
+                self._expire_handler(key, session)
+            except Exception:
+                logger.exception("mission_session_expire_handler_failed")
+
+    @abstractmethod
+    def get(self, key: str) -> dict | None:
+        """Retorna a sessão (cópia independente) ou None se não existir/expirou."""
+
+    @abstractmethod
+    def save(self, key: str, session: dict) -> None:
+        """Grava a sessão e renova sua expiração."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove a sessão, se existir."""
+
+    async def get_async(self, key: str) -> dict | None:
+        """Versão assíncrona de get()."""
+        return await asyncio.to_thread(self.get, key)
+
+    async def save_async(self, key: str, session: dict) -> None:
+        """Versão assíncrona de save()."""
+        await asyncio.to_thread(self.save, key, session)
+
+    async def delete_async(self, key: str) -> None:
+        """Versão assíncrona de delete()."""
+        await asyncio.to_thread(self.delete, key)
+
+
+class MemoryMissionSessionStore(MissionSessionStore):
+    """
+    Sessões em memória com descarte LRU e expiração por TTL.
+
+    Como a expiração é renovada a cada gravação e o TTL é fixo, a ordem LRU
+    coincide com a ordem de expiração: as sessões expiradas estão sempre no
+    início do OrderedDict e podem ser descartadas sem percorrer o restante.
+    """
+
+    shareable = False
+
+    def __init__(self, ttl: float, max_sessions: int):
+        super().__init__(ttl)
+        self.max_sessions = max_sessions
+        self._sessions: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _purge_expired(self, now: float, discarded: list) -> None:
+        while self._sessions:
+            key, (expires_at, session) = next(iter(self._sessions.items()))
+            if expires_at > now:
+                break
+            self._sessions.popitem(last=False)
+            discarded.append((key, session))
+
+    def get(self, key: str) -> dict | None:
+        discarded = []
+        with self._lock:
+            self._purge_expired(time.monotonic(), discarded)
+            entry = self._sessions.get(key)
+            session = copy.deepcopy(entry[1]) if entry is not None else None
+        self._notify_expired(discarded)
+        return session
+
+    def save(self, key: str, session: dict) -> None:
+        discarded = []
+        with self._lock:
+            now = time.monotonic()
+            # Antes de gravar: uma sessão expirada com a mesma chave é entregue
+            # ao handler em vez de ser sobrescrita
+            self._purge_expired(now, discarded)
+            self._sessions[key] = (now + self.ttl, copy.deepcopy(session))
+            self._sessions.move_to_end(key)
+            while len(self._sessions) > self.max_sessions:
+                evicted_key, (_, evicted) = self._sessions.popitem(last=False)
+                discarded.append((evicted_key, evicted))
+        self._notify_expired(discarded)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._sessions.pop(key, None)
+
+    # Operações em memória não bloqueiam: sem custo de troca de thread
+    async def get_async(self, key: str) -> dict | None:
+        return self.get(key)
+
+    async def save_async(self, key: str, session: dict) -> None:
+        self.save(key, session)
+
+    async def delete_async(self, key: str) -> None:
+        self.delete(key)
+
+
+class SQLiteMissionSessionStore(MissionSessionStore):
+    """Sessões persistidas em uma tabela SQLite com coluna de expiração."""
+
+    # Intervalo (em gravações) entre limpezas das sessões expiradas
+    CLEANUP_EVERY = 500
+
+    def __init__(self, ttl: float, path: str):
+        super().__init__(ttl)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._lock = threading.Lock()
+        self._writes = 0
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS mission_sessions ("
+                "session_key TEXT PRIMARY KEY, "
+                "data TEXT NOT NULL, "
+                "expires_at REAL NOT NULL)"
+            )
+
+    def _take_expired(self, now: float, key: str | None = None) -> list[tuple[str, dict]]:
+        """
+        Remove as sessões expiradas (todas ou só `key`) e as retorna.
+
+        DELETE ... RETURNING é atômico: com vários workers, cada sessão
+        expirada é entregue ao handler por um único processo.
+        """
+        query = "DELETE FROM mission_sessions WHERE expires_at <= ?"
+        params: tuple = (now,)
+        if key is not None:
+            query += " AND session_key = ?"
+            params = (now, key)
+        with self._lock, self._conn:
+            rows = self._conn.execute(query + " RETURNING session_key, data", params).fetchall()
+        return [(session_key, json.loads(data)) for session_key, data in rows]
+
+    def get(self, key: str) -> dict | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, expires_at FROM mission_sessions WHERE session_key = ?",
+                (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        if row[1] <= now:
+            self._notify_expired(self._take_expired(now, key))
+            return None
+        return json.loads(row[0])
+
+    def save(self, key: str, session: dict) -> None:
+        payload = json.dumps(session, ensure_ascii=False)
+        now = time.time()
+        # Uma sessão expirada com a mesma chave é entregue ao handler antes
+        # de ser sobrescrita
+        expired = self._take_expired(now, key)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO mission_sessions (session_key, data, expires_at) "
+                "VALUES (?, ?, ?)",
+                (key, payload, now + self.ttl)
+            )
+            self._writes += 1
+            cleanup = self._writes % self.CLEANUP_EVERY == 0
+        if cleanup:
+            expired += self._take_expired(now)
+        self._notify_expired(expired)
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM mission_sessions WHERE session_key = ?", (key,))
+
+
+class FirestoreMissionSessionStore(MissionSessionStore):
+    """Sessões na collection 'mission_sessions' do Firestore."""
+
+    # Intervalo (em gravações, por processo) entre limpezas das sessões expiradas
+    CLEANUP_EVERY = 500
+    # Sessões expiradas recolhidas por limpeza
+    CLEANUP_BATCH = 100
+    # Folga entre a expiração e a remoção física pela política de TTL
+    PURGE_GRACE = timedelta(days=1)
+
+    def __init__(self, ttl: float, get_client: Callable):
+        super().__init__(ttl)
+        self._get_client = get_client
+        self._writes = 0
+
+    @property
+    def collection(self):
+        # Cliente obtido a cada uso: cada processo (worker) usa o seu
+        return self._get_client().collection("mission_sessions")
+
+    def _document(self, key: str):
+        # Nomes de personagem podem conter '/', inválido em IDs do Firestore
+        return self.collection.document(hashlib.sha256(key.encode("utf-8")).hexdigest())
+
+    def _take_expired(self, document_ref) -> list[tuple[str, dict]]:
+        """Remove o documento se ainda estiver expirado (em transação) e retorna a sessão."""
+        from google.cloud import firestore
+
+        @firestore.transactional
+        def _take(transaction):
+            snapshot = document_ref.get(transaction=transaction)
+            if not snapshot.exists:
+                return []
+            document = snapshot.to_dict()
+            if document["expires_at"] > datetime.now(timezone.utc):
+                return []
+            transaction.delete(document_ref)
+            return [(document["session_key"], document["data"])]
+
+        return _take(self._get_client().transaction())
+
+    def get(self, key: str) -> dict | None:
+        document_ref = self._document(key)
+        snapshot = document_ref.get()
+        if not snapshot.exists:
+            return None
+        document = snapshot.to_dict()
+        if document["expires_at"] <= datetime.now(timezone.utc):
+            self._notify_expired(self._take_expired(document_ref))
+            return None
+        return document["data"]
+
+    def save(self, key: str, session: dict) -> None:
+        # Sem verificar a sessão anterior (uma leitura a mais por gravação):
+        # as rotas sempre chamam get() antes, que já entrega a expirada
+        document_ref = self._document(key)
+        expired = []
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.ttl)
+        document_ref.set({
+            "session_key": key,
+            "data": session,
+            "expires_at": expires_at,
+            "purge_at": expires_at + self.PURGE_GRACE
+        })
+        self._writes += 1
+        if self._writes % self.CLEANUP_EVERY == 0:
+            query = (
+                self.collection
+                .where("expires_at", "<=", datetime.now(timezone.utc))
+                .limit(self.CLEANUP_BATCH)
+            )
+            for snapshot in query.stream():
+                expired += self._take_expired(snapshot.reference)
+        self._notify_expired(expired)
+
+    def delete(self, key: str) -> None:
+        self._document(key).delete()
@@ -0,0 +1,127 @@
+"""
+MidianText RPG - Unidade de Trabalho de Personagens
+====================================================
+
+Agrupa todas as alterações de um personagem feitas durante uma requisição e
+as grava em uma única escrita no repositório.
+
+Uso Típico (ação de missão):
+    uow = CharacterUnitOfWork(character_repository, user_id, "Aragorn")
+    uow.add("status.hp_atual", -8)
+    uow.add("gold", 50)
+    uow.commit()  # Uma única transação com as duas alterações
+
+Valores Absolutos x Incrementos:
+    set() grava um valor fixo; add() soma um incremento ao valor lido DENTRO
+    da transação. Use add() para ouro e HP: um valor absoluto calculado a
+    partir de uma leitura anterior desfaria alterações feitas nesse meio
+    tempo por outras rotas (ex: uma compra na loja).
+
+Rotas Assíncronas:
+    Com um AsyncCharacterRepository, use `await uow.commit_async()`.
+
+Chaves Aninhadas:
+    Chaves com ponto (ex: "status.hp_atual") alteram campos dentro de dicts,
+    criando os níveis intermediários quando necessário.
+"""
+
+from commands.storage.async_repository import AsyncCharacterRepository
+from commands.storage.base import CharacterNotFoundError, CharacterRepository
+
+
+def _field_parent(character: dict, key: str) -> tuple[dict, str]:
+    """Retorna (dict que contém o campo, nome do campo), criando níveis intermediários."""
+    keys = key.split('.')  # Suporta nested keys como "status.hp_atual"
+    current = character
+    for k in keys[:-1]:
+        if k not in current:
+            current[k] = {}
+        current = current[k]
+    return current, keys[-1]
+
+
+def apply_updates(character: dict, updates: dict | None, increments: dict | None = None) -> None:
+    """
+    Aplica um conjunto de alterações (com suporte a chaves aninhadas) a um personagem.
+
+    Args:
+        character (dict): Personagem a ser alterado no lugar
+        updates (dict | None): Valores absolutos no formato {campo ou "a.b.c": valor}
+        increments (dict | None): Incrementos no mesmo formato; o resultado
+                                  nunca fica negativo (ouro e HP)
+    """
+    for key, value in (updates or {}).items():
+        parent, field = _field_parent(character, key)
+        parent[field] = value
+
+    for key, amount in (increments or {}).items():
+        parent, field = _field_parent(character, key)
+        parent[field] = max(0, parent.get(field, 0) + amount)
+
+
+class CharacterUnitOfWork:
+    """Acumula alterações de um personagem e as grava em uma única escrita."""
+
+    def __init__(self, repository: CharacterRepository | AsyncCharacterRepository,
+                 user_id: str, character_name: str):
+        self.repository = repository
+        self.user_id = user_id
+        self.character_name = character_name
+        self.updates: dict = {}
+        self.increments: dict = {}
+        # Personagem como ficou gravado no último commit
+        self.character: dict | None = None
+
+    def set(self, field: str, value) -> None:
+        """Registra uma alteração; alterações repetidas no mesmo campo se sobrepõem."""
+        self.updates[field] = value
+
+    def add(self, field: str, amount: int) -> None:
+        """Registra um incremento; incrementos repetidos no mesmo campo se somam."""
+        self.increments[field] = self.increments.get(field, 0) + amount
+
+    def merge(self, updates: dict | None = None, increments: dict | None = None) -> None:
+        """Registra várias alterações de uma vez (ex: alterações adiadas)."""
+        self.updates.update(updates or {})
+        for field, amount in (increments or {}).items():
+            self.add(field, amount)
+
+    def _mutator(self):
+        updates, increments = self.updates, self.increments
+        return lambda character: apply_updates(character, updates, increments)
+
+    def commit(self) -> bool:
+        """
+        Grava todas as alterações pendentes em uma única transação.
+
+        Returns:
+            bool: True se gravou (ou não havia nada a gravar), False se o
+                  personagem não existe mais
+        """
+        if not self.updates and not self.increments:
+            return True
+
+        try:
+            self.character = self.repository.update_character(
+                self.user_id, self.character_name, self._mutator()
+            )
+        except CharacterNotFoundError:
+            return False
+
+        self.updates, self.increments = {}, {}
+        return True
+
+    async def commit_async(self) -> bool:
+        """Versão de commit() para repositórios assíncronos."""
+        if not self.updates and not self.increments:
+            return True
+
+        try:
+            self.character = await self.repository.update_character(
+                self.user_id, self.character_name, self._mutator()
+            )
+        except CharacterNotFoundError:
+            return False
+
+        self.updates, self.increments = {}, {}
+        return True
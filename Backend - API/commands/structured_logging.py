@@ -0,0 +1,231 @@
+"""
+MidianText RPG - Logging Estruturado
+=====================================
+
+Este módulo configura os logs da API: uma linha JSON por evento, com nível,
+id da requisição e campos estruturados, gravada por uma thread separada.
+
+Funcionalidades:
+    - Formato JSON (ts, level, logger, event, request_id, route + campos)
+    - Id por requisição: header X-Request-ID recebido ou gerado, devolvido
+      na resposta e anexado a todos os logs da requisição
+    - Amostragem por rota: logs abaixo de WARNING só são gravados em uma
+      fração das requisições (decidida uma vez por requisição)
+    - Não bloqueante: os handlers apenas enfileiram (QueueHandler); a escrita
+      em stderr acontece na thread do QueueListener. Com a fila cheia, o
+      evento é descartado e contado, em vez de travar a requisição
+
+Uso:
+    logger = logging.getLogger("midiantext.missions")
+    logger.debug("start_mission", extra={"fields": {"mission_id": "tumbas_farao"}})
+
+Environment Variables:
+    LOG_LEVEL: DEBUG | INFO | WARNING | ERROR (padrão: INFO, logs de debug desligados)
+    LOG_SAMPLE_RATE: Fração das requisições com logs < WARNING gravados (padrão: 1.0)
+    LOG_SAMPLE_RATES: Frações por rota, ex: "/missions/action=0.05,/login=1"
+    LOG_QUEUE_SIZE: Eventos aguardando escrita antes de descartar (padrão: 10000)
+"""
+
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+from dotenv import load_dotenv
+
+# Carregar variáveis de ambiente do arquivo .env (se existir)
+load_dotenv()
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+# Logger raiz da aplicação (os módulos usam "midiantext.<módulo>")
+ROOT_LOGGER = "midiantext"
+
+# Campos padrão de LogRecord que não são repetidos no JSON
+_RESERVED_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "fields"}
+
+
+def _parse_sample_rates(value: str) -> dict[str, float]:
+    """Converte "/rota=0.1,/outra=1" em {"/rota": 0.1, "/outra": 1.0}."""
+    rates = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        route, _, rate = item.rpartition("=")
+        rates[route.strip()] = float(rate)
+    return rates
+
+
+LOG_SAMPLE_RATES = _parse_sample_rates(os.getenv("LOG_SAMPLE_RATES", ""))
+
+
+class RequestLogContext:
+    """Dados da requisição atual usados pelos logs."""
+
+    __slots__ = ("request_id", "scope", "_sampled")
+
+    def __init__(self, request_id: str, scope: dict):
+        self.request_id = request_id
+        self.scope = scope
+        self._sampled = None
+
+    @property
+    def route(self) -> str:
+        # Template da rota quando já resolvida pelo roteador (ex: /missions/{mission_id})
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or self.scope.get("path", "")
+
+    @property
+    def sampled(self) -> bool:
+        """Decide (uma vez por requisição) se os logs < WARNING serão gravados."""
+        if self._sampled is None:
+            rate = LOG_SAMPLE_RATES.get(self.route, LOG_SAMPLE_RATE)
+            self._sampled = rate >= 1 or random.random() < rate
+        return self._sampled
+
+
+_log_context: ContextVar[RequestLogContext | None] = ContextVar("log_context", default=None)
+
+
+def get_request_id() -> str | None:
+    """Retorna o id da requisição atual (ou None fora de uma requisição)."""
+    context = _log_context.get()
+    return context.request_id if context is not None else None
+
+
+class RequestContextFilter(logging.Filter):
+    """Anexa request_id/route aos eventos e aplica a amostragem por rota."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _log_context.get()
+        if context is None:
+            record.request_id = None
+            record.route = None
+            return True
+
+        if record.levelno < logging.WARNING and not context.sampled:
+            return False
+        record.request_id = context.request_id
+        record.route = context.route
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Formata cada evento como uma linha JSON."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        document = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "route": getattr(record, "route", None)
+        }
+        document.update(getattr(record, "fields", None) or {})
+        for attribute, value in vars(record).items():
+            if attribute not in _RESERVED_ATTRIBUTES and attribute not in document:
+                document[attribute] = value
+        if record.exc_info:
+            document["exception"] = self.formatException(record.exc_info)
+        return json.dumps(document, ensure_ascii=False, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler que descarta (e conta) eventos quando a fila está cheia."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: logging.handlers.QueueListener | None = None
+_queue_handler: DroppingQueueHandler | None = None
+
+
+def get_dropped_events() -> int:
+    """Eventos descartados por fila cheia desde o início do processo."""
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+def configure_logging() -> None:
+    """
+    Configura o logger "midiantext" (uma vez por processo).
+
+    O filtro de contexto e a formatação JSON rodam no handler da fila, ainda
+    na thread da requisição (o contexto correto está disponível); a thread do
+    listener apenas escreve as linhas prontas.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler = DroppingQueueHandler(log_queue)
+    queue_handler.addFilter(RequestContextFilter())
+    queue_handler.setFormatter(JsonFormatter())
+
+    # Recebe os eventos já formatados pelo queue_handler
+    stream_handler = logging.StreamHandler(sys.stderr)
+
+    logger = logging.getLogger(ROOT_LOGGER)
+    logger.setLevel(LOG_LEVEL)
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+
+    _queue_handler = queue_handler
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Grava os eventos pendentes e encerra a thread de escrita."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class RequestContextMiddleware:
+    """Middleware ASGI que define o id da requisição usado nos logs."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", []):
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex[:16]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [
+                    (b"x-request-id", request_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        token = _log_context.set(RequestLogContext(request_id, scope))
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _log_context.reset(token)
@@ -17,6 +17,8 @@ Rotas Disponíveis:
     - /login: Autenticação de usuários
     - /personagens/*: Gerenciamento de personagens
     - /missions/*: Sistema de missões
+    - /metrics: Métricas no formato Prometheus
+    - /metrics/password-hashing: Estado do pool de hashing de senhas
 
 Technology Stack:
     - FastAPI: Framework web assíncrono
@@ -25,14 +27,56 @@ Technology Stack:
     - Uvicorn: Servidor ASGI
 
 Port: 8000
+
+Execução:
+    python main.py                  # Um processo (desenvolvimento, run.py)
+    python main.py --workers 4      # Produção: 4 workers Uvicorn
+    python main.py --workers 0      # Um worker por núcleo da CPU
+
+    Com mais de um worker, os armazenamentos precisam ser compartilhados
+    entre processos: STORAGE_BACKEND e MISSION_SESSION_BACKEND não podem ser
+    "memory" (o servidor recusa iniciar). Cada worker é um processo novo
+    (spawn) e cria o seu próprio cliente Firebase.
+
+    A verificação roda na inicialização de cada worker, a partir de
+    WEB_CONCURRENCY (definido por `python main.py --workers N`). Com gunicorn
+    ou uvicorn direto, informe o número de workers por WEB_CONCURRENCY, que
+    ambos usam como padrão de -w/--workers, e use o worker do Uvicorn sem
+    --preload:
+        WEB_CONCURRENCY=4 gunicorn main:app -k uvicorn.workers.UvicornWorker -b 0.0.0.0:8000
+
+Environment Variables:
+    API_HOST: Interface de rede (padrão: 0.0.0.0)
+    API_PORT: Porta (padrão: 8000)
+    API_WORKERS: Número de workers; 0 = núcleos da CPU (padrão: 1)
+    WEB_CONCURRENCY: Número de workers em execução, verificado na
+                     inicialização (padrão: 1)
 """
 
+import argparse
+import os
+import sys
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 import uvicorn
+from commands.database import get_unshared_backends
 from commands.routes.login import router as login_router
 from commands.routes.personagens import router as personagens_router
 from commands.routes.missions import router as missions_router
+from commands.func_senhas import get_hash_pool_stats, shutdown_hash_pool
+from commands.game_data import (
+    get_game_data_versions,
+    start_game_data_reloader,
+    stop_game_data_reloader
+)
+from commands.metrics import MetricsMiddleware, render_metrics
+from commands.structured_logging import (
+    RequestContextMiddleware,
+    configure_logging,
+    shutdown_logging
+)
 
 
 # Inicializa a aplicação FastAPI
@@ -54,12 +98,40 @@ app.add_middleware(
     allow_headers=["*"],  # Permite todos os headers
 )
 
+# Latência, status, tamanhos e operações de armazenamento por rota (GET /metrics)
+app.add_middleware(MetricsMiddleware)
+
+# Id de requisição (X-Request-ID) para os logs estruturados; adicionado por
+# último para envolver os demais middlewares
+app.add_middleware(RequestContextMiddleware)
+
+# Logs JSON em fila, gravados por uma thread separada (LOG_LEVEL, padrão INFO)
+configure_logging()
+
 # Registra os roteadores (blueprints) de cada módulo funcional
 app.include_router(login_router, tags=["Autenticação"])
 app.include_router(personagens_router, tags=["Personagens"])
 app.include_router(missions_router, tags=["Missões"])
 
 
+@app.on_event("startup")
+async def startup():
+    """
+    Recusa iniciar vários workers com armazenamento em memória e ativa a
+    recarga de itens/missões por alteração dos arquivos ou SIGHUP.
+    """
+    check_multiworker_backends(int(os.getenv("WEB_CONCURRENCY", "1")))
+    start_game_data_reloader()
+
+
+@app.on_event("shutdown")
+def shutdown():
+    """Encerra o pool de hashing de senhas e grava os logs pendentes ao desligar o servidor."""
+    stop_game_data_reloader()
+    shutdown_hash_pool()
+    shutdown_logging()
+
+
 @app.get("/", tags=["Sistema"])
 async def root():
     """
@@ -70,28 +142,123 @@ async def root():
     
     Example:
         GET /
-        Response: {"message": "MidianText RPG API", "status": "online"}
+        Response: {"message": "MidianText RPG API", "status": "online",
+                   "version": "1.0.0", "game_data": {"items": 1, "missions": 1}}
     """
     return {
         "message": "MidianText RPG API",
         "status": "online",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "game_data": get_game_data_versions()
     }
 
 
+@app.get("/metrics", tags=["Sistema"], response_class=PlainTextResponse)
+async def metrics():
+    """
+    Métricas da API no formato de texto do Prometheus.
+    
+    Inclui latência e status por rota, tamanhos de requisição/resposta,
+    operações de armazenamento (totais e por requisição) e o pool de
+    hashing de senhas. Ver commands/metrics.py.
+    """
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/metrics/password-hashing", tags=["Sistema"])
+async def password_hashing_metrics():
+    """
+    Estado do pool de hashing de senhas (registro/login).
+    
+    Returns:
+        dict: Tamanho do pool, limite de pendências, cálculos em andamento,
+              profundidade da fila, requisições recusadas (503) e pools
+              quebrados recriados
+    
+    Example:
+        GET /metrics/password-hashing
+        Response: {"executor": "process", "workers": 4, "max_pending": 32,
+                   "in_flight": 6, "queue_depth": 2, "rejected": 0,
+                   "rebuilds": 0}
+    """
+    return get_hash_pool_stats()
+
+
+def parse_args() -> argparse.Namespace:
+    """Lê as opções de linha de comando do servidor (padrões via variáveis de ambiente)."""
+    parser = argparse.ArgumentParser(description="Servidor da API MidianText RPG")
+    parser.add_argument("--host", default=os.getenv("API_HOST", "0.0.0.0"),
+                        help="Interface de rede (padrão: 0.0.0.0)")
+    parser.add_argument("--port", type=int, default=int(os.getenv("API_PORT", "8000")),
+                        help="Porta (padrão: 8000)")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("API_WORKERS", "1")),
+                        help="Número de workers; 0 usa um por núcleo da CPU (padrão: 1)")
+    return parser.parse_args()
+
+
+def check_multiworker_backends(workers: int) -> None:
+    """
+    Garante que o estado usado pelas rotas é compartilhado entre os workers.
+
+    Args:
+        workers (int): Número de workers que serão iniciados
+
+    Raises:
+        SystemExit: Se personagens ou sessões de missão ficariam presos em um
+                    único processo
+    """
+    if workers <= 1:
+        return
+
+    unshared = get_unshared_backends()
+
+    # Limites de login por worker ainda protegem, apenas ficam mais permissivos
+    if "LOGIN_GUARD_BACKEND" in unshared:
+        print(
+            "Aviso: LOGIN_GUARD_BACKEND=memory conta as falhas de login por worker; "
+            "use sqlite para um limite único.",
+            file=sys.stderr
+        )
+        del unshared["LOGIN_GUARD_BACKEND"]
+
+    if unshared:
+        configured = ", ".join(f"{name}={backend}" for name, backend in unshared.items())
+        raise SystemExit(
+            f"Não é possível iniciar {workers} workers com {configured}: "
+            "esse armazenamento existe apenas dentro de um processo. "
+            "Use sqlite ou firestore, ou inicie com --workers 1."
+        )
+
+
 # Executa o servidor quando o módulo é rodado diretamente
 if __name__ == "__main__":
     """
-    Inicia o servidor Uvicorn com configurações de desenvolvimento.
+    Inicia o servidor Uvicorn.
     
     Configurações:
         - host: "0.0.0.0" - Aceita conexões de qualquer interface de rede
         - port: 8000 - Porta padrão do servidor
-        - reload: Auto-reload em desenvolvimento (desabilitar em produção)
+        - workers: 1 em desenvolvimento; N processos em produção
     """
-    uvicorn.run(
-        app,
-        host="0.0.0.0",
-        port=8000,
-        log_level="info"
-    )
+    args = parse_args()
+    workers = args.workers or os.cpu_count() or 1
+    check_multiworker_backends(workers)
+
+    if workers == 1:
+        uvicorn.run(
+            app,
+            host=args.host,
+            port=args.port,
+            log_level="info"
+        )
+    else:
+        # Com vários workers o Uvicorn importa a aplicação em cada processo;
+        # WEB_CONCURRENCY é herdado e verificado na inicialização de cada um
+        os.environ["WEB_CONCURRENCY"] = str(workers)
+        uvicorn.run(
+            "main:app",
+            host=args.host,
+            port=args.port,
+            workers=workers,
+            log_level="info"
+        )
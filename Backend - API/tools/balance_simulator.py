@@ -0,0 +1,284 @@
+"""
+MidianText RPG - Simulador de Balanceamento de Combate
+=======================================================
+
+Simula milhões de combates para cada combinação classe × cor × inimigo e
+mostra taxas de vitória, duração média e o HP que sobra ao personagem,
+usando as mesmas regras de commands/combat_engine.py com a matemática de
+dano vetorizada em NumPy (todas as lutas de uma combinação avançam juntas,
+turno a turno).
+
+Personagens:
+    Cada classe de ItemTable/CHARACTER_CLASSES no nível 1, com HP cheio e
+    os bônus dos equipamentos iniciais, criada por Character (como em
+    POST /personagens/criar), para cada uma das quatro cores.
+
+Inimigos:
+    Todos os inimigos das missões (commands/data/missions.json, via
+    missions_data.MISSIONS), com a própria cor (cinza se não houver) ou,
+    com --enemy-colors all, em cada uma das quatro cores.
+
+Uso (a partir de "Backend - API"):
+    python tools/balance_simulator.py
+    python tools/balance_simulator.py --fights 200000 --enemy-colors all
+    python tools/balance_simulator.py --classes Mago Soldado --json
+    python tools/balance_simulator.py --crosscheck 2000
+
+Saída:
+    classe     cor       inimigo               cor_ini   vitória  derrota  limite  turnos  hp p10/p50/p90
+    Assassino  verde     Guardião Esquelético  cinza      98.1%     1.9%    0.0%    2.41   33% / 60% / 80%
+    ...
+
+    "hp" é o HP restante do personagem nas vitórias, em % do HP máximo.
+
+Notes:
+    - Cada combinação usa um gerador próprio derivado de --seed e dos nomes
+      (classe, cor, inimigo), então filtrar combinações não muda os números
+    - Os sorteios do NumPy não são os mesmos do random.Random do servidor:
+      os resultados coincidem em distribuição, não luta a luta.
+      --crosscheck N roda N lutas por combinação no motor do servidor e
+      mostra a diferença de taxa de vitória
+
+Dependencies: numpy (opcional; apenas para esta ferramenta)
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+import zlib
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # dependência opcional: o servidor não precisa do NumPy
+    np = None
+
+# Executável de qualquer diretório: o pacote `commands` fica em "Backend - API"
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+COLORS = ("verde", "vermelho", "azul", "cinza")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Simulador de balanceamento de combate")
+    parser.add_argument("--fights", type=int, default=100_000,
+                        help="Lutas por combinação (padrão: 100000)")
+    parser.add_argument("--max-rounds", type=int, default=None,
+                        help="Limite de turnos por luta (padrão: o do motor de combate)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Semente base (padrão: 0)")
+    parser.add_argument("--classes", nargs="+", default=None,
+                        help="Classes simuladas (padrão: todas)")
+    parser.add_argument("--enemy-colors", choices=("own", "all"), default="own",
+                        help="own: cor do próprio inimigo; all: as quatro cores (padrão: own)")
+    parser.add_argument("--crosscheck", type=int, default=0, metavar="N",
+                        help="Compara com N lutas por combinação no motor do servidor")
+    parser.add_argument("--json", action="store_true",
+                        help="Imprime os resultados em JSON")
+    return parser.parse_args()
+
+
+def build_heroes(class_names: list | None) -> list:
+    """Cria o combatente de cada classe × cor no nível 1 (HP cheio, itens iniciais)."""
+    from commands.combat_engine import character_combatant
+    from commands.models.character_creation_model import Character
+    from commands.models.items_table import CHARACTER_CLASSES
+
+    heroes = []
+    for class_name, class_type in CHARACTER_CLASSES.items():
+        if class_names and class_name not in class_names:
+            continue
+        for color in COLORS:
+            character = Character(class_name, class_name, class_type(), color)
+            heroes.append((class_name, color, character_combatant(character.to_dict_full())))
+    return heroes
+
+
+def build_enemies(enemy_colors: str) -> list:
+    """Lista (nome, cor, combatente) de cada inimigo distinto das missões."""
+    from commands.combat_engine import enemy_combatant
+    from commands.missions_data import MISSIONS
+
+    enemies = {}
+    for mission in MISSIONS.values():
+        for room in mission["rooms"].values():
+            for enemy in room.get("enemies", []):
+                enemies.setdefault(enemy["id"], enemy)
+
+    combatants = []
+    for enemy in enemies.values():
+        colors = COLORS if enemy_colors == "all" else (enemy.get("color") or "cinza",)
+        for color in colors:
+            combatants.append((enemy["name"], color, enemy_combatant({**enemy, "color": color})))
+    return combatants
+
+
+def matchup_rng(seed: int, *names: str):
+    """Gerador NumPy estável por combinação (independe da ordem e dos filtros)."""
+    key = zlib.crc32("|".join(names).encode("utf-8"))
+    return np.random.default_rng([seed, key])
+
+
+def _strike(base: int, multiplier: float, critical_chance: float,
+            hp, index, rng) -> None:
+    """Golpes vetorizados: mesma fórmula de combat_engine.attack()."""
+    from commands.combat_engine import CRITICAL_MULTIPLIER, DAMAGE_VARIANCE
+
+    if index.size == 0:
+        return
+    low, high = DAMAGE_VARIANCE
+    damage = base * rng.integers(low, high + 1, size=index.size) / 100
+    damage *= multiplier
+    critical = rng.random(index.size) < critical_chance
+    damage = np.where(critical, damage * CRITICAL_MULTIPLIER, damage)
+    damage = np.maximum(1, np.rint(damage)).astype(np.int64)
+    hp[index] = np.maximum(0, hp[index] - damage)
+
+
+def _attack_profile(attacker, defender) -> tuple[int, float, float]:
+    """Dano base, multiplicador de cor e chance de crítico (fixos por combinação)."""
+    from commands.combat_engine import MAX_CRITICAL_CHANCE, color_multiplier
+    from commands.models.stats import Stat
+
+    a = attacker.stats
+    power = max(a[Stat.STRG], a[Stat.MAG])
+    base = max(1, power - defender.stats[Stat.DEFE] // 2)
+    critical_chance = min(a[Stat.LUCK], MAX_CRITICAL_CHANCE) / 100
+    return base, color_multiplier(attacker.color, defender.color), critical_chance
+
+
+def simulate_matchup(hero, enemy, fights: int, max_rounds: int, rng) -> dict:
+    """
+    Simula `fights` lutas entre dois combatentes, todas em paralelo.
+
+    Returns:
+        dict: Taxas de vitória/derrota/limite, turnos médios e percentis do
+              HP restante (em % do HP máximo) nas vitórias
+    """
+    from commands.models.stats import Stat
+
+    hero_hp = np.full(fights, hero.hp, dtype=np.int64)
+    enemy_hp = np.full(fights, enemy.hp, dtype=np.int64)
+    rounds = np.zeros(fights, dtype=np.int64)
+
+    hero_profile = _attack_profile(hero, enemy)
+    enemy_profile = _attack_profile(enemy, hero)
+    if hero.stats[Stat.SPD] >= enemy.stats[Stat.SPD]:
+        first, second = (hero_profile, enemy_hp), (enemy_profile, hero_hp)
+    else:
+        first, second = (enemy_profile, hero_hp), (hero_profile, enemy_hp)
+
+    active = np.arange(fights)
+    for round_number in range(1, max_rounds + 1):
+        if active.size == 0:
+            break
+        rounds[active] = round_number
+        (profile, target_hp) = first
+        _strike(*profile, target_hp, active, rng)
+        survivors = active[target_hp[active] > 0]
+        (profile, target_hp) = second
+        _strike(*profile, target_hp, survivors, rng)
+        active = active[(hero_hp[active] > 0) & (enemy_hp[active] > 0)]
+
+    wins = enemy_hp == 0
+    losses = hero_hp == 0
+    hp_left = hero_hp[wins] * 100 / max(1, hero.stats[Stat.HP_MAX])
+    percentiles = np.percentile(hp_left, [10, 50, 90]).tolist() if hp_left.size else [0.0, 0.0, 0.0]
+
+    return {
+        "win_rate": float(wins.mean()),
+        "loss_rate": float(losses.mean()),
+        "capped_rate": float(1 - wins.mean() - losses.mean()),
+        "mean_rounds": float(rounds.mean()),
+        "hp_left_pct": {"p10": percentiles[0], "p50": percentiles[1], "p90": percentiles[2]}
+    }
+
+
+def crosscheck_matchup(hero, enemy, fights: int, max_rounds: int, seed: int) -> float:
+    """Taxa de vitória no motor do servidor (random.Random, luta a luta)."""
+    from commands.combat_engine import Combatant, resolve_fight
+
+    rng = random.Random(seed)
+    wins = 0
+    for _ in range(fights):
+        result = resolve_fight(
+            Combatant(hero.name, hero.stats, hero.color, hero.hp),
+            Combatant(enemy.name, enemy.stats, enemy.color, enemy.hp),
+            rng,
+            max_rounds
+        )
+        wins += result.winner == "character"
+    return wins / fights
+
+
+def print_table(results: list) -> None:
+    header = (f"{'classe':<10} {'cor':<9} {'inimigo':<22} {'cor_ini':<9} "
+              f"{'vitória':>8} {'derrota':>8} {'limite':>7} {'turnos':>7}  hp p10/p50/p90")
+    print(header)
+    print("-" * len(header))
+    for row in results:
+        hp = row["hp_left_pct"]
+        line = (f"{row['class']:<10} {row['color']:<9} {row['enemy']:<22} {row['enemy_color']:<9} "
+                f"{row['win_rate']:>8.1%} {row['loss_rate']:>8.1%} {row['capped_rate']:>7.1%} "
+                f"{row['mean_rounds']:>7.2f}  {hp['p10']:.0f}% / {hp['p50']:.0f}% / {hp['p90']:.0f}%")
+        if "crosscheck_win_rate" in row:
+            line += f"  (motor: {row['crosscheck_win_rate']:.1%})"
+        print(line)
+
+
+def main(args: argparse.Namespace) -> None:
+    if np is None:
+        raise SystemExit(
+            "Este simulador precisa do NumPy, que não faz parte das dependências da API.\n"
+            "Instale com: pip install numpy"
+        )
+
+    from commands.combat_engine import DEFAULT_MAX_ROUNDS
+
+    max_rounds = args.max_rounds or DEFAULT_MAX_ROUNDS
+    heroes = build_heroes(args.classes)
+    enemies = build_enemies(args.enemy_colors)
+    if not heroes:
+        raise SystemExit("Nenhuma classe encontrada para --classes")
+
+    results = []
+    start = time.perf_counter()
+    for class_name, color, hero in heroes:
+        for enemy_name, enemy_color, enemy in enemies:
+            names = (class_name, color, enemy_name, enemy_color)
+            row = {
+                "class": class_name,
+                "color": color,
+                "enemy": enemy_name,
+                "enemy_color": enemy_color,
+                **simulate_matchup(hero, enemy, args.fights, max_rounds, matchup_rng(args.seed, *names))
+            }
+            if args.crosscheck:
+                row["crosscheck_win_rate"] = crosscheck_matchup(
+                    hero, enemy, args.crosscheck, max_rounds, args.seed
+                )
+            results.append(row)
+    elapsed = time.perf_counter() - start
+
+    total = len(results) * args.fights
+    if args.json:
+        print(json.dumps({
+            "fights_per_matchup": args.fights,
+            "max_rounds": max_rounds,
+            "seed": args.seed,
+            "seconds": elapsed,
+            "results": results
+        }, ensure_ascii=False, indent=2))
+        return
+
+    print_table(results)
+    print()
+    print(f"{len(results)} combinações × {args.fights} lutas = {total} lutas em {elapsed:.2f}s "
+          f"({total / max(elapsed, 1e-9):,.0f} lutas/s)")
+
+
+if __name__ == "__main__":
+    main(parse_args())
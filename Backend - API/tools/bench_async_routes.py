@@ -0,0 +1,116 @@
+"""
+MidianText RPG - Benchmark de Rotas Síncronas vs Assíncronas
+=============================================================
+
+Compara, lado a lado, a vazão de GET /personagens em dois modelos:
+    - sync: handler `def` com o repositório síncrono (como as rotas eram
+      antes), executado no threadpool do FastAPI
+    - async: a rota real `async def` com o async_character_repository
+
+A API roda no próprio processo (httpx + ASGITransport) com o backend
+`memory` e latência simulada por operação (STORAGE_LATENCY_MS), que
+reproduz a ida e volta ao Firestore sem depender de rede.
+
+Uso (a partir de "Backend - API"):
+    python tools/bench_async_routes.py
+    python tools/bench_async_routes.py --latency-ms 30 --clients 50 200 1000 --requests 4000
+
+Saída:
+    clients  mode    req/s    p50 ms   p95 ms
+    50       sync    ...
+    50       async   ...
+
+Notes:
+    Cliente e servidor dividem o mesmo processo; no modo async o limite
+    passa a ser CPU (do cliente inclusive), enquanto no modo sync é o
+    número de threads do FastAPI × latência.
+
+Dependencies: httpx
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Executável de qualquer diretório: o pacote `commands` fica em "Backend - API"
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark de rotas sync vs async")
+    parser.add_argument("--latency-ms", type=float, default=20.0,
+                        help="Latência simulada por operação de armazenamento (padrão: 20)")
+    parser.add_argument("--clients", type=int, nargs="+", default=[50, 200, 1000],
+                        help="Níveis de clientes simultâneos (padrão: 50 200 1000)")
+    parser.add_argument("--requests", type=int, default=3000,
+                        help="Requisições por nível e modo (padrão: 3000)")
+    return parser.parse_args()
+
+
+async def run_level(client, path: str, headers: dict, clients: int, total: int) -> tuple[float, list]:
+    """Dispara `total` requisições com `clients` clientes simultâneos."""
+    remaining = total
+    latencies = []
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    return time.perf_counter() - start, latencies
+
+
+async def main(args: argparse.Namespace) -> None:
+    # Configuração antes de importar a API (lida na importação)
+    os.environ["STORAGE_BACKEND"] = "memory"
+    os.environ["STORAGE_LATENCY_MS"] = str(args.latency_ms)
+    os.environ.setdefault("LOGIN_MAX_FAILURES_PER_IP", "1000000")
+
+    import httpx
+    from fastapi import Depends
+
+    from commands.auth import get_current_user
+    from commands.database import character_repository
+    from main import app
+
+    # Linha de base: o handler síncrono original de GET /personagens
+    @app.get("/bench/personagens-sync", include_in_schema=False)
+    def get_personagens_sync(user_id: str = Depends(get_current_user)) -> list:
+        return character_repository.get_characters(user_id) or []
+
+    transport = httpx.ASGITransport(app=app)
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench",
+                                 limits=limits, timeout=None) as client:
+        credentials = {"username": "bench", "password": "bench123"}
+        await client.post("/register", json=credentials)
+        token = (await client.post("/login", json=credentials)).json()["key"]
+        headers = {"Authorization": f"Bearer {token}"}
+        await client.post("/personagens/criar", headers=headers,
+                          json={"name": "Bench", "character_class": "Soldado", "color": "vermelho"})
+
+        print(f"Latência simulada: {args.latency_ms:.0f} ms por operação, "
+              f"{args.requests} requisições por nível\n")
+        print(f"{'clients':<9}{'mode':<8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}")
+        for clients in args.clients:
+            for mode, path in (("sync", "/bench/personagens-sync"), ("async", "/personagens")):
+                elapsed, latencies = await run_level(client, path, headers, clients, args.requests)
+                latencies.sort()
+                p50 = statistics.median(latencies) * 1000
+                p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+                print(f"{clients:<9}{mode:<8}{args.requests / elapsed:>9.0f}{p50:>9.1f}{p95:>9.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
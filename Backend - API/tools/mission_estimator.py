@@ -0,0 +1,321 @@
+"""
+MidianText RPG - Estimador Monte Carlo de Missões
+==================================================
+
+Percorre o grafo de salas de cada missão com jogadores simulados, por
+classe e nível, e estima chance de conclusão, ouro esperado por tentativa e
+HP perdido, antes de o conteúdo chegar aos jogadores.
+
+Regras (as de POST /missions/action, commands/routes/missions.py):
+    - Coletar tesouros e mover-se não exige derrotar os inimigos da sala
+    - Perder uma luta encerra a missão (fracasso); o ouro já obtido fica
+    - O ouro de inimigos e tesouros é gravado na hora; a recompensa da
+      missão só ao sair pela saída "fim"
+    - O HP não se recupera entre lutas; a tentativa começa com HP cheio,
+      como toda missão iniciada por POST /missions/start
+
+Jogador Simulado:
+    - Ao entrar em uma sala pela primeira vez, coleta todos os tesouros e
+      depois, com --fights all (padrão), luta com todos os inimigos (motor
+      de combate do servidor, commands/combat_engine.py); --fights none
+      mede a rota que apenas coleta e anda
+    - Escolhe a próxima saída: `explore` prefere salas ainda não visitadas
+      (sorteando entre elas); `random` sorteia entre todas as saídas
+    - A tentativa termina ao sair pela saída "fim" (conclusão), ao ser
+      derrotado ou após --max-moves passos
+
+Níveis:
+    O jogo ainda não tem evolução de atributos por nível. Para estimar
+    níveis acima de 1, os atributos da classe crescem --level-growth
+    (padrão 10%) por nível, uma suposição desta ferramenta. Níveis abaixo
+    de min_level da missão aparecem como bloqueados.
+
+Paralelismo:
+    As tentativas de cada combinação missão × classe × cor × nível são
+    divididas em lotes com sementes próprias e distribuídas em um pool de
+    processos (--workers); o resultado não depende do número de workers.
+
+Uso (a partir de "Backend - API"):
+    python tools/mission_estimator.py
+    python tools/mission_estimator.py --runs 20000 --levels 1 2 3 --workers 8
+    python tools/mission_estimator.py --policy random --colors cinza --json
+    python tools/mission_estimator.py --fights none
+
+Saída:
+    missão         classe     cor       nível  conclusão  derrota  limite  ouro/tent.  ouro (concl.)  HP perdido  passos
+    tumbas_farao   Soldado    cinza         1     100.0%     0.0%    0.0%       757.5          757.5        12.2     3.5
+
+    "HP perdido" é a média de HP máximo - HP final por tentativa.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Executável de qualquer diretório: o pacote `commands` fica em "Backend - API"
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+COLORS = ("verde", "vermelho", "azul", "cinza")
+
+# Tentativas por lote enviado a um worker
+BATCH_SIZE = 2_000
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Estimador Monte Carlo de missões")
+    parser.add_argument("--runs", type=int, default=10_000,
+                        help="Tentativas por combinação (padrão: 10000)")
+    parser.add_argument("--missions", nargs="+", default=None,
+                        help="IDs das missões (padrão: todas)")
+    parser.add_argument("--classes", nargs="+", default=None,
+                        help="Classes simuladas (padrão: todas)")
+    parser.add_argument("--colors", nargs="+", default=["cinza"], choices=COLORS,
+                        help="Cores dos personagens (padrão: cinza)")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1],
+                        help="Níveis simulados (padrão: 1)")
+    parser.add_argument("--level-growth", type=float, default=0.10,
+                        help="Crescimento dos atributos por nível acima de 1 (padrão: 0.10)")
+    parser.add_argument("--policy", choices=("explore", "random"), default="explore",
+                        help="Escolha de saídas do jogador simulado (padrão: explore)")
+    parser.add_argument("--fights", choices=("all", "none"), default="all",
+                        help="Lutar com os inimigos de cada sala ou evitá-los (padrão: all)")
+    parser.add_argument("--max-moves", type=int, default=50,
+                        help="Passos máximos por tentativa (padrão: 50)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Semente base (padrão: 0)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Processos do pool (padrão: núcleos da CPU)")
+    parser.add_argument("--json", action="store_true",
+                        help="Imprime os resultados em JSON")
+    return parser.parse_args()
+
+
+def build_hero(class_name: str, color: str, level: int, growth: float):
+    """Combatente da classe no nível pedido (HP cheio, equipamentos iniciais)."""
+    from commands.combat_engine import character_combatant
+    from commands.models.character_creation_model import Character
+    from commands.models.items_table import CHARACTER_CLASSES
+    from commands.models.stats import Stat
+
+    character = Character(class_name, class_name, CHARACTER_CLASSES[class_name](), color)
+    if level > 1:
+        scale = 1 + growth * (level - 1)
+        for stat in (Stat.HP_MAX, Stat.STRG, Stat.MAG, Stat.SPD, Stat.LUCK, Stat.DEFE):
+            character.stats[stat] = round(character.stats[stat] * scale)
+        character.hp_tmp = character.hp_max
+    character.level = level
+    return character_combatant(character.to_dict_full())
+
+
+def simulate_batch(task: dict) -> dict:
+    """
+    Executa um lote de tentativas (roda em um processo do pool).
+
+    Args:
+        task (dict): missão, classe, cor, nível, número de tentativas,
+                     semente e parâmetros da simulação
+
+    Returns:
+        dict: Somas do lote (agregadas pelo processo principal)
+    """
+    from commands.combat_engine import Combatant, enemy_combatant, resolve_fight
+    from commands.mission_graph import EXIT_ROOM, get_compiled_mission
+
+    mission = get_compiled_mission(task["mission_id"])
+    hero = build_hero(task["class"], task["color"], task["level"], task["level_growth"])
+    rng = random.Random(task["seed"])
+    explore = task["policy"] == "explore"
+    fights = task["fights"] == "all"
+    reward_gold = mission.rewards.get("gold", 0)
+
+    # Inimigos e ouro dos tesouros por sala, montados uma vez por lote
+    room_enemies = {
+        room_id: [(enemy_combatant(enemy), enemy.get("gold_drop", 0)) for enemy in room.enemies]
+        for room_id, room in mission.rooms.items()
+    }
+    room_treasure_gold = {
+        room_id: sum(treasure.get("contents", {}).get("gold", 0) for treasure in room.treasures)
+        for room_id, room in mission.rooms.items()
+    }
+
+    totals = {
+        "runs": task["runs"], "completed": 0, "defeated": 0, "capped": 0,
+        "gold": 0, "gold_completed": 0, "hp_lost": 0, "moves": 0
+    }
+    for _ in range(task["runs"]):
+        player = Combatant(hero.name, hero.stats, hero.color, hero.hp)
+        room_id = mission.starting_room
+        visited = {room_id}
+        cleared = set()
+        gold = 0
+        moves = 0
+        outcome = "capped"
+
+        while True:
+            # Coletar os tesouros e lutar com os inimigos (uma vez por sala)
+            if room_id not in cleared:
+                cleared.add(room_id)
+                gold += room_treasure_gold[room_id]
+                if fights:
+                    for template, gold_drop in room_enemies[room_id]:
+                        enemy = Combatant(template.name, template.stats, template.color, template.hp)
+                        if resolve_fight(player, enemy, rng).winner != "character":
+                            break
+                        gold += gold_drop
+                # Derrota encerra a missão; o limite de turnos deixa o inimigo
+                # para trás, como sair da sala no meio da luta
+                if player.hp <= 0:
+                    outcome = "defeated"
+                    break
+
+            if moves >= task["max_moves"]:
+                break
+
+            exits = list(mission.rooms[room_id].exits.values())
+            if explore:
+                unvisited = [target for target in exits if target not in visited]
+                exits = unvisited or exits
+            room_id = rng.choice(exits)
+            moves += 1
+            if room_id == EXIT_ROOM:
+                gold += reward_gold
+                outcome = "completed"
+                break
+            visited.add(room_id)
+
+        totals[outcome] += 1
+        totals["gold"] += gold
+        totals["hp_lost"] += hero.hp - player.hp
+        totals["moves"] += moves
+        if outcome == "completed":
+            totals["gold_completed"] += gold
+    return totals
+
+
+def build_tasks(args: argparse.Namespace) -> tuple[list, list]:
+    """Divide cada combinação em lotes; retorna (combinações, lotes)."""
+    from commands.mission_graph import get_compiled_mission, get_mission_summaries
+    from commands.models.items_table import CHARACTER_CLASSES
+
+    mission_ids = args.missions or [summary["id"] for summary in get_mission_summaries()]
+    class_names = [name for name in CHARACTER_CLASSES if not args.classes or name in args.classes]
+
+    combos, tasks = [], []
+    for mission_id in mission_ids:
+        mission = get_compiled_mission(mission_id)
+        if mission is None:
+            raise SystemExit(f"Missão desconhecida: {mission_id}")
+        for class_name in class_names:
+            for color in args.colors:
+                for level in args.levels:
+                    combo = {
+                        "mission_id": mission_id, "class": class_name,
+                        "color": color, "level": level,
+                        "locked": level < mission.min_level
+                    }
+                    combo_index = len(combos)
+                    combos.append(combo)
+                    if combo["locked"]:
+                        continue
+                    for batch, start in enumerate(range(0, args.runs, BATCH_SIZE)):
+                        tasks.append({
+                            **combo,
+                            "combo": combo_index,
+                            "runs": min(BATCH_SIZE, args.runs - start),
+                            # Semente por combinação e lote: independe dos workers
+                            "seed": _stable_seed(args.seed, mission_id, class_name, color, level, batch),
+                            "level_growth": args.level_growth,
+                            "policy": args.policy,
+                            "fights": args.fights,
+                            "max_moves": args.max_moves
+                        })
+    return combos, tasks
+
+
+def _stable_seed(*parts) -> int:
+    """Semente estável entre processos (hash() de str varia por processo)."""
+    return zlib.crc32("|".join(map(str, parts)).encode("utf-8"))
+
+
+def summarize(combo: dict, totals: dict | None) -> dict:
+    if totals is None:
+        return {**combo}
+    runs = totals["runs"]
+    completed = totals["completed"]
+    return {
+        **combo,
+        "runs": runs,
+        "completion_rate": completed / runs,
+        "defeat_rate": totals["defeated"] / runs,
+        "capped_rate": totals["capped"] / runs,
+        "gold_per_run": totals["gold"] / runs,
+        "gold_per_completion": totals["gold_completed"] / completed if completed else 0.0,
+        "hp_lost_per_run": totals["hp_lost"] / runs,
+        "moves_per_run": totals["moves"] / runs
+    }
+
+
+def print_table(rows: list) -> None:
+    header = (f"{'missão':<14} {'classe':<10} {'cor':<9} {'nível':>5}  {'conclusão':>9} {'derrota':>8} "
+              f"{'limite':>7} {'ouro/tent.':>11} {'ouro (concl.)':>14} {'HP perdido':>11} {'passos':>7}")
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        prefix = f"{row['mission_id']:<14} {row['class']:<10} {row['color']:<9} {row['level']:>5}  "
+        if row["locked"]:
+            print(prefix + "bloqueada (nível mínimo)")
+            continue
+        print(prefix + (
+            f"{row['completion_rate']:>9.1%} {row['defeat_rate']:>8.1%} {row['capped_rate']:>7.1%} "
+            f"{row['gold_per_run']:>11.1f} {row['gold_per_completion']:>14.1f} "
+            f"{row['hp_lost_per_run']:>11.1f} {row['moves_per_run']:>7.1f}"
+        ))
+
+
+def main(args: argparse.Namespace) -> None:
+    combos, tasks = build_tasks(args)
+
+    start = time.perf_counter()
+    totals: dict[int, dict] = {}
+    workers = max(1, args.workers)
+    if workers == 1:
+        batches = map(simulate_batch, tasks)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        batches = executor.map(simulate_batch, tasks, chunksize=max(1, len(tasks) // (workers * 4)))
+    for task, batch in zip(tasks, batches):
+        combo_totals = totals.setdefault(task["combo"], dict.fromkeys(batch, 0))
+        for key, value in batch.items():
+            combo_totals[key] += value
+    if workers > 1:
+        executor.shutdown()
+    elapsed = time.perf_counter() - start
+
+    rows = [summarize(combo, totals.get(index)) for index, combo in enumerate(combos)]
+    if args.json:
+        print(json.dumps({
+            "runs_per_combination": args.runs,
+            "policy": args.policy,
+            "fights": args.fights,
+            "level_growth": args.level_growth,
+            "seed": args.seed,
+            "seconds": elapsed,
+            "results": rows
+        }, ensure_ascii=False, indent=2))
+        return
+
+    print_table(rows)
+    total_runs = sum(task["runs"] for task in tasks)
+    print()
+    print(f"{total_runs} tentativas em {elapsed:.2f}s com {workers} worker(s)")
+
+
+if __name__ == "__main__":
+    main(parse_args())